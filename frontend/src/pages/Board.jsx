@@ -55,6 +55,7 @@ function Board() {
   const [selectedListId, setSelectedListId] = useState(null);
   const [selectedTaskId, setSelectedTaskId] = useState(null);
   const [activities, setActivities] = useState([]);
+  const [activitiesCursor, setActivitiesCursor] = useState(null);
   const [selectedStudentId, setSelectedStudentId] = useState('');
   const [newUserData, setNewUserData] = useState({
     username: '',
@@ -622,11 +623,14 @@ function Board() {
     setExpandedSubtasks(newExpanded);
   };
 
-  const loadActivities = async () => {
+  // Sin cursor recarga la primera página; con cursor agrega la siguiente
+  const loadActivities = async (after = null) => {
     try {
-      const response = await kanbanService.getActivities();
+      const response = await kanbanService.getActivities(after);
       if (response.data.success) {
-        setActivities(response.data.activities || []);
+        const page = response.data.activities || [];
+        setActivities(prev => (after ? [...prev, ...page] : page));
+        setActivitiesCursor(response.data.next_cursor || null);
       }
     } catch (err) {
       console.error('Error al cargar actividades:', err);
@@ -1488,6 +1492,8 @@ function Board() {
         show={showActivitiesModal}
         onClose={() => setShowActivitiesModal(false)}
         activities={activities}
+        hasMore={Boolean(activitiesCursor)}
+        onLoadMore={() => loadActivities(activitiesCursor)}
         heading={activitiesHeading}
         onAddComment={handleAddActivityComment}
       />
@@ -2083,7 +2089,7 @@ function ColorPickerModal({ show, onClose, onSelectColor, selectedListId, lists
   );
 }
 
-function ActivitiesModal({ show, onClose, activities, heading, onAddComment }) {
+function ActivitiesModal({ show, onClose, activities, hasMore, onLoadMore, heading, onAddComment }) {
   const [commentTexts, setCommentTexts] = useState({});
 
   const handleAddComment = (activityId) => {
@@ -2141,6 +2147,9 @@ function ActivitiesModal({ show, onClose, activities, heading, onAddComment }) {
           <p>No hay actividades registradas</p>
         )}
       </div>
+      {hasMore && (
+        <button className="btn-refresh" onClick={onLoadMore}>Cargar más</button>
+      )}
       <button className="btn-cancel" onClick={onClose}>Cerrar</button>
     </Modal>
   );
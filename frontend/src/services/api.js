@@ -92,13 +92,16 @@ export const authService = {
 // Servicios del tablero Kanban
 export const kanbanService = {
   // Tablero completo
-  getBoard: (filters = {}) => {
+  // options.include: secciones (ej: ['lists']); options.fields: campos de cada tarea
+  getBoard: (filters = {}, options = {}) => {
     // Construir query string con los filtros
     const params = new URLSearchParams();
     if (filters.q) params.append('q', filters.q);
     if (filters.creator) params.append('creator', filters.creator);
     if (filters.due_from) params.append('due_from', filters.due_from);
     if (filters.due_to) params.append('due_to', filters.due_to);
+    if (options.include) params.append('include', options.include.join(','));
+    if (options.fields) params.append('fields', options.fields.join(','));
     
     const queryString = params.toString();
     const url = queryString ? `/api/board/?${queryString}` : '/api/board/';
@@ -107,6 +110,32 @@ export const kanbanService = {
     return api.get(url);
   },
   
+  getBoardStudents: () => {
+    return api.get('/api/board/students/');
+  },
+  
+  getBoardCreators: () => {
+    return api.get('/api/board/creators/');
+  },
+  
+  // Cambios del tablero desde el cursor (sincronización incremental)
+  getBoardChanges: (since) => {
+    return api.get('/api/board/changes/', { params: { since } });
+  },
+  
+  // Búsqueda ordenada por relevancia (tareas, subtareas, adjuntos y actividades)
+  searchBoard: (q, filters = {}) => {
+    return api.get('/api/search/', { params: { ...filters, q } });
+  },
+  
+  // Página de tareas de una lista (paginación por cursor)
+  getListTasks: (listId, after = null, filters = {}, pageSize = null) => {
+    const params = { ...filters };
+    if (after) params.after = after;
+    if (pageSize) params.page_size = pageSize;
+    return api.get(`/api/lists/${listId}/tasks/`, { params });
+  },
+  
   // Listas
   createList: (name) => {
     return api.post('/api/lists/', { name });
@@ -175,8 +204,12 @@ export const kanbanService = {
   },
   
   // Actividades
-  getActivities: () => {
-    return api.get('/api/activities/');
+  // Página de actividades (paginación por cursor; filtros user, type, task, from y to)
+  getActivities: (after = null, filters = {}, pageSize = null) => {
+    const params = { ...filters };
+    if (after) params.after = after;
+    if (pageSize) params.page_size = pageSize;
+    return api.get('/api/activities/', { params });
   },
   
   // Calendario
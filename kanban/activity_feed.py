@@ -0,0 +1,118 @@
+"""
+Páginas del historial de actividades.
+
+Las actividades visibles (ver board_sections.get_visible_activities) se leen
+de la más reciente a la más antigua, ordenadas por (created_at, id), y cada
+página trae un cursor con la última fila para pedir la siguiente con ?after=.
+Así cada página cuesta lo mismo sin importar cuántas actividades tenga el
+tablero; los índices de Activity cubren ese orden con y sin filtro de usuario.
+
+Filtros (request.GET): user (id), type (activity_type), task (id), from y to
+(AAAA-MM-DD, ambos inclusive). Un valor inválido se ignora, como en los
+filtros del tablero.
+"""
+import base64
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Activity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACTIVITY_PAGE_SIZE = 50
+MAX_ACTIVITY_PAGE_SIZE = 200
+
+ACTIVITY_TYPES = {activity_type for activity_type, _ in Activity.ACTIVITY_TYPES}
+
+
+def get_activity_filters(params):
+    """Extrae los filtros de actividades desde request.GET"""
+    return {
+        'user': params.get('user', '').strip(),
+        'type': params.get('type', '').strip(),
+        'task': params.get('task', '').strip(),
+        'from': params.get('from', '').strip(),
+        'to': params.get('to', '').strip(),
+    }
+
+
+def get_activity_page_size(params):
+    raw = params.get('page_size', '').strip()
+    try:
+        page_size = int(raw) if raw else DEFAULT_ACTIVITY_PAGE_SIZE
+    except ValueError:
+        logger.warning(f"Valor inválido para page_size: {raw}")
+        page_size = DEFAULT_ACTIVITY_PAGE_SIZE
+    return min(max(page_size, 1), MAX_ACTIVITY_PAGE_SIZE)
+
+
+def _day_start(value, name):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        logger.warning(f"Fecha inválida para {name}: {value}")
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def apply_activity_filters(queryset, filters):
+    """Aplica los filtros de usuario, tipo, tarea y fechas a un queryset de actividades"""
+    for name, field in (('user', 'user_id'), ('task', 'task_id')):
+        value = filters.get(name)
+        if value:
+            try:
+                queryset = queryset.filter(**{field: int(value)})
+            except ValueError:
+                logger.warning(f"Valor inválido para {name}: {value}")
+
+    activity_type = filters.get('type')
+    if activity_type:
+        if activity_type in ACTIVITY_TYPES:
+            queryset = queryset.filter(activity_type=activity_type)
+        else:
+            logger.warning(f"Tipo de actividad inválido: {activity_type}")
+
+    # Rangos sobre created_at (no __date) para que usen el índice
+    if filters.get('from'):
+        start = _day_start(filters['from'], 'from')
+        if start:
+            queryset = queryset.filter(created_at__gte=start)
+    if filters.get('to'):
+        end = _day_start(filters['to'], 'to')
+        if end:
+            queryset = queryset.filter(created_at__lt=end + timedelta(days=1))
+    return queryset
+
+
+def encode_activity_cursor(activity):
+    raw = f'{activity.created_at.isoformat()}|{activity.id}'
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_activity_cursor(cursor):
+    """Retorna (created_at, id) del cursor. Lanza ValueError si no es válido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        moment, activity_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii').split('|')
+        return datetime.fromisoformat(moment), int(activity_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
+
+def get_activity_page(activities, filters=None, after=None, page_size=DEFAULT_ACTIVITY_PAGE_SIZE):
+    """
+    Página de ``activities`` (de la más reciente a la más antigua) a partir del
+    cursor ``after``. Retorna (actividades, cursor de la siguiente página o None).
+    """
+    activities = apply_activity_filters(activities, filters or {})
+    if after:
+        created_at, activity_id = decode_activity_cursor(after)
+        activities = activities.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=activity_id))
+    page = list(activities.order_by('-created_at', '-id')[:page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_activity_cursor(page[-1])
+    return page, None
@@ -0,0 +1,299 @@
+"""
+Registro de actividades fuera de la petición.
+
+kanban.views.log_activities() solo copia los datos de cada actividad (IDs,
+títulos, usuario) y, cuando se confirma la transacción de la petición
+(transaction.on_commit), los deja en una cola en memoria. Un hilo de fondo la
+vacía por lotes: verifica con una consulta qué usuarios del lote pueden
+registrar actividades, guarda todo con un bulk_create y lo envía por WebSocket
+con un group_send por grupo del tablero (ver activity_groups). La latencia de
+las mutaciones ya no depende de la tabla de actividades ni del channel layer.
+
+Si la transacción se revierte, sus actividades no se registran. Al terminar el
+proceso (atexit) se escribe lo que quede en la cola. Con
+ACTIVITY_LOG_BUFFERED = False se escriben en el momento, dentro de la
+petición, como antes.
+
+Las pruebas y los comandos que leen las actividades justo después de
+registrarlas deben llamar antes a flush_activities(): el hilo de fondo puede no
+haberlas escrito todavía.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .activity_rollups import add_to_rollups, rollup_counts
+from .board_cache import bump_board_version
+from .board_context import get_shared_admin_user, get_user_for_board
+from .models import Activity, Invitation, List, Task, Subtask
+
+logger = logging.getLogger(__name__)
+
+# Grupos de WebSocket por tablero: los administradores reciben todas las
+# actividades del tablero y cada estudiante solo las suyas, como en
+# board_sections.get_visible_activities
+ADMINS_GROUP = 'kanban.board.{board_id}.admins'
+MEMBER_GROUP = 'kanban.board.{board_id}.user.{user_id}'
+
+# Actividades que se escriben como máximo en cada lote
+ACTIVITY_BATCH_SIZE = 200
+
+# Segundos que el hilo espera nuevas actividades antes de revisar si debe terminar
+_POLL_INTERVAL = 0.5
+
+# Segundos que se espera al hilo de fondo al terminar el proceso
+_SHUTDOWN_TIMEOUT = 30
+
+_ACTIVITY_LABELS = dict(Activity.ACTIVITY_TYPES)
+
+
+def _snapshot(user, entry):
+    """Datos de la actividad tomados en la petición, para no volver a leer la tarea, lista o subtarea"""
+    task, list_obj, subtask = entry.get('task'), entry.get('list_obj'), entry.get('subtask')
+    # Mismo orden que el antiguo Activity.related_creator: tarea, subtarea, lista
+    creator_ids = [obj.created_by_id for obj in (task, subtask, list_obj) if obj and obj.created_by_id]
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'is_admin': user.is_staff or user.is_superuser,
+        'activity_type': entry['activity_type'],
+        'description': entry['description'],
+        'task_id': task.id if task else None,
+        'task_title': task.title if task else None,
+        'list_id': list_obj.id if list_obj else None,
+        'list_name': list_obj.name if list_obj else None,
+        'subtask_id': subtask.id if subtask else None,
+        'subtask_title': subtask.title if subtask else None,
+        'creator_id': creator_ids[0] if creator_ids else None,
+        # Hora de la petición: el lote puede escribirse un rato después
+        'created_at': timezone.now(),
+    }
+
+
+def activity_groups(user):
+    """Grupos de WebSocket de ``user``, en el tablero que le asigna get_user_for_board"""
+    board_id = get_user_for_board(user).id
+    if user.is_staff or user.is_superuser:
+        return [ADMINS_GROUP.format(board_id=board_id)]
+    return [MEMBER_GROUP.format(board_id=board_id, user_id=user.id)]
+
+
+def _existing_ids(model, ids):
+    ids = {obj_id for obj_id in ids if obj_id is not None}
+    if not ids:
+        return set()
+    return set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def write_activities(snapshots, broadcast=True):
+    """
+    Guarda las actividades de ``snapshots`` (ver save_activities) y, si
+    ``broadcast``, las envía por WebSocket. Retorna las actividades creadas.
+    """
+    board_id, activities, saved = save_activities(snapshots)
+    if broadcast and activities:
+        broadcast_activities(board_id, activities, saved)
+    return activities
+
+
+def save_activities(snapshots):
+    """
+    Guarda las actividades de ``snapshots`` con un solo INSERT y las suma a los
+    resúmenes diarios (kanban.activity_rollups). Se descartan las de
+    estudiantes sin invitación aceptada; las referencias a elementos eliminados
+    desde entonces quedan en NULL, como con on_delete=SET_NULL, pero sus
+    nombres quedan en Activity.snapshot. Retorna (id del tablero, actividades
+    creadas, snapshots guardados).
+    """
+    if not snapshots:
+        return None, [], []
+    user_ids = {snapshot['user_id'] for snapshot in snapshots}
+    creator_ids = {snapshot.get('creator_id') for snapshot in snapshots} - {None}
+    usernames = dict(User.objects.filter(id__in=user_ids | creator_ids).values_list('id', 'username'))
+    existing_users = user_ids & usernames.keys()
+    invited = set(Invitation.objects.filter(
+        student_id__in=user_ids, accepted=True
+    ).values_list('student_id', flat=True))
+    allowed = [
+        snapshot for snapshot in snapshots
+        if snapshot['user_id'] in existing_users and (snapshot['is_admin'] or snapshot['user_id'] in invited)
+    ]
+    if not allowed:
+        return None, [], []
+
+    tasks = _existing_ids(Task, (snapshot['task_id'] for snapshot in allowed))
+    lists = _existing_ids(List, (snapshot['list_id'] for snapshot in allowed))
+    subtasks = _existing_ids(Subtask, (snapshot['subtask_id'] for snapshot in allowed))
+    with transaction.atomic():
+        activities = Activity.objects.bulk_create([
+            Activity(
+                user_id=snapshot['user_id'],
+                activity_type=snapshot['activity_type'],
+                description=snapshot['description'],
+                task_id=snapshot['task_id'] if snapshot['task_id'] in tasks else None,
+                list_id=snapshot['list_id'] if snapshot['list_id'] in lists else None,
+                subtask_id=snapshot['subtask_id'] if snapshot['subtask_id'] in subtasks else None,
+                created_at=snapshot['created_at'],
+                snapshot=Activity.build_snapshot(
+                    snapshot['username'],
+                    task_title=snapshot['task_title'],
+                    list_name=snapshot['list_name'],
+                    subtask_title=snapshot['subtask_title'],
+                    creator=usernames.get(snapshot.get('creator_id')),
+                ),
+            )
+            for snapshot in allowed
+        ])
+        # Solo registran actividades los administradores y los estudiantes invitados,
+        # es decir, siempre en el tablero compartido (ver get_user_for_board)
+        board_user = get_shared_admin_user()
+        board_id = board_user.id
+        add_to_rollups(rollup_counts(activities, board_id))
+        # /api/board/ incluye las actividades en la instantánea cacheada: una
+        # lectura hecha antes de este lote no debe seguir respondiendo 304
+        bump_board_version(board_user)
+    return board_id, activities, allowed
+
+
+def broadcast_activities(board_id, activities, snapshots):
+    """
+    Envía las actividades en tiempo real a los grupos del tablero ``board_id``:
+    todas a sus administradores y las de cada estudiante a su propio grupo, con
+    un mensaje por grupo.
+    """
+    try:
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            logger.warning("Channel layer no disponible. Las notificaciones en tiempo real no funcionarán.")
+            return
+        admins_group = ADMINS_GROUP.format(board_id=board_id)
+        groups = {admins_group: []}
+        for activity, snapshot in zip(activities, snapshots):
+            payload = {
+                'type': 'activity',
+                'activity_id': activity.id,
+                'user': activity.snapshot['username'],
+                'activity_type': _ACTIVITY_LABELS.get(activity.activity_type, activity.activity_type),
+                'description': activity.description,
+                'created_at': activity.created_at.strftime('%d/%m/%Y %H:%M:%S'),
+                'task_id': activity.task_id,
+                'task_title': activity.snapshot['task_title'],
+                'subtask_id': activity.subtask_id,
+                'subtask_title': activity.snapshot['subtask_title'],
+                'list_id': activity.list_id,
+                'list_name': activity.snapshot['list_name'],
+                'creator': activity.snapshot['creator'],
+            }
+            groups[admins_group].append(payload)
+            if not snapshot['is_admin']:
+                member_group = MEMBER_GROUP.format(board_id=board_id, user_id=activity.user_id)
+                groups.setdefault(member_group, []).append(payload)
+        for group, payloads in groups.items():
+            async_to_sync(channel_layer.group_send)(
+                group,
+                {
+                    'type': 'activity_batch',
+                    'payloads': payloads,
+                }
+            )
+        logger.info(f"Notificación de {len(activities)} actividad(es) enviada a {len(groups)} grupo(s)")
+    except Exception as e:
+        logger.error(f"Error al enviar notificación en tiempo real: {e}", exc_info=True)
+
+
+class ActivityBuffer:
+    """Cola de actividades pendientes y el hilo que las escribe por lotes"""
+
+    def __init__(self, batch_size=ACTIVITY_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, snapshots):
+        self._queue.put(snapshots)
+        if self._stopping.is_set():
+            # Durante el cierre ya no hay hilo: escribir en el momento
+            self.flush(broadcast=False)
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='kanban-activity-log', daemon=True)
+                self._thread.start()
+
+    def _take(self, timeout=None):
+        """Hasta batch_size actividades de la cola; espera ``timeout`` segundos por la primera"""
+        batch = []
+        try:
+            batch.extend(self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait())
+            while len(batch) < self.batch_size:
+                batch.extend(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch, broadcast=True):
+        try:
+            board_id, activities, saved = save_activities(batch)
+            # Se revisa después de guardar: si el proceso empezó a terminar mientras
+            # tanto, async_to_sync ya no puede crear hilos
+            if broadcast and activities and not self._stopping.is_set():
+                broadcast_activities(board_id, activities, saved)
+        except Exception as e:
+            logger.error(f"No se pudieron registrar {len(batch)} actividad(es): {e}", exc_info=True)
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                batch = self._take(timeout=_POLL_INTERVAL)
+                if batch:
+                    close_old_connections()
+                    self._write(batch)
+        finally:
+            connection.close()
+
+    def flush(self, broadcast=True):
+        """Escribe en el hilo actual todo lo que haya en la cola"""
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            self._write(batch, broadcast=broadcast)
+
+    def stop(self):
+        """Detiene el hilo y escribe lo pendiente (se llama al terminar el proceso)"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=_SHUTDOWN_TIMEOUT)
+        # Al cerrar el intérprete async_to_sync ya no puede crear hilos: solo se guardan
+        self.flush(broadcast=False)
+
+
+_buffer = ActivityBuffer()
+atexit.register(_buffer.stop)
+
+
+def flush_activities():
+    """Escribe ahora las actividades pendientes (útil en comandos y pruebas)"""
+    _buffer.flush()
+
+
+def record_activities(user, entries):
+    """Registra las actividades de ``user`` cuando se confirme la transacción actual"""
+    snapshots = [_snapshot(user, entry) for entry in entries]
+    if not getattr(settings, 'ACTIVITY_LOG_BUFFERED', True):
+        return write_activities(snapshots)
+    transaction.on_commit(lambda: _buffer.put(snapshots))
+    return []
@@ -0,0 +1,132 @@
+"""
+Retención de actividades.
+
+Las actividades más antiguas que su ventana de retención salen de la tabla
+Activity (y sus comentarios de ActivityComment) para que la tabla caliente y
+sus índices se mantengan chicos:
+
+- La ventana es ACTIVITY_RETENTION_DAYS, salvo los tipos que tengan una propia
+  en ACTIVITY_RETENTION_DAYS_BY_TYPE (por ejemplo, mover tareas o completar
+  subtareas, que son muchas y se consultan poco).
+- Cada lote de ACTIVITY_ARCHIVE_BATCH_SIZE actividades se guarda en un archivo
+  NDJSON comprimido con gzip en activity_archive/AAAA/MM/ del almacenamiento,
+  registrado en ActivityArchive, con una línea por actividad y sus comentarios.
+- Los resúmenes de ActivityDailyRollup ya las contaron al escribirlas (ver
+  kanban.activity_rollups), así el historial sigue consultable por día aunque
+  las filas ya no estén.
+
+compact_activities() la ejecuta Celery Beat una vez al día.
+"""
+import gzip
+import logging
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .board_cache import bump_board_version
+from .board_context import get_shared_admin_user
+from .models import Activity, ActivityComment, ActivityArchive
+from .renderers import ORJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Actividades por archivo (y por transacción)
+ACTIVITY_ARCHIVE_BATCH_SIZE = 5000
+
+_renderer = ORJSONRenderer()
+
+
+def get_retention_windows():
+    """(días por defecto, {tipo: días}) según la configuración"""
+    default_days = getattr(settings, 'ACTIVITY_RETENTION_DAYS', 365)
+    by_type = dict(getattr(settings, 'ACTIVITY_RETENTION_DAYS_BY_TYPE', {}))
+    return default_days, by_type
+
+
+def expired_activities(now=None):
+    """Actividades que ya superaron su ventana de retención"""
+    now = now or timezone.now()
+    default_days, by_type = get_retention_windows()
+    expired = Q(created_at__lt=now - timedelta(days=default_days)) & ~Q(activity_type__in=list(by_type))
+    for activity_type, days in by_type.items():
+        expired |= Q(activity_type=activity_type, created_at__lt=now - timedelta(days=days))
+    return Activity.objects.filter(expired)
+
+
+def _archive_rows(activity_ids):
+    """Filas de las actividades con sus comentarios, en orden de creación"""
+    activities = list(
+        Activity.objects.filter(id__in=activity_ids).order_by('created_at', 'id').values(
+            'id', 'user_id', 'activity_type', 'description', 'task_id', 'list_id', 'subtask_id', 'snapshot',
+            'created_at', username=F('user__username'),
+        )
+    )
+    comments = {}
+    for comment in ActivityComment.objects.filter(activity_id__in=activity_ids).order_by('created_at', 'id').values(
+        'id', 'activity_id', 'comment', 'created_at', author_username=F('author__username')
+    ):
+        comments.setdefault(comment.pop('activity_id'), []).append(comment)
+    for activity in activities:
+        activity['comments'] = comments.get(activity['id'], [])
+    return activities
+
+
+def archive_activity_batch(activity_ids):
+    """
+    Guarda en un archivo las actividades ``activity_ids`` y las borra de la
+    tabla. Sube la versión del tablero compartido (donde se muestran las
+    actividades) para que /api/board/ deje de servirlas desde la caché.
+    Retorna el ActivityArchive creado.
+    """
+    rows = _archive_rows(activity_ids)
+    if not rows:
+        return None
+    oldest, newest = rows[0]['created_at'], rows[-1]['created_at']
+    with tempfile.TemporaryFile() as output:
+        with gzip.GzipFile(fileobj=output, mode='wb') as archive:
+            for row in rows:
+                archive.write(_renderer.render(row) + b'\n')
+        output.seek(0)
+        name = f'activity_archive/{oldest:%Y/%m}/{oldest:%Y%m%d}-{uuid.uuid4().hex[:12]}.ndjson.gz'
+        path = default_storage.save(name, File(output))
+
+    try:
+        with transaction.atomic():
+            record = ActivityArchive.objects.create(
+                file=path,
+                oldest=oldest,
+                newest=newest,
+                activities=len(rows),
+                comments=sum(len(row['comments']) for row in rows),
+            )
+            Activity.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            bump_board_version(get_shared_admin_user())
+    except Exception:
+        # Sin el registro el archivo quedaría huérfano
+        default_storage.delete(path)
+        raise
+    return record
+
+
+def compact_activities(now=None, batch_size=ACTIVITY_ARCHIVE_BATCH_SIZE):
+    """Archiva por lotes las actividades vencidas. Retorna cuántas actividades y archivos se generaron."""
+    expired = expired_activities(now)
+    archived = files = 0
+    while True:
+        activity_ids = list(expired.order_by('created_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not activity_ids:
+            break
+        record = archive_activity_batch(activity_ids)
+        if record is None:
+            break
+        archived += record.activities
+        files += 1
+        logger.info(f"Actividades archivadas en {record.file.name}: {record.activities}")
+    return {'archived': archived, 'files': files}
@@ -0,0 +1,129 @@
+"""
+Resúmenes de actividad por día, tablero, usuario y tipo.
+
+ActivityDailyRollup guarda cuántas actividades registró cada usuario en cada
+tablero, por tipo y por día. Se actualiza a medida que se escriben las
+actividades (kanban.activity_log.save_activities suma cada lote), así que
+incluye también las que la retención ya sacó de la tabla Activity
+(kanban.activity_retention).
+
+Las consultas de /api/analytics/activity/ leen solo estos resúmenes: a lo sumo
+una fila por día, usuario y tipo, sin importar cuántas actividades haya.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .board_context import is_shared_board_member
+from .models import Activity, ActivityDailyRollup, Invitation
+
+# Días que abarca el análisis si no se pide un rango
+DEFAULT_ANALYTICS_DAYS = 7
+
+# Rango máximo del análisis en días
+MAX_ANALYTICS_DAYS = 366
+
+_ACTIVITY_LABELS = dict(Activity.ACTIVITY_TYPES)
+
+
+def rollup_counts(activities, board_user_id):
+    """{(día, tablero, usuario, tipo): cantidad} de ``activities`` del tablero board_user_id"""
+    return Counter(
+        (timezone.localdate(activity.created_at), board_user_id, activity.user_id, activity.activity_type)
+        for activity in activities
+    )
+
+
+def add_to_rollups(counts):
+    """
+    Suma ``counts`` (ver rollup_counts) a ActivityDailyRollup. Las filas que
+    faltan se crean ignorando conflictos y luego se incrementan en la base, así
+    dos procesos pueden sumar al mismo día sin perder cuentas.
+    """
+    if not counts:
+        return
+    ActivityDailyRollup.objects.bulk_create([
+        ActivityDailyRollup(day=day, board_user_id=board_user_id, user_id=user_id, activity_type=activity_type)
+        for day, board_user_id, user_id, activity_type in counts
+    ], ignore_conflicts=True)
+    for (day, board_user_id, user_id, activity_type), count in counts.items():
+        ActivityDailyRollup.objects.filter(
+            day=day, board_user_id=board_user_id, user_id=user_id, activity_type=activity_type
+        ).update(count=F('count') + count)
+
+
+def get_visible_activity_users(user):
+    """
+    IDs de los usuarios cuyas actividades puede analizar ``user`` (los mismos
+    de get_visible_activities), o None si no puede ver actividades.
+    """
+    if user.is_staff or user.is_superuser:
+        invited = Invitation.objects.filter(admin=user, accepted=True).values_list('student_id', flat=True)
+        return [user.id, *invited]
+    if is_shared_board_member(user):
+        return [user.id]
+    return None
+
+
+def get_analytics_range(params, today=None):
+    """
+    (desde, hasta) de ?from= y ?to= (AAAA-MM-DD, ambos inclusive); por defecto
+    los últimos DEFAULT_ANALYTICS_DAYS días. Lanza ValueError si no es válido.
+    """
+    today = today or timezone.localdate()
+    try:
+        end = datetime.strptime(params['to'], '%Y-%m-%d').date() if params.get('to') else today
+        start = (
+            datetime.strptime(params['from'], '%Y-%m-%d').date() if params.get('from')
+            else end - timedelta(days=DEFAULT_ANALYTICS_DAYS - 1)
+        )
+    except ValueError:
+        raise ValueError('Fechas inválidas (use AAAA-MM-DD)')
+    if start > end:
+        raise ValueError('La fecha "from" es posterior a "to"')
+    if (end - start).days >= MAX_ANALYTICS_DAYS:
+        raise ValueError(f'El rango no puede superar {MAX_ANALYTICS_DAYS} días')
+    return start, end
+
+
+def get_activity_analytics(board_user, user_ids, start, end):
+    """
+    Totales de actividad del tablero entre ``start`` y ``end`` (inclusive) para
+    ``user_ids``: por día (con los días sin actividad en 0), por usuario, por
+    tipo y por usuario y día.
+    """
+    rollups = ActivityDailyRollup.objects.filter(
+        board_user=board_user, user_id__in=user_ids, day__gte=start, day__lte=end
+    )
+    by_day = dict(rollups.values_list('day').annotate(total=Sum('count')).order_by())
+    by_user = list(rollups.values('user_id').annotate(total=Sum('count')).order_by('-total', 'user_id'))
+    by_type = list(rollups.values('activity_type').annotate(total=Sum('count')).order_by('-total', 'activity_type'))
+    by_user_day = list(rollups.values('user_id', 'day').annotate(total=Sum('count')).order_by('user_id', 'day'))
+
+    usernames = dict(User.objects.filter(id__in=[row['user_id'] for row in by_user]).values_list('id', 'username'))
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    return {
+        'from': start,
+        'to': end,
+        'total': sum(by_day.values()),
+        'days': [{'day': day, 'count': by_day.get(day, 0)} for day in days],
+        'users': [
+            {'user_id': row['user_id'], 'username': usernames.get(row['user_id']), 'count': row['total']}
+            for row in by_user
+        ],
+        'types': [
+            {
+                'activity_type': row['activity_type'],
+                'label': _ACTIVITY_LABELS.get(row['activity_type'], row['activity_type']),
+                'count': row['total'],
+            }
+            for row in by_type
+        ],
+        'user_days': [
+            {'user_id': row['user_id'], 'day': row['day'], 'count': row['total']}
+            for row in by_user_day
+        ],
+    }
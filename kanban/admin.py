@@ -1,24 +1,24 @@
 from django.contrib import admin
-from .models import List, Task, Subtask, Invitation, Activity, BoardPreference
+from .models import List, Task, Subtask, Invitation, Activity, ActivityDailyRollup, ActivityArchive, BoardPreference
 
 
 @admin.register(List)
 class ListAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'order', 'color', 'created_by')
+    list_display = ('name', 'user', 'rank', 'color', 'created_by')
     list_filter = ('user', 'color', 'created_by')
     search_fields = ('name', 'user__username', 'created_by__username')
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'list', 'order', 'created_by', 'due_date')
+    list_display = ('title', 'list', 'rank', 'created_by', 'due_date')
     list_filter = ('list', 'created_by', 'due_date')
     search_fields = ('title', 'list__name', 'created_by__username')
 
 
 @admin.register(Subtask)
 class SubtaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'task', 'completed', 'order', 'created_by', 'due_date')
+    list_display = ('title', 'task', 'completed', 'rank', 'created_by', 'due_date')
     list_filter = ('completed', 'task', 'created_by', 'due_date')
     search_fields = ('title', 'task__title', 'created_by__username')
 
@@ -32,15 +32,31 @@ class InvitationAdmin(admin.ModelAdmin):
 
 @admin.register(Activity)
 class ActivityAdmin(admin.ModelAdmin):
-    list_display = ('user', 'activity_type', 'description', 'get_creator', 'created_at')
+    list_display = ('get_username', 'activity_type', 'description', 'get_creator', 'created_at')
     list_filter = ('activity_type', 'created_at')
     search_fields = ('user__username', 'description', 'task__title', 'subtask__title', 'list__name')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('snapshot', 'created_at')
+
+    @admin.display(description='Usuario')
+    def get_username(self, obj):
+        return obj.snapshot.get('username') or '-'
 
     @admin.display(description='Creado por')
     def get_creator(self, obj):
-        creator = obj.related_creator
-        return creator.username if creator else '-'
+        return obj.snapshot.get('creator') or '-'
+
+
+@admin.register(ActivityDailyRollup)
+class ActivityDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'board_user', 'user', 'activity_type', 'count')
+    list_filter = ('activity_type', 'day')
+    search_fields = ('user__username',)
+
+
+@admin.register(ActivityArchive)
+class ActivityArchiveAdmin(admin.ModelAdmin):
+    list_display = ('file', 'oldest', 'newest', 'activities', 'comments', 'created_at')
+    readonly_fields = ('file', 'oldest', 'newest', 'activities', 'comments', 'created_at')
 
 
 @admin.register(BoardPreference)
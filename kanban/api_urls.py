@@ -10,9 +10,15 @@ urlpatterns = [
     
     # Tablero
     path('board/', api_views.api_board, name='board'),
+    path('board/changes/', api_views.api_board_changes, name='board_changes'),
+    path('board/students/', api_views.api_board_students, name='board_students'),
+    path('board/creators/', api_views.api_board_creators, name='board_creators'),
+    path('search/', api_views.api_search, name='search'),
+    path('archive/', api_views.api_archive, name='archive'),
     
     # Listas
     path('lists/', api_views.api_create_list, name='create_list'),
+    path('lists/<int:list_id>/tasks/', api_views.api_list_tasks, name='list_tasks'),
     path('lists/<int:list_id>/delete/', api_views.api_delete_list, name='delete_list'),
     path('lists/<int:list_id>/color/', api_views.api_change_list_color, name='change_list_color'),
     
@@ -21,6 +27,7 @@ urlpatterns = [
     path('tasks/<int:task_id>/', api_views.api_update_task, name='update_task'),
     path('tasks/<int:task_id>/delete/', api_views.api_delete_task, name='delete_task'),
     path('tasks/<int:task_id>/move/', api_views.api_move_task, name='move_task'),
+    path('tasks/<int:task_id>/restore/', api_views.api_restore_task, name='restore_task'),
     
     # Subtareas
     path('tasks/<int:task_id>/subtasks/', api_views.api_create_subtask, name='create_subtask'),
@@ -30,6 +37,7 @@ urlpatterns = [
     
     # Actividades
     path('activities/', api_views.api_activities, name='activities'),
+    path('analytics/activity/', api_views.api_activity_analytics, name='activity_analytics'),
     
     # Calendario
     path('calendar/', api_views.api_calendar, name='calendar'),
@@ -39,6 +47,14 @@ urlpatterns = [
     path('reorder-tasks/', api_views.api_reorder_tasks, name='reorder_tasks'),
     path('reorder-subtasks/', api_views.api_reorder_subtasks, name='reorder_subtasks'),
     
+    # Operaciones en lote
+    path('batch/', api_views.api_batch, name='batch'),
+    
+    # Importación y exportación del tablero
+    path('import/', api_views.api_import_board, name='import_board'),
+    path('export/', api_views.api_export_board, name='export_board'),
+    path('export/<str:token>/', api_views.api_download_export, name='download_export'),
+    
     # Adjuntos
     path('tasks/<int:task_id>/attachments/', api_views.api_upload_task_attachment, name='upload_task_attachment'),
     path('subtasks/<int:subtask_id>/attachments/', api_views.api_upload_subtask_attachment, name='upload_subtask_attachment'),
@@ -3,25 +3,45 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.db.models import Max, Prefetch, Q
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import authenticate, login
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from datetime import datetime, timedelta
+import io
 import json
+import os
 
 from .models import List, Task, Subtask, Activity, ActivityComment, Invitation, BoardPreference, TaskAttachment, SubtaskAttachment, TwoFactorProfile
 from .serializers import (
-    ListSerializer, TaskSerializer, SubtaskSerializer, ActivitySerializer,
-    InvitationSerializer, BoardPreferenceSerializer, UserSerializer
+    ListSerializer, TaskSerializer, ArchivedTaskSerializer, SubtaskSerializer, ActivitySerializer, UserSerializer
 )
 from .views import (
-    get_user_for_board, can_delete, get_board_preference, ensure_default_lists,
+    get_user_for_board, can_delete, get_board_preference,
     log_activity, get_pending_2fa_user, clear_pending_2fa_session, login_with_backend,
     get_two_factor_profile
 )
-from .tasks import send_board_reminders_to_all_users
+from .board import get_board_filters, get_page_size, get_list_tasks_page, DEFAULT_TASKS_PAGE_SIZE
+from .board_cache import bump_board_version, board_etag, etag_matches, get_board_snapshot, set_board_snapshot
+from .search import search_board, DEFAULT_SEARCH_LIMIT
+from .board_sections import (
+    build_board_payload, parse_sections, parse_task_fields, get_visible_activities,
+    get_invitable_students, get_board_creators
+)
+from .changes import record_deletion, decode_cursor, get_board_changes, reset_response
+from .calendar_items import iter_calendar_items
+from .streaming import wants_stream, stream_response, iter_board_json, iter_calendar_json
+from .batch import BatchError, run_batch
+from .importing import ImportFormatError, detect_format, import_board, iter_import_items
+from .exporting import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, export_filename, iter_export, open_export
+from .archive import search_archived_tasks, restore_task
+from .activity_feed import get_activity_filters, get_activity_page, get_activity_page_size
+from .activity_rollups import get_visible_activity_users, get_analytics_range, get_activity_analytics
+from .board_context import get_board_context
+from .ranking import rank_for_position
+from .reorder import reorder_lists, reorder_tasks, reorder_subtasks
+from .tasks import send_board_reminders_to_all_users, export_board
 
 import logging
 logger = logging.getLogger(__name__)
@@ -368,185 +388,233 @@ def api_login(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_board(request):
-    """Endpoint API para obtener el tablero completo"""
-    from django.contrib.auth.models import User
-    from django.templatetags.static import static
-    from .views import (
-        get_user_type, BOARD_COLORS, hex_to_rgba, get_board_color, get_max_attachment_size
-    )
+    """
+    Endpoint API para obtener el tablero completo.
+    ?include= limita las secciones calculadas y ?fields= los campos de cada tarea
+    (ver kanban.board_sections).
+    """
+    board_user = get_board_context(request).board_user
     
-    is_admin = request.user.is_staff or request.user.is_superuser
-    is_invited = False
-    board_user = get_user_for_board(request.user)
+    # Filtros
+    filters = get_board_filters(request.GET)
+    logger.info(f"API BOARD - Filtros recibidos: {filters}")
     
-    ensure_default_lists(board_user)
+    # Paginación opcional de tareas por lista (?page_size= o BOARD_TASKS_PAGE_SIZE)
+    page_size = get_page_size(request.GET)
     
-    # Filtros
-    search_query = request.GET.get('q', '').strip()
-    creator_filter = request.GET.get('creator', '').strip()
-    due_from = request.GET.get('due_from', '').strip()
-    due_to = request.GET.get('due_to', '').strip()
-    
-    logger.info(f"=== API BOARD - Filtros recibidos ===")
-    logger.info(f"q: {search_query}")
-    logger.info(f"creator: {creator_filter}")
-    logger.info(f"due_from: {due_from}")
-    logger.info(f"due_to: {due_to}")
-    logger.info(f"request.GET completo: {dict(request.GET)}")
-    
-    all_task_qs = Task.objects.filter(list__user=board_user)
-    task_filters = all_task_qs
-    initial_count = task_filters.count()
-    logger.info(f"Tareas iniciales (sin filtros): {initial_count}")
-    
-    if search_query:
-        task_filters = task_filters.filter(title__icontains=search_query)
-        logger.info(f"Aplicado filtro de búsqueda: '{search_query}' - Tareas después: {task_filters.count()}")
-    
-    if creator_filter:
-        if creator_filter == 'none':
-            task_filters = task_filters.filter(created_by__isnull=True)
-            logger.info(f"Aplicado filtro de creador: 'none' - Tareas después: {task_filters.count()}")
-        else:
-            try:
-                creator_id = int(creator_filter)
-                task_filters = task_filters.filter(created_by_id=creator_id)
-                logger.info(f"Aplicado filtro de creador: ID {creator_id} - Tareas después: {task_filters.count()}")
-            except ValueError:
-                logger.warning(f"Valor inválido para creator_filter: {creator_filter}")
+    try:
+        sections = parse_sections(request.GET)
+        task_fields = parse_task_fields(request.GET)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    preference = get_board_context(request).preference
+    etag = board_etag(
+        request, board_user, preference.version, filters,
+        page_size=page_size, sections=sections, task_fields=task_fields,
+        format=request.accepted_renderer.format
+    )
+    cache_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Accept'}
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    # ?stream=1: JSON escrito lista por lista, sin guardar instantánea (ver kanban.streaming).
+    # Con paginación la respuesta ya es acotada y se arma normalmente.
+    if page_size is None and wants_stream(request):
+        return stream_response(request, iter_board_json(
+            request, board_user, preference, sections, filters=filters, task_fields=task_fields
+        ), headers=cache_headers)
+    cached_data = get_board_snapshot(etag)
+    if cached_data is not None:
+        return Response(cached_data, headers=cache_headers)
+    
+    data = build_board_payload(
+        request, board_user, preference, sections,
+        filters=filters, page_size=page_size, task_fields=task_fields
+    )
+    set_board_snapshot(etag, data)
+    return Response(data, headers=cache_headers)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_board_changes(request):
+    """
+    Cambios del tablero desde el cursor ``since`` (ver kanban.changes).
+    Sin cursor, o con uno de otro tablero, responde reset=True con un cursor nuevo.
+    """
+    board_user = get_board_context(request).board_user
+    cursor = request.GET.get('since', '').strip()
+    if not cursor:
+        return Response(reset_response(board_user))
     
-    if due_from:
-        try:
-            due_from_date = datetime.strptime(due_from, '%Y-%m-%d').date()
-            task_filters = task_filters.filter(due_date__gte=due_from_date)
-            logger.info(f"Aplicado filtro due_from: {due_from_date} - Tareas después: {task_filters.count()}")
-        except ValueError:
-            logger.warning(f"Fecha inválida para due_from: {due_from}")
+    try:
+        since = decode_cursor(cursor, board_user)
+    except ValueError:
+        return Response({'success': False, 'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
     
-    if due_to:
-        try:
-            due_to_date = datetime.strptime(due_to, '%Y-%m-%d').date()
-            task_filters = task_filters.filter(due_date__lte=due_to_date)
-            logger.info(f"Aplicado filtro due_to: {due_to_date} - Tareas después: {task_filters.count()}")
-        except ValueError:
-            logger.warning(f"Fecha inválida para due_to: {due_to}")
+    if since is None:
+        return Response(reset_response(board_user))
     
-    final_count = task_filters.count()
-    logger.info(f"Tareas finales (con filtros): {final_count}")
+    return Response(get_board_changes(board_user, since, request))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_list_tasks(request, list_id):
+    """
+    Página de tareas de una lista, ordenadas por (rank, id).
+    Acepta ?after=<cursor>, ?page_size=, ?fields= y los mismos filtros que /api/board/.
+    """
+    board_user = get_board_context(request).board_user
+    list_obj = get_object_or_404(List, id=list_id, user=board_user)
     
-    task_filters = task_filters.select_related('created_by', 'list').order_by('order')
+    filters = get_board_filters(request.GET)
+    page_size = get_page_size(request.GET, default=DEFAULT_TASKS_PAGE_SIZE)
     
-    task_attachment_prefetch = Prefetch(
-        'attachments',
-        queryset=TaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
-    )
-    subtask_attachment_prefetch = Prefetch(
-        'attachments',
-        queryset=SubtaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
-    )
-    subtask_prefetch = Prefetch(
-        'subtasks',
-        queryset=Subtask.objects.select_related('created_by').prefetch_related(subtask_attachment_prefetch).order_by('order')
-    )
-    task_filters = task_filters.prefetch_related(subtask_prefetch, task_attachment_prefetch)
+    try:
+        task_fields = parse_task_fields(request.GET)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    prefetch_tasks = Prefetch('tasks', queryset=task_filters, to_attr='filtered_tasks')
+    try:
+        tasks, next_cursor = get_list_tasks_page(
+            list_obj, filters, after=request.GET.get('after', '').strip(), page_size=page_size,
+            task_fields=task_fields
+        )
+    except ValueError:
+        return Response({'success': False, 'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
     
-    lists = List.objects.filter(user=board_user).select_related('created_by').prefetch_related(prefetch_tasks).order_by('order')
+    return Response({
+        'success': True,
+        'list_id': list_obj.id,
+        'tasks': TaskSerializer(tasks, many=True, context={'request': request}, fields=task_fields).data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_archive(request):
+    """
+    Página de tareas archivadas del tablero, de la más reciente a la más antigua.
+    Acepta ?after=<cursor>, ?page_size=, ?fields= y los mismos filtros que /api/board/.
+    """
+    board_user = get_board_context(request).board_user
+    filters = get_board_filters(request.GET)
+    page_size = get_page_size(request.GET, default=DEFAULT_TASKS_PAGE_SIZE)
     
-    board_color = get_board_color(board_user)
-    board_overlay_color = hex_to_rgba(board_color)
-    preference = get_board_preference(board_user)
-    if preference.background_image:
-        board_background_image = request.build_absolute_uri(preference.background_image.url)
-    else:
-        board_background_image = request.build_absolute_uri(static('kanban/img/board-bg.jpg'))
+    try:
+        task_fields = parse_task_fields(request.GET)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if task_fields is not None:
+        task_fields += ('archived_at',)
     
-    total_filtered_tasks = sum(len(getattr(lst, 'filtered_tasks', [])) for lst in lists)
-    
-    creator_ids = all_task_qs.exclude(created_by__isnull=True).values_list('created_by', flat=True).distinct()
-    creators = User.objects.filter(id__in=creator_ids).order_by('username')
-    
-    # Invitaciones
-    pending_invitations = Invitation.objects.none()
-    students = User.objects.none()
-    activities = Activity.objects.none()
-    can_view_activities = False
-    activities_heading = 'Actividades recientes'
-    
-    if is_admin:
-        invited_student_ids = Invitation.objects.filter(admin=request.user).values_list('student_id', flat=True)
-        students = User.objects.filter(is_staff=False, is_superuser=False).exclude(id__in=invited_student_ids)
-        pending_invitations = Invitation.objects.filter(admin=request.user, accepted=False)
-        invited_students = Invitation.objects.filter(admin=request.user, accepted=True).values_list('student_id', flat=True)
-        comment_prefetch = Prefetch(
-            'comments',
-            queryset=ActivityComment.objects.select_related('author').order_by('created_at')
+    try:
+        tasks, next_cursor = search_archived_tasks(
+            board_user, filters, after=request.GET.get('after', '').strip(), page_size=page_size,
+            task_fields=task_fields
         )
-        activities = Activity.objects.filter(
-            Q(user_id__in=invited_students) | Q(user=request.user)
-        ).select_related(
-            'user',
-            'task__created_by',
-            'task__list',
-            'list__created_by',
-            'subtask__created_by',
-            'subtask__task'
-        ).prefetch_related(comment_prefetch).order_by('-created_at')[:100]
-        can_view_activities = True
-        activities_heading = 'Actividades de usuarios invitados'
-    else:
-        is_invited = Invitation.objects.filter(student=request.user, accepted=True).exists()
-        if is_invited:
-            comment_prefetch = Prefetch(
-                'comments',
-                queryset=ActivityComment.objects.select_related('author').order_by('created_at')
-            )
-            activities = Activity.objects.filter(user=request.user).select_related(
-                'user',
-                'task__created_by',
-                'task__list',
-                'list__created_by',
-                'subtask__created_by',
-                'subtask__task'
-            ).prefetch_related(comment_prefetch).order_by('-created_at')[:100]
-            can_view_activities = True
-            activities_heading = 'Mis actividades'
-        pending_invitations = Invitation.objects.filter(student=request.user, accepted=False)
+    except ValueError:
+        return Response({'success': False, 'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'tasks': ArchivedTaskSerializer(tasks, many=True, context={'request': request}, fields=task_fields).data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_restore_task(request, task_id):
+    """Devolver una tarea archivada al final de su lista"""
+    board_user = get_board_context(request).board_user
+    task = get_object_or_404(Task.all_objects.archived().select_related('list'), id=task_id, list__user=board_user)
+    
+    restore_task(task)
+    log_activity(
+        request.user,
+        'move_task',
+        f'Restauró la tarea "{task.title}" del archivo en la lista "{task.list.name}"',
+        task=task,
+        list_obj=task.list
+    )
+    
+    return Response({
+        'success': True,
+        'message': 'Tarea restaurada exitosamente',
+        'task': TaskSerializer(task, context={'request': request}).data
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_search(request):
+    """
+    Búsqueda en el tablero ordenada por relevancia: títulos de tareas y subtareas,
+    nombres de adjuntos y descripciones de actividades. Acepta los filtros de
+    creador y fechas de /api/board/.
+    """
+    board_user = get_board_context(request).board_user
+    filters = get_board_filters(request.GET)
+    query = filters['q']
+    if not query:
+        return Response({'success': False, 'error': 'Parámetro q requerido'}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        tf_profile = request.user.two_factor_profile
-    except TwoFactorProfile.DoesNotExist:
-        tf_profile = None
+        limit = min(int(request.GET.get('limit', DEFAULT_SEARCH_LIMIT)), 200)
+    except ValueError:
+        limit = DEFAULT_SEARCH_LIMIT
     
+    results = search_board(board_user, query, filters, limit=max(limit, 1))
     return Response({
         'success': True,
-        'lists': ListSerializer(lists, many=True, context={'request': request}).data,
-        'user': UserSerializer(request.user).data,
-        'user_type': get_user_type(request.user),
-        'can_delete': can_delete(request.user),
-        'is_invited': is_invited if not is_admin else False,
-        'students': UserSerializer(students, many=True).data if is_admin else [],
-        'pending_invitations': InvitationSerializer(pending_invitations, many=True).data,
-        'activities': ActivitySerializer(activities, many=True).data if can_view_activities else [],
-        'can_view_activities': can_view_activities,
-        'activities_heading': activities_heading,
-        'board_colors': BOARD_COLORS,
-        'board_color': board_color,
-        'board_overlay_color': board_overlay_color,
-        'board_background_image': board_background_image,
-        'preferences': BoardPreferenceSerializer(preference, context={'request': request}).data,
-        'creators': UserSerializer(creators, many=True).data,
-        'filters': {
-            'q': search_query,
-            'creator': creator_filter,
-            'due_from': due_from,
-            'due_to': due_to,
-        },
-        'has_filters': any([search_query, creator_filter, due_from, due_to]),
-        'total_filtered_tasks': total_filtered_tasks,
-        'two_factor_enabled': tf_profile.enabled if tf_profile else False,
-        'attachment_max_size_mb': get_max_attachment_size() // (1024 * 1024),
+        'query': query,
+        'results': [
+            {
+                'task': {
+                    'id': result['task'].id,
+                    'title': result['task'].title,
+                    'list': result['task'].list_id,
+                    'list_name': result['task'].list.name,
+                    'due_date': result['task'].due_date,
+                    'created_by_username': result['task'].created_by.username if result['task'].created_by else None,
+                },
+                'rank': result['rank'],
+                'matched_in': result['matched_in'],
+                'subtasks': [
+                    {'id': subtask.id, 'title': subtask.title, 'completed': subtask.completed}
+                    for subtask in result['subtasks']
+                ],
+            }
+            for result in results
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_board_students(request):
+    """Estudiantes que el administrador puede invitar (sección students de /api/board/)"""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return Response({'success': True, 'students': []})
+    return Response({
+        'success': True,
+        'students': UserSerializer(get_invitable_students(request.user), many=True).data
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_board_creators(request):
+    """Creadores de tareas del tablero (sección creators de /api/board/)"""
+    board_user = get_board_context(request).board_user
+    return Response({
+        'success': True,
+        'creators': UserSerializer(get_board_creators(board_user), many=True).data
     })
 
 
@@ -562,17 +630,17 @@ def api_create_list(request):
             'error': 'El nombre de la lista es requerido'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
-    max_order = List.objects.filter(user=board_user).aggregate(Max('order'))['order__max'] or 0
+    board_user = get_board_context(request).board_user
     
     list_obj = List.objects.create(
         name=name,
         user=board_user,
-        order=max_order + 1,
+        rank=rank_for_position(List.objects.filter(user=board_user)),
         color='purple',
         created_by=request.user
     )
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'create_list',
@@ -596,7 +664,7 @@ def api_delete_list(request, list_id):
             'error': 'No tienes permisos para eliminar listas'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     list_obj = get_object_or_404(List, id=list_id, user=board_user)
     
     list_name = list_obj.name
@@ -610,6 +678,8 @@ def api_delete_list(request, list_id):
         list_obj=list_obj
     )
     
+    bump_board_version(board_user)
+    record_deletion(board_user, 'list', list_obj.id)
     list_obj.delete()
     
     return Response({
@@ -637,12 +707,13 @@ def api_change_list_color(request, list_id):
             'error': f'Color no válido: {new_color}. Colores válidos: {", ".join(valid_colors)}'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     list_obj = get_object_or_404(List, id=list_id, user=board_user)
     old_color = list_obj.color
     list_obj.color = new_color
     list_obj.save()
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'edit_list',
@@ -671,18 +742,17 @@ def api_create_task(request):
             'error': 'Lista y título son requeridos'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     list_obj = get_object_or_404(List, id=list_id, user=board_user)
     
-    max_order = list_obj.tasks.aggregate(Max('order'))['order__max'] or 0
-    
     task = Task.objects.create(
         title=title,
         list=list_obj,
-        order=max_order + 1,
+        rank=rank_for_position(list_obj.tasks.all()),
         created_by=request.user
     )
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'create_task',
@@ -701,7 +771,7 @@ def api_create_task(request):
 @permission_classes([IsAuthenticated])
 def api_update_task(request, task_id):
     """Actualizar una tarea"""
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     
     old_title = task.title
@@ -742,6 +812,7 @@ def api_update_task(request, task_id):
     
     task.save()
     
+    bump_board_version(board_user)
     if changes:
         log_activity(
             request.user,
@@ -767,7 +838,7 @@ def api_delete_task(request, task_id):
             'error': 'No tienes permisos para eliminar tareas'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     
     task_title = task.title
@@ -781,6 +852,8 @@ def api_delete_task(request, task_id):
         list_obj=task_list
     )
     
+    bump_board_version(board_user)
+    record_deletion(board_user, 'task', task.id)
     task.delete()
     
     return Response({
@@ -792,8 +865,14 @@ def api_delete_task(request, task_id):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def api_move_task(request, task_id):
-    """Mover una tarea a otra lista"""
+    """
+    Mover una tarea a otra lista (o dentro de la misma). Con ``after_id`` o
+    ``before_id`` queda justo después o antes de esa tarea; si no, al final.
+    Solo se escribe la fila de la tarea movida.
+    """
     new_list_id = request.data.get('list_id')
+    after_id = request.data.get('after_id')
+    before_id = request.data.get('before_id')
     
     if not new_list_id:
         return Response({
@@ -801,17 +880,24 @@ def api_move_task(request, task_id):
             'error': 'ID de lista es requerido'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     old_list = task.list
     new_list = get_object_or_404(List, id=new_list_id, user=board_user)
     
-    max_order = new_list.tasks.aggregate(Max('order'))['order__max'] or 0
-    
-    task.list = new_list
-    task.order = max_order + 1
-    task.save()
+    try:
+        with transaction.atomic():
+            siblings = Task.objects.filter(list=new_list).exclude(id=task.id)
+            task.rank = rank_for_position(siblings, after_id=after_id, before_id=before_id)
+            task.list = new_list
+            task.save(update_fields=['list', 'rank', 'updated_at'])
+    except (LookupError, ValueError) as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     
+    bump_board_version(board_user)
     # Registrar actividad y enviar notificación en tiempo real
     logger.info(f"Usuario {request.user.username} moviendo tarea {task.id} de lista {old_list.id} a {new_list.id}")
     log_activity(
@@ -841,19 +927,18 @@ def api_create_subtask(request, task_id):
             'error': 'El título de la subtarea es requerido'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     
-    max_order = task.subtasks.aggregate(Max('order'))['order__max'] or 0
-    
     subtask = Subtask.objects.create(
         title=title,
         task=task,
-        order=max_order + 1,
+        rank=rank_for_position(task.subtasks.all()),
         completed=False,
         created_by=request.user
     )
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'create_subtask',
@@ -873,7 +958,7 @@ def api_create_subtask(request, task_id):
 @permission_classes([IsAuthenticated])
 def api_update_subtask(request, subtask_id):
     """Actualizar una subtarea"""
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     
     old_title = subtask.title
@@ -922,6 +1007,7 @@ def api_update_subtask(request, subtask_id):
     
     subtask.save()
     
+    bump_board_version(board_user)
     if changes:
         log_activity(
             request.user,
@@ -948,7 +1034,7 @@ def api_delete_subtask(request, subtask_id):
             'error': 'No tienes permisos para eliminar subtareas'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     
     subtask_title = subtask.title
@@ -964,6 +1050,8 @@ def api_delete_subtask(request, subtask_id):
         subtask=subtask
     )
     
+    bump_board_version(board_user)
+    record_deletion(board_user, 'subtask', subtask.id)
     subtask.delete()
     
     return Response({
@@ -976,13 +1064,14 @@ def api_delete_subtask(request, subtask_id):
 @permission_classes([IsAuthenticated])
 def api_toggle_subtask(request, subtask_id):
     """Cambiar el estado de completado de una subtarea"""
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     
     old_completed = subtask.completed
     subtask.completed = not subtask.completed
     subtask.save()
     
+    bump_board_version(board_user)
     status_text = "completó" if subtask.completed else "descompletó"
     log_activity(
         request.user,
@@ -1002,61 +1091,73 @@ def api_toggle_subtask(request, subtask_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_activities(request):
-    """Obtener actividades"""
-    from .views import get_user_for_board
-    from django.db.models import Q
-    
-    is_admin = request.user.is_staff or request.user.is_superuser
-    comment_prefetch = Prefetch(
-        'comments',
-        queryset=ActivityComment.objects.select_related('author').order_by('created_at')
-    )
+    """
+    Página de actividades, de la más reciente a la más antigua.
+    Acepta ?after=<cursor>, ?page_size= y los filtros user, type, task, from y to.
+    """
+    activities, can_view_activities, _ = get_visible_activities(request.user)
     
-    if is_admin:
-        invited_students = Invitation.objects.filter(admin=request.user, accepted=True).values_list('student_id', flat=True)
-        activities = Activity.objects.filter(
-            Q(user_id__in=invited_students) | Q(user=request.user)
-        ).select_related(
-            'user',
-            'task__created_by',
-            'task__list',
-            'list__created_by',
-            'subtask__created_by',
-            'subtask__task'
-        ).prefetch_related(comment_prefetch).order_by('-created_at')
-    else:
-        is_invited = Invitation.objects.filter(student=request.user, accepted=True).exists()
-        if is_invited:
-            activities = Activity.objects.filter(user=request.user).select_related(
-                'user',
-                'task__created_by',
-                'task__list',
-                'list__created_by',
-                'subtask__created_by',
-                'subtask__task'
-            ).prefetch_related(comment_prefetch).order_by('-created_at')
-        else:
-            activities = Activity.objects.none()
+    try:
+        activities, next_cursor = get_activity_page(
+            activities, get_activity_filters(request.GET), after=request.GET.get('after', '').strip(),
+            page_size=get_activity_page_size(request.GET)
+        )
+    except ValueError:
+        return Response({'success': False, 'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'activities': ActivitySerializer(activities, many=True).data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_activity_analytics(request):
+    """
+    Totales de actividad por día, usuario y tipo desde los resúmenes diarios
+    (ver kanban.activity_rollups). Acepta ?from= y ?to= (AAAA-MM-DD, por
+    defecto los últimos 7 días) y ?user= para ver un solo usuario.
+    """
+    user_ids = get_visible_activity_users(request.user)
+    if user_ids is None:
+        return Response({
+            'success': False,
+            'error': 'No tienes permisos para ver actividades'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        start, end = get_analytics_range(request.GET)
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    user_filter = request.GET.get('user', '').strip()
+    if user_filter:
+        try:
+            user_ids = [user_id for user_id in user_ids if user_id == int(user_filter)]
+        except ValueError:
+            return Response({'success': False, 'error': 'Usuario inválido'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    board_user = get_board_context(request).board_user
     return Response({
         'success': True,
-        'activities': ActivitySerializer(activities, many=True).data
+        **get_activity_analytics(board_user, user_ids, start, end),
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_calendar(request):
-    """Obtener datos del calendario"""
+    """Obtener datos del calendario (?stream=1 lo escribe por partes, ver kanban.streaming)"""
     from django.templatetags.static import static
-    from .views import get_board_color, hex_to_rgba
-    from .views import classify_due
+    from .views import hex_to_rgba
     
-    board_user = get_user_for_board(request.user)
-    ensure_default_lists(board_user)
+    board_user = get_board_context(request).board_user
     
-    preference = get_board_preference(board_user)
-    board_color = get_board_color(board_user)
+    preference = get_board_context(request).preference
+    board_color = preference.color
     board_overlay_color = hex_to_rgba(board_color)
     
     if preference.background_image:
@@ -1064,44 +1165,17 @@ def api_calendar(request):
     else:
         board_background_image = request.build_absolute_uri(static('kanban/img/board-bg.jpg'))
     
-    today = timezone.now().date()
-    
-    tasks = Task.objects.filter(list__user=board_user).select_related('list', 'created_by').order_by('due_date', 'order')
-    subtasks = Subtask.objects.filter(task__list__user=board_user).select_related('task', 'task__list', 'created_by').order_by('due_date', 'order')
-    
-    calendar_items = []
-    
-    for task in tasks:
-        due_date = task.due_date
-        due_in = (due_date - today).days if due_date else None
-        calendar_items.append({
-            'type': 'Tarea',
-            'title': task.title,
-            'list_name': task.list.name,
-            'parent': None,
-            'created_by': task.created_by.username if task.created_by else 'Administrador',
-            'due_date': due_date.strftime('%Y-%m-%d') if due_date else None,
-            'due_in': due_in,
-            'due_in_abs': abs(due_in) if due_in is not None else None,
-            'status': classify_due(due_in),
-        })
+    # Tareas y subtareas ya ordenadas por fecha de entrega (ver kanban.calendar_items)
+    items = iter_calendar_items(board_user, timezone.now().date())
     
-    for subtask in subtasks:
-        due_date = subtask.due_date
-        due_in = (due_date - today).days if due_date else None
-        calendar_items.append({
-            'type': 'Subtarea',
-            'title': subtask.title,
-            'list_name': subtask.task.list.name,
-            'parent': subtask.task.title,
-            'created_by': subtask.created_by.username if subtask.created_by else 'Administrador',
-            'due_date': due_date.strftime('%Y-%m-%d') if due_date else None,
-            'due_in': due_in,
-            'due_in_abs': abs(due_in) if due_in is not None else None,
-            'status': classify_due(due_in),
-        })
+    if wants_stream(request):
+        return stream_response(request, iter_calendar_json({
+            'success': True,
+            'board_overlay_color': board_overlay_color,
+            'board_background_image': board_background_image,
+        }, items))
     
-    calendar_items.sort(key=lambda item: (item['due_date'] or '9999-12-31', item['type']))
+    calendar_items = list(items)
     
     overdue = sum(1 for item in calendar_items if item['status'] == 'overdue')
     soon = sum(1 for item in calendar_items if item['status'] == 'soon')
@@ -1125,13 +1199,10 @@ def api_reorder_lists(request):
         list_ids = request.data.get('list_ids', [])
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        # Actualizar el orden de las listas
-        for index, list_id in enumerate(list_ids):
-            list_obj = get_object_or_404(List, id=list_id, user=board_user)
-            list_obj.order = index
-            list_obj.save()
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder_lists(board_user, list_ids)
         
         return Response({
             'success': True,
@@ -1160,28 +1231,10 @@ def api_reorder_tasks(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        list_obj = get_object_or_404(List, id=list_id, user=board_user)
-        
-        # Actualizar el orden de las tareas
-        for index, task_id in enumerate(task_ids):
-            task = get_object_or_404(Task, id=task_id, list__user=board_user)
-            old_list = task.list
-            old_list_name = old_list.name if old_list else None
-            task.list = list_obj
-            task.order = index + 1
-            task.save()
-            
-            # Registrar actividad solo si la lista cambió
-            if old_list and old_list != list_obj:
-                log_activity(
-                    request.user,
-                    'move_task',
-                    f'Movió la tarea "{task.title}" de "{old_list_name}" a "{list_obj.name}"',
-                    task=task,
-                    list_obj=list_obj
-                )
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder_tasks(request.user, board_user, list_id, task_ids)
         
         return Response({
             'success': True,
@@ -1210,16 +1263,10 @@ def api_reorder_subtasks(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        task = get_object_or_404(Task, id=task_id, list__user=board_user)
-        
-        # Actualizar el orden de las subtareas
-        for index, subtask_id in enumerate(subtask_ids):
-            subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
-            subtask.task = task
-            subtask.order = index + 1
-            subtask.save()
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder_subtasks(board_user, task_id, subtask_ids)
         
         return Response({
             'success': True,
@@ -1233,13 +1280,136 @@ def api_reorder_subtasks(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_batch(request):
+    """
+    Ejecutar varias operaciones sobre listas, tareas y subtareas en una sola
+    transacción (ver kanban.batch). Si una falla no se aplica ninguna y se
+    responde con el índice de la operación que falló.
+    """
+    try:
+        results = run_batch(request, request.data.get('operations'))
+    except BatchError as e:
+        logger.warning(f'Lote rechazado en la operación {e.index}: {e}')
+        return Response({
+            'success': False,
+            'error': str(e),
+            'index': e.index
+        }, status=e.status_code)
+    
+    return Response({
+        'success': True,
+        'results': results
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def api_import_board(request):
+    """
+    Importar tareas y subtareas desde un archivo CSV o JSON (campo "file";
+    campo "format" = csv|json si la extensión no lo indica). Ver kanban.importing.
+    """
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({
+            'success': False,
+            'error': 'No se recibió ningún archivo'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    board_user = get_board_context(request).board_user
+    try:
+        fmt = detect_format(upload.name, request.data.get('format'))
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        stats = import_board(board_user, request.user, iter_import_items(stream, fmt))
+    except ImportFormatError as e:
+        logger.warning(f'Importación interrumpida: {e}')
+        return Response({
+            'success': False,
+            'error': str(e),
+            'imported': e.stats
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except UnicodeDecodeError:
+        return Response({
+            'success': False,
+            'error': 'El archivo debe estar codificado en UTF-8'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'imported': stats
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def api_export_board(request):
+    """
+    Exportar el tablero (?as=ndjson|csv|zip, ver kanban.exporting).
+    GET envía el archivo por partes mientras se genera; POST lo genera con
+    Celery y lo guarda en el almacenamiento (se envía el enlace por correo).
+    """
+    # ?format= lo usa DRF para elegir el renderer, por eso el formato va en ?as=
+    fmt = (request.GET.get('as') or request.data.get('as') or 'ndjson').strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return Response({
+            'success': False,
+            'error': f'Formato no soportado; use {", ".join(EXPORT_FORMATS)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    board_user = get_board_context(request).board_user
+    if request.method == 'GET':
+        return stream_response(
+            request,
+            iter_export(board_user, request.user, fmt),
+            headers={'Content-Disposition': f'attachment; filename="{export_filename(board_user, fmt)}"'},
+            content_type=EXPORT_CONTENT_TYPES[fmt]
+        )
+    
+    # Si Celery no está disponible, generar la exportación de forma síncrona
+    try:
+        task = export_board.delay(request.user.id, fmt)
+    except Exception as celery_error:
+        logger.warning(f"Celery no disponible, exportando de forma síncrona: {celery_error}")
+        result = export_board(request.user.id, fmt)
+        return Response({
+            'success': True,
+            'message': 'Exportación generada',
+            'url': request.build_absolute_uri(result['url'])
+        })
+    
+    logger.info(f"Exportación del tablero iniciada por {request.user.username}. Task ID: {task.id}")
+    return Response({
+        'success': True,
+        'message': 'La exportación se está generando. Recibirás el enlace por correo.',
+        'task_id': task.id
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_download_export(request, token):
+    """
+    Descargar una exportación generada con POST /api/export/. El token (ver
+    kanban.exporting.export_token) solo vale para quien la pidió y hasta que vence.
+    """
+    export = open_export(token, request.user)
+    if export is None:
+        return Response({
+            'success': False,
+            'error': 'La exportación no existe o ya venció'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(export, as_attachment=True, filename=os.path.basename(export.name))
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def api_upload_task_attachment(request, task_id):
     """Subir adjunto a una tarea"""
-    from .views import get_user_for_board, get_max_attachment_size, log_activity
+    from .views import get_max_attachment_size, log_activity
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     
     attachment_file = request.FILES.get('file')
@@ -1259,6 +1429,7 @@ def api_upload_task_attachment(request, task_id):
         uploaded_by=request.user
     )
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'add_attachment',
@@ -1283,9 +1454,9 @@ def api_upload_task_attachment(request, task_id):
 @permission_classes([IsAuthenticated])
 def api_upload_subtask_attachment(request, subtask_id):
     """Subir adjunto a una subtarea"""
-    from .views import get_user_for_board, get_max_attachment_size, log_activity
+    from .views import get_max_attachment_size, log_activity
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     
     attachment_file = request.FILES.get('file')
@@ -1305,6 +1476,7 @@ def api_upload_subtask_attachment(request, subtask_id):
         uploaded_by=request.user
     )
     
+    bump_board_version(board_user)
     log_activity(
         request.user,
         'add_attachment',
@@ -1330,13 +1502,13 @@ def api_upload_subtask_attachment(request, subtask_id):
 @permission_classes([IsAuthenticated])
 def api_delete_task_attachment(request, attachment_id):
     """Eliminar adjunto de una tarea"""
-    from .views import can_delete, get_user_for_board, log_activity
+    from .views import can_delete, log_activity
     
     if not can_delete(request.user):
         return Response({'success': False, 'error': 'No tienes permisos para eliminar adjuntos.'}, status=status.HTTP_403_FORBIDDEN)
     
     attachment = get_object_or_404(TaskAttachment, id=attachment_id)
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     if not (request.user.is_staff or request.user.is_superuser):
         if attachment.task.list.user != board_user:
             return Response({'success': False, 'error': 'No tienes acceso a este adjunto.'}, status=status.HTTP_403_FORBIDDEN)
@@ -1347,8 +1519,10 @@ def api_delete_task_attachment(request, attachment_id):
     
     if attachment.file:
         attachment.file.delete(save=False)
+    record_deletion(list_obj.user, 'task_attachment', attachment.id)
     attachment.delete()
     
+    bump_board_version(list_obj.user)
     log_activity(
         request.user,
         'delete_attachment',
@@ -1364,13 +1538,13 @@ def api_delete_task_attachment(request, attachment_id):
 @permission_classes([IsAuthenticated])
 def api_delete_subtask_attachment(request, attachment_id):
     """Eliminar adjunto de una subtarea"""
-    from .views import can_delete, get_user_for_board, log_activity
+    from .views import can_delete, log_activity
     
     if not can_delete(request.user):
         return Response({'success': False, 'error': 'No tienes permisos para eliminar adjuntos.'}, status=status.HTTP_403_FORBIDDEN)
     
     attachment = get_object_or_404(SubtaskAttachment, id=attachment_id)
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     if not (request.user.is_staff or request.user.is_superuser):
         if attachment.subtask.task.list.user != board_user:
             return Response({'success': False, 'error': 'No tienes acceso a este adjunto.'}, status=status.HTTP_403_FORBIDDEN)
@@ -1382,8 +1556,10 @@ def api_delete_subtask_attachment(request, attachment_id):
     
     if attachment.file:
         attachment.file.delete(save=False)
+    record_deletion(list_obj.user, 'subtask_attachment', attachment.id)
     attachment.delete()
     
+    bump_board_version(list_obj.user)
     log_activity(
         request.user,
         'delete_attachment',
@@ -1441,6 +1617,8 @@ def api_invite_student(request):
                 'error': f'Ya existe una invitación pendiente para {student.username}'
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    bump_board_version(student)
+    bump_board_version(get_board_context(request).board_user)
     return Response({
         'success': True,
         'message': f'Invitación enviada a {student.username}'
@@ -1468,6 +1646,8 @@ def api_accept_invitation(request, invitation_id):
         invitation.accepted = True
         invitation.save()
         
+        bump_board_version(request.user)
+        bump_board_version(get_user_for_board(invitation.admin))
         return Response({
             'success': True,
             'message': 'Invitación aceptada. Ahora puedes ver el tablero compartido'
@@ -1491,6 +1671,8 @@ def api_reject_invitation(request, invitation_id):
                 'error': 'No tienes permiso para rechazar esta invitación'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        bump_board_version(invitation.student)
+        bump_board_version(get_user_for_board(invitation.admin))
         invitation.delete()
         
         return Response({
@@ -1556,6 +1738,7 @@ def api_create_user(request):
         user.is_superuser = True
         user.save(update_fields=['is_staff', 'is_superuser'])
     
+    bump_board_version(get_board_context(request).board_user)
     return Response({
         'success': True,
         'message': f'Usuario {username} creado correctamente como {"Administrador" if role == "admin" else "Estudiante"}'
@@ -1566,7 +1749,7 @@ def api_create_user(request):
 @permission_classes([IsAuthenticated])
 def api_change_board_color(request):
     """Actualizar el color de fondo del tablero"""
-    from .views import BOARD_COLORS, get_user_for_board, get_board_preference
+    from .views import BOARD_COLORS
     
     color = request.data.get('color')
     if not color:
@@ -1575,11 +1758,12 @@ def api_change_board_color(request):
     if color not in BOARD_COLORS and color != 'transparent':
         return Response({'success': False, 'error': 'Color no permitido'}, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     preference = get_board_preference(board_user)
     preference.color = color
     preference.save(update_fields=['color', 'updated_at'])
     
+    bump_board_version(board_user)
     return Response({'success': True, 'message': 'Color actualizado correctamente', 'color': color})
 
 
@@ -1587,8 +1771,6 @@ def api_change_board_color(request):
 @permission_classes([IsAuthenticated])
 def api_upload_board_background(request):
     """Subir imagen de fondo del tablero"""
-    from .views import get_user_for_board, get_board_preference
-    
     if not (request.user.is_staff or request.user.is_superuser):
         return Response({'success': False, 'error': 'Solo los administradores pueden subir fondos'}, status=status.HTTP_403_FORBIDDEN)
     
@@ -1603,7 +1785,7 @@ def api_upload_board_background(request):
     if image.content_type not in valid_content_types:
         return Response({'success': False, 'error': 'Formato de imagen no soportado'}, status=status.HTTP_400_BAD_REQUEST)
     
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     preference = get_board_preference(board_user)
     
     if preference.background_image:
@@ -1612,6 +1794,7 @@ def api_upload_board_background(request):
     preference.background_image = image
     preference.save(update_fields=['background_image', 'updated_at'])
     
+    bump_board_version(board_user)
     return Response({
         'success': True,
         'message': 'Imagen de fondo actualizada correctamente',
@@ -1643,6 +1826,7 @@ def api_add_activity_comment(request, activity_id):
         comment=comment_text
     )
     
+    bump_board_version(get_board_context(request).board_user)
     return Response({
         'success': True,
         'comment': {
@@ -1740,6 +1924,7 @@ def api_two_factor_setup(request):
                 if not profile.enabled:
                     profile.enabled = True
                     profile.save(update_fields=['enabled', 'updated_at'])
+                    bump_board_version(get_board_context(request).board_user)
                 return Response({
                     'success': True,
                     'message': 'Autenticación de dos pasos habilitada correctamente.',
@@ -1754,6 +1939,7 @@ def api_two_factor_setup(request):
             profile.secret = pyotp.random_base32()
             profile.enabled = False
             profile.save(update_fields=['secret', 'enabled', 'updated_at'])
+            bump_board_version(get_board_context(request).board_user)
             # Regenerar QR
             totp = pyotp.TOTP(profile.secret)
             provisioning_uri = totp.provisioning_uri(name=request.user.username, issuer_name='Kanban Board')
@@ -1770,6 +1956,7 @@ def api_two_factor_setup(request):
             if profile.enabled:
                 profile.enabled = False
                 profile.save(update_fields=['enabled', 'updated_at'])
+                bump_board_version(get_board_context(request).board_user)
             return Response({
                 'success': True,
                 'message': 'Autenticación de dos pasos deshabilitada.',
@@ -1862,7 +2049,7 @@ def api_get_board_users_for_reminders(request):
                 tasks_from_admins = Task.objects.none()
             
             all_user_tasks = (tasks_created | tasks_in_user_lists | tasks_from_admins).distinct()
-            subtasks_created = Subtask.objects.filter(created_by=user).select_related('task', 'task__list', 'task__created_by')
+            subtasks_created = Subtask.objects.filter(created_by=user, task__archived_at__isnull=True).select_related('task', 'task__list', 'task__created_by')
             subtasks_from_user_tasks = Subtask.objects.filter(
                 task__in=all_user_tasks
             ).select_related('task', 'task__list', 'task__created_by')
@@ -5,3 +5,5 @@ class KanbanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kanban'
 
+    def ready(self):
+        from . import signals  # noqa: F401
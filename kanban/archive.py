@@ -0,0 +1,115 @@
+"""
+Archivo de tareas terminadas.
+
+Las tareas que llevan más de TASK_ARCHIVE_AFTER_DAYS días sin cambios en la
+lista "Finalizado" se archivan (archived_at) junto con sus subtareas y
+adjuntos, que siguen colgando de la tarea. Task.objects solo ve las tareas
+activas, así que /api/board/, el calendario, la búsqueda y los recordatorios
+ya no las leen; los índices parciales de Task cubren cada conjunto por separado.
+
+- archive_finished_tasks(): la ejecuta Celery Beat una vez al día, por lotes.
+- search_archived_tasks(): páginas del archivo de un tablero (/api/archive/).
+- restore_task(): devuelve una tarea al final de su lista.
+
+Al archivar se guarda un tombstone por tarea para que /api/board/changes/ la
+quite de los clientes; al restaurarla vuelve a aparecer como modificada.
+"""
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .board import apply_task_filters, with_task_details
+from .board_cache import bump_board_version
+from .models import Task, Subtask, DeletedBoardItem
+from .provisioning import DEFAULT_LISTS
+from .ranking import rank_for_position
+
+# Lista básica cuyas tareas se consideran terminadas
+FINISHED_LIST_NAME = DEFAULT_LISTS[-1]['name']
+
+# Tareas que se archivan en cada transacción
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def get_archive_after():
+    """Tiempo sin cambios tras el cual se archiva una tarea terminada (TASK_ARCHIVE_AFTER_DAYS, 30 días)"""
+    return timedelta(days=getattr(settings, 'TASK_ARCHIVE_AFTER_DAYS', 30))
+
+
+def archive_finished_tasks(now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archiva las tareas terminadas hace más de get_archive_after(). Retorna cuántas se archivaron."""
+    now = now or timezone.now()
+    finished = Task.objects.filter(list__name=FINISHED_LIST_NAME, updated_at__lt=now - get_archive_after())
+    archived = 0
+    last_id = 0
+    while True:
+        task_ids = list(finished.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not task_ids:
+            return archived
+        last_id = task_ids[-1]
+        with transaction.atomic():
+            # Se vuelve a filtrar al actualizar: una tarea pudo moverse o editarse desde la lectura
+            if not finished.filter(id__in=task_ids).update(archived_at=now):
+                continue
+            rows = list(Task.all_objects.filter(id__in=task_ids, archived_at=now).values_list('id', 'list__user_id'))
+            DeletedBoardItem.objects.bulk_create([
+                DeletedBoardItem(board_user_id=board_user_id, object_type='task', object_id=task_id)
+                for task_id, board_user_id in rows
+            ])
+            for board_user in User.objects.in_bulk({board_user_id for _, board_user_id in rows}).values():
+                bump_board_version(board_user)
+            archived += len(rows)
+
+
+def encode_archive_cursor(task):
+    raw = f'{task.archived_at.isoformat()}|{task.id}'
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_archive_cursor(cursor):
+    """Retorna (archived_at, id) del cursor. Lanza ValueError si no es válido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        moment, task_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii').split('|')
+        return datetime.fromisoformat(moment), int(task_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
+
+def search_archived_tasks(board_user, filters=None, after=None, page_size=50, task_fields=None):
+    """
+    Página de tareas archivadas del tablero, de la más reciente a la más antigua,
+    con los mismos filtros que /api/board/. Retorna (tareas, cursor siguiente o None).
+    """
+    tasks = apply_task_filters(Task.all_objects.archived().filter(list__user=board_user), filters or {})
+    if after:
+        archived_at, task_id = decode_archive_cursor(after)
+        tasks = tasks.filter(Q(archived_at__lt=archived_at) | Q(archived_at=archived_at, id__lt=task_id))
+    tasks = list(with_task_details(
+        tasks.select_related('list').order_by('-archived_at', '-id'), task_fields
+    )[:page_size + 1])
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        return tasks, encode_archive_cursor(tasks[-1])
+    return tasks, None
+
+
+def restore_task(task):
+    """Devuelve una tarea archivada al final de su lista"""
+    now = timezone.now()
+    with transaction.atomic():
+        task.rank = rank_for_position(Task.objects.filter(list_id=task.list_id))
+        task.archived_at = None
+        task.save(update_fields=['rank', 'archived_at', 'updated_at'])
+        # Vuelve a aparecer en /api/board/changes/ como modificada, con sus subtareas
+        DeletedBoardItem.objects.filter(
+            board_user_id=task.list.user_id, object_type='task', object_id=task.id
+        ).delete()
+        Subtask.objects.filter(task=task).update(updated_at=now)
+        bump_board_version(task.list.user)
+    return task
@@ -0,0 +1,394 @@
+"""
+Operaciones en lote sobre el tablero (POST /api/batch/).
+
+Recibe una lista ordenada de operaciones y las ejecuta en una sola transacción:
+si alguna falla, no se aplica ninguna. El usuario del tablero y los permisos se
+resuelven una vez, las actividades se registran con un solo INSERT por tramo y
+la versión del tablero se incrementa una sola vez al final.
+
+Cada operación es un objeto con:
+
+- ``op``: create, update, move, toggle, reorder o delete.
+- ``type``: list, task o subtask.
+- ``id``: elemento sobre el que se opera (update, move, toggle, delete).
+- ``data``: los mismos campos que el endpoint individual equivalente.
+- ``ref`` (opcional): nombre para usar el ID de lo creado en operaciones
+  siguientes, escribiendo ``"$nombre"`` en ``id`` o en cualquier campo
+  ``*_id`` / ``*_ids`` de ``data``.
+
+Cada resultado incluye el elemento serializado (las listas sin sus tareas).
+
+Ejemplo: crear una tarea con fecha y dos subtareas::
+
+    {"operations": [
+        {"op": "create", "type": "task", "ref": "t", "data": {"list_id": 3, "title": "Informe", "due_date": "2026-11-02"}},
+        {"op": "create", "type": "subtask", "data": {"task_id": "$t", "title": "Borrador"}},
+        {"op": "create", "type": "subtask", "data": {"task_id": "$t", "title": "Revisión"}}
+    ]}
+"""
+from datetime import datetime
+
+from django.db import transaction
+
+from .board_cache import bump_board_version
+from .board_context import get_board_context
+from .changes import record_deletion
+from .models import List, Task, Subtask
+from .ranking import rank_for_position
+from .reorder import reorder_lists, reorder_tasks, reorder_subtasks
+from .serializers import ListChangeSerializer, TaskSerializer, SubtaskSerializer
+from .views import can_delete, log_activities
+
+# Máximo de operaciones por petición
+BATCH_MAX_OPERATIONS = 100
+
+LIST_COLORS = ('green', 'yellow', 'black', 'purple')
+
+_MODELS = {
+    'list': (List, 'user', 'Lista'),
+    'task': (Task, 'list__user', 'Tarea'),
+    'subtask': (Subtask, 'task__list__user', 'Subtarea'),
+}
+
+
+# (op, type) -> método de _Batch
+_OPERATIONS = {
+    ('create', 'list'): 'create_list',
+    ('create', 'task'): 'create_task',
+    ('create', 'subtask'): 'create_subtask',
+    ('update', 'list'): 'update_list',
+    ('update', 'task'): 'update_task',
+    ('update', 'subtask'): 'update_subtask',
+    ('move', 'task'): 'move_task',
+    ('toggle', 'subtask'): 'toggle_subtask',
+    ('reorder', 'list'): 'reorder_list',
+    ('reorder', 'task'): 'reorder_task',
+    ('reorder', 'subtask'): 'reorder_subtask',
+    ('delete', 'list'): 'delete_list',
+    ('delete', 'task'): 'delete_task',
+    ('delete', 'subtask'): 'delete_subtask',
+}
+
+
+class BatchError(Exception):
+    """Error de una operación del lote; se responde con status_code y se revierte todo"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+        self.index = None
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        raise BatchError('Formato de fecha inválido') from None
+
+
+def _parse_bool(value):
+    return value if isinstance(value, bool) else str(value).lower() in ('true', '1', 'on')
+
+
+def _required_title(data, key='title'):
+    title = str(data.get(key) or '').strip()
+    if not title:
+        raise BatchError(f'El campo {key} es requerido')
+    return title
+
+
+class _Batch:
+    def __init__(self, request):
+        self.request = request
+        self.user = request.user
+        self.board_user = get_board_context(request).board_user
+        self.allow_delete = can_delete(request.user)
+        self.refs = {}
+        self.activities = []
+
+    # Referencias y búsqueda de elementos
+
+    def resolve(self, value):
+        if isinstance(value, str) and value.startswith('$'):
+            if value[1:] not in self.refs:
+                raise BatchError(f'Referencia desconocida: {value}')
+            return self.refs[value[1:]]
+        return value
+
+    def resolve_data(self, data):
+        if not isinstance(data, dict):
+            raise BatchError('data debe ser un objeto')
+        resolved = {}
+        for key, value in data.items():
+            if key.endswith('_ids') and isinstance(value, list):
+                value = [self.resolve(item) for item in value]
+            elif key.endswith('_id'):
+                value = self.resolve(value)
+            resolved[key] = value
+        return resolved
+
+    def get(self, object_type, object_id):
+        model, board_field, label = _MODELS[object_type]
+        try:
+            object_id = int(object_id)
+        except (TypeError, ValueError):
+            raise BatchError(f'ID inválido: {object_id}') from None
+        queryset = model.objects.filter(id=object_id, **{board_field: self.board_user})
+        if object_type == 'task':
+            queryset = queryset.select_related('list')
+        elif object_type == 'subtask':
+            queryset = queryset.select_related('task__list')
+        obj = queryset.first()
+        if obj is None:
+            raise BatchError(f'{label} {object_id} no encontrada', status_code=404)
+        return obj
+
+    def log(self, activity_type, description, task=None, list_obj=None, subtask=None):
+        self.activities.append({
+            'activity_type': activity_type,
+            'description': description,
+            'task': task,
+            'list_obj': list_obj,
+            'subtask': subtask,
+        })
+
+    def flush_activities(self):
+        log_activities(self.user, self.activities)
+        self.activities = []
+
+    def serialize(self, object_type, obj):
+        context = {'request': self.request}
+        if object_type == 'list':
+            return ListChangeSerializer(obj, context=context).data
+        if object_type == 'task':
+            return TaskSerializer(obj, context=context).data
+        return SubtaskSerializer(obj, context=context).data
+
+    # Operaciones
+
+    def create_list(self, object_id, data):
+        name = _required_title(data, 'name')
+        list_obj = List.objects.create(
+            name=name,
+            user=self.board_user,
+            rank=rank_for_position(List.objects.filter(user=self.board_user)),
+            color='purple',
+            created_by=self.user
+        )
+        self.log('create_list', f'{name} - Creada por {self.user.username}', list_obj=list_obj)
+        return list_obj
+
+    def create_task(self, object_id, data):
+        list_obj = self.get('list', data.get('list_id'))
+        title = _required_title(data)
+        task = Task(title=title, list=list_obj, rank=rank_for_position(list_obj.tasks.all()), created_by=self.user)
+        if data.get('due_date'):
+            task.due_date = _parse_date(data['due_date'])
+        task.save()
+        self.log('create_task', f'{title} - Creada por {self.user.username}', task=task, list_obj=list_obj)
+        return task
+
+    def create_subtask(self, object_id, data):
+        task = self.get('task', data.get('task_id'))
+        title = _required_title(data)
+        subtask = Subtask(
+            title=title, task=task, rank=rank_for_position(task.subtasks.all()),
+            completed=False, created_by=self.user
+        )
+        if data.get('due_date'):
+            subtask.due_date = _parse_date(data['due_date'])
+        subtask.save()
+        self.log(
+            'create_subtask', f'{title} - Creada por {self.user.username}',
+            task=task, list_obj=task.list, subtask=subtask
+        )
+        return subtask
+
+    def update_list(self, object_id, data):
+        list_obj = self.get('list', object_id)
+        changes = []
+        if 'name' in data:
+            name = _required_title(data, 'name')
+            if name != list_obj.name:
+                changes.append(f'nombre a "{name}"')
+                list_obj.name = name
+        if 'color' in data:
+            color = data['color']
+            if color not in LIST_COLORS:
+                raise BatchError(f'Color no válido: {color}. Colores válidos: {", ".join(LIST_COLORS)}')
+            if color != list_obj.color:
+                changes.append(f'color a {color}')
+                list_obj.color = color
+        list_obj.save()
+        if changes:
+            self.log('edit_list', f'Actualizó {" y ".join(changes)} en la lista "{list_obj.name}"', list_obj=list_obj)
+        return list_obj
+
+    def update_task(self, object_id, data):
+        task = self.get('task', object_id)
+        changes = []
+        if 'title' in data:
+            title = _required_title(data)
+            if title != task.title:
+                changes.append(f'título a "{title}"')
+                task.title = title
+        if 'due_date' in data:
+            due_date = _parse_date(data['due_date'])
+            if due_date != task.due_date:
+                changes.append(f'fecha de vencimiento a {due_date.strftime("%d/%m/%Y")}')
+                task.due_date = due_date
+        task.save()
+        if changes:
+            self.log(
+                'edit_task', f'Actualizó {" y ".join(changes)} en la tarea "{task.title}"',
+                task=task, list_obj=task.list
+            )
+        return task
+
+    def update_subtask(self, object_id, data):
+        subtask = self.get('subtask', object_id)
+        changes = []
+        if 'title' in data:
+            title = _required_title(data)
+            if title != subtask.title:
+                changes.append(f'título a "{title}"')
+                subtask.title = title
+        if 'completed' in data:
+            completed = _parse_bool(data['completed'])
+            if completed != subtask.completed:
+                changes.append(f'estado a {"completada" if completed else "pendiente"}')
+                subtask.completed = completed
+        if 'due_date' in data:
+            due_date = _parse_date(data['due_date'])
+            if due_date != subtask.due_date:
+                changes.append(f'fecha de vencimiento a {due_date.strftime("%d/%m/%Y")}')
+                subtask.due_date = due_date
+        subtask.save()
+        if changes:
+            self.log(
+                'edit_subtask', f'Actualizó {" y ".join(changes)} en la subtarea "{subtask.title}"',
+                task=subtask.task, list_obj=subtask.task.list, subtask=subtask
+            )
+        return subtask
+
+    def move_task(self, object_id, data):
+        task = self.get('task', object_id)
+        old_list = task.list
+        new_list = self.get('list', data.get('list_id'))
+        siblings = Task.objects.filter(list=new_list).exclude(id=task.id)
+        try:
+            task.rank = rank_for_position(siblings, after_id=data.get('after_id'), before_id=data.get('before_id'))
+        except (LookupError, ValueError) as e:
+            raise BatchError(str(e))
+        task.list = new_list
+        task.save(update_fields=['list', 'rank', 'updated_at'])
+        self.log(
+            'move_task', f'Movió la tarea "{task.title}" de "{old_list.name}" a "{new_list.name}"',
+            task=task, list_obj=new_list
+        )
+        return task
+
+    def toggle_subtask(self, object_id, data):
+        subtask = self.get('subtask', object_id)
+        subtask.completed = not subtask.completed
+        subtask.save()
+        status_text = "completó" if subtask.completed else "descompletó"
+        self.log(
+            'toggle_subtask',
+            f'{status_text.capitalize()} la subtarea "{subtask.title}" de la tarea "{subtask.task.title}"',
+            task=subtask.task, list_obj=subtask.task.list, subtask=subtask
+        )
+        return subtask
+
+    def reorder_list(self, object_id, data):
+        return {'updated': reorder_lists(self.board_user, data.get('list_ids'))}
+
+    def reorder_task(self, object_id, data):
+        self.get('list', data.get('list_id'))
+        return {'updated': reorder_tasks(self.user, self.board_user, data.get('list_id'), data.get('task_ids'))}
+
+    def reorder_subtask(self, object_id, data):
+        self.get('task', data.get('task_id'))
+        return {'updated': reorder_subtasks(self.board_user, data.get('task_id'), data.get('subtask_ids'))}
+
+    def delete_list(self, object_id, data):
+        return self.delete('list', object_id)
+
+    def delete_task(self, object_id, data):
+        return self.delete('task', object_id)
+
+    def delete_subtask(self, object_id, data):
+        return self.delete('subtask', object_id)
+
+    def delete(self, object_type, object_id):
+        if not self.allow_delete:
+            raise BatchError('No tienes permisos para eliminar elementos', status_code=403)
+        obj = self.get(object_type, object_id)
+        if object_type == 'list':
+            self.log('delete_list', f'Eliminó la lista "{obj.name}"', list_obj=obj)
+        elif object_type == 'task':
+            self.log(
+                'delete_task', f'Eliminó/cerró la tarea "{obj.title}" de la lista "{obj.list.name}"',
+                task=obj, list_obj=obj.list
+            )
+        else:
+            self.log(
+                'delete_subtask', f'Eliminó la subtarea "{obj.title}" de la tarea "{obj.task.title}"',
+                task=obj.task, list_obj=obj.task.list, subtask=obj
+            )
+        # Las actividades pendientes pueden apuntar a lo que se va a eliminar
+        self.flush_activities()
+        record_deletion(self.board_user, object_type, obj.id)
+        deleted_id = obj.id
+        obj.delete()
+        return {'id': deleted_id}
+
+    def run(self, operation):
+        if not isinstance(operation, dict):
+            raise BatchError('Cada operación debe ser un objeto')
+        op, object_type = operation.get('op'), operation.get('type')
+        if object_type not in _MODELS:
+            raise BatchError(f'Tipo desconocido: {object_type}')
+        object_id = self.resolve(operation.get('id'))
+        data = self.resolve_data(operation.get('data') or {})
+
+        handler = getattr(self, _OPERATIONS.get((op, object_type), ''), None)
+        if handler is None:
+            raise BatchError(f'Operación no soportada: {op} {object_type}')
+        result = handler(object_id, data)
+
+        if isinstance(result, dict):
+            return {'op': op, 'type': object_type, **result}
+        if operation.get('ref'):
+            self.refs[str(operation['ref'])] = result.id
+        return {'op': op, 'type': object_type, 'id': result.id, object_type: self.serialize(object_type, result)}
+
+
+def run_batch(request, operations):
+    """
+    Ejecuta ``operations`` en una transacción y retorna el resultado de cada una.
+    Lanza BatchError (con el índice de la operación que falló) y revierte todo
+    si alguna no se puede aplicar.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('Se requiere una lista de operaciones')
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        raise BatchError(f'Máximo {BATCH_MAX_OPERATIONS} operaciones por lote')
+
+    batch = _Batch(request)
+    results = []
+    with transaction.atomic():
+        for index, operation in enumerate(operations):
+            try:
+                results.append(batch.run(operation))
+            except ValueError as e:
+                # Errores de validación de kanban.reorder
+                error = BatchError(str(e))
+                error.index = index
+                raise error from e
+            except BatchError as e:
+                e.index = index
+                raise
+        batch.flush_activities()
+        bump_board_version(batch.board_user)
+    return results
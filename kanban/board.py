@@ -0,0 +1,253 @@
+"""
+Ruta de lectura del tablero.
+
+Construye las listas del tablero con sus tareas, subtareas y adjuntos usando un
+número fijo de consultas, sin importar el tamaño del tablero.
+
+Con page_size, cada lista trae solo la primera página de tareas ordenadas por
+(rank, id) y un cursor para pedir el resto en /api/lists/<id>/tasks/?after=.
+Los totales por lista se calculan con subconsultas, sin cargar las tareas.
+"""
+import base64
+from datetime import datetime
+import logging
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import List, Task, Subtask, TaskAttachment, SubtaskAttachment
+from .search import filter_tasks_by_search
+
+logger = logging.getLogger(__name__)
+
+# Máximo de consultas permitidas para /api/board/ (ver el comando check_board_queries)
+BOARD_QUERY_BUDGET = 20
+
+# Tamaño de página por defecto de /api/lists/<id>/tasks/ y máximo aceptado en ?page_size=
+DEFAULT_TASKS_PAGE_SIZE = 50
+MAX_TASKS_PAGE_SIZE = 200
+
+
+def get_board_filters(params):
+    """Extrae los filtros del tablero desde request.GET"""
+    return {
+        'q': params.get('q', '').strip(),
+        'creator': params.get('creator', '').strip(),
+        'due_from': params.get('due_from', '').strip(),
+        'due_to': params.get('due_to', '').strip(),
+    }
+
+
+def has_active_filters(filters):
+    return any(filters.values())
+
+
+def apply_task_filters(queryset, filters):
+    """Aplica los filtros de búsqueda, creador y fechas a un queryset de tareas"""
+    search_query = filters.get('q')
+    creator_filter = filters.get('creator')
+    due_from = filters.get('due_from')
+    due_to = filters.get('due_to')
+
+    if search_query:
+        queryset = filter_tasks_by_search(queryset, search_query)
+
+    if creator_filter:
+        if creator_filter == 'none':
+            queryset = queryset.filter(created_by__isnull=True)
+        else:
+            try:
+                queryset = queryset.filter(created_by_id=int(creator_filter))
+            except ValueError:
+                logger.warning(f"Valor inválido para creator_filter: {creator_filter}")
+
+    if due_from:
+        try:
+            due_from_date = datetime.strptime(due_from, '%Y-%m-%d').date()
+            queryset = queryset.filter(due_date__gte=due_from_date)
+        except ValueError:
+            logger.warning(f"Fecha inválida para due_from: {due_from}")
+
+    if due_to:
+        try:
+            due_to_date = datetime.strptime(due_to, '%Y-%m-%d').date()
+            queryset = queryset.filter(due_date__lte=due_to_date)
+        except ValueError:
+            logger.warning(f"Fecha inválida para due_to: {due_to}")
+
+    return queryset
+
+
+def with_task_details(queryset, task_fields=None):
+    """
+    Precarga creador, subtareas y adjuntos de cada tarea (3 consultas extra en total).
+    Con task_fields (ver ?fields= de /api/board/) solo precarga lo que se va a serializar.
+    """
+    task_attachment_prefetch = Prefetch(
+        'attachments',
+        queryset=TaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
+    )
+    subtask_attachment_prefetch = Prefetch(
+        'attachments',
+        queryset=SubtaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
+    )
+    subtask_prefetch = Prefetch(
+        'subtasks',
+        queryset=Subtask.objects.select_related('created_by').prefetch_related(subtask_attachment_prefetch).order_by('rank', 'id')
+    )
+    if task_fields is None:
+        return queryset.select_related('created_by').prefetch_related(subtask_prefetch, task_attachment_prefetch)
+
+    if 'created_by_username' in task_fields:
+        queryset = queryset.select_related('created_by')
+    if 'subtasks' in task_fields:
+        queryset = queryset.prefetch_related(subtask_prefetch)
+    if 'attachments' in task_fields:
+        queryset = queryset.prefetch_related(task_attachment_prefetch)
+    return queryset
+
+
+def get_board_lists(board_user, filters=None, include_all_tasks=True, page_size=None, task_fields=None):
+    """
+    Retorna las listas del tablero con las tareas precargadas.
+
+    - ``tasks``: todas las tareas de la lista (solo si include_all_tasks).
+    - ``filtered_tasks``: tareas que cumplen los filtros; se omite cuando no hay
+      filtros y ya se cargaron todas las tareas, para no repetir consultas.
+
+    Con page_size las tareas se cargan en ``page_tasks`` / ``filtered_tasks``
+    limitadas a page_size + 1 por lista; hay que pasar el resultado por
+    paginate_board_lists() antes de serializarlo. task_fields se pasa a
+    with_task_details().
+    """
+    filters = filters or {}
+    prefetches = []
+    active_filters = has_active_filters(filters)
+
+    if include_all_tasks:
+        all_tasks = with_task_details(Task.objects.order_by('rank', 'id'), task_fields)
+        if page_size:
+            prefetches.append(Prefetch('tasks', queryset=all_tasks[:page_size + 1], to_attr='page_tasks'))
+        else:
+            prefetches.append(Prefetch('tasks', queryset=all_tasks))
+
+    if active_filters or not include_all_tasks:
+        filtered_tasks = with_task_details(apply_task_filters(Task.objects.all(), filters).order_by('rank', 'id'), task_fields)
+        if page_size:
+            filtered_tasks = filtered_tasks[:page_size + 1]
+        prefetches.append(Prefetch('tasks', queryset=filtered_tasks, to_attr='filtered_tasks'))
+
+    lists = List.objects.filter(user=board_user).select_related('created_by').prefetch_related(*prefetches)
+    if page_size:
+        lists = lists.annotate(task_total=task_count_subquery())
+        if active_filters:
+            lists = lists.annotate(filtered_task_total=task_count_subquery(filters))
+    return lists.order_by('rank', 'id')
+
+
+def task_count_subquery(filters=None):
+    """Subconsulta con el número de tareas (filtradas) de cada lista"""
+    tasks = Task.objects.filter(list=OuterRef('pk'))
+    if filters:
+        tasks = apply_task_filters(tasks, filters)
+    counts = tasks.order_by().values('list').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def get_page_size(params, default=None):
+    """
+    Tamaño de página pedido en ?page_size=, o BOARD_TASKS_PAGE_SIZE si no viene.
+    Retorna None (sin paginar) cuando ninguno está definido.
+    """
+    if default is None:
+        default = getattr(settings, 'BOARD_TASKS_PAGE_SIZE', 0)
+    raw = params.get('page_size', '').strip()
+    try:
+        page_size = int(raw) if raw else int(default or 0)
+    except ValueError:
+        logger.warning(f"Valor inválido para page_size: {raw}")
+        page_size = int(default or 0)
+    if page_size <= 0:
+        return None
+    return min(page_size, MAX_TASKS_PAGE_SIZE)
+
+
+def encode_task_cursor(task):
+    raw = f'{task.rank}:{task.id}'
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_task_cursor(cursor):
+    """Retorna (rank, id) del cursor. Lanza ValueError si no es válido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, task_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii').split(':')
+        return rank, int(task_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+
+
+def split_page(tasks, page_size):
+    """Separa page_size + 1 tareas en (página, cursor de la siguiente o None)"""
+    tasks = list(tasks)
+    if len(tasks) > page_size:
+        page = tasks[:page_size]
+        return page, encode_task_cursor(page[-1])
+    return tasks, None
+
+
+def paginate_board_lists(lists, page_size):
+    """Recorta las tareas precargadas con page_size y guarda los cursores en cada lista"""
+    lists = list(lists)
+    for list_obj in lists:
+        if hasattr(list_obj, 'page_tasks'):
+            list_obj.page_tasks, list_obj.tasks_cursor = split_page(list_obj.page_tasks, page_size)
+        if hasattr(list_obj, 'filtered_tasks'):
+            list_obj.filtered_tasks, list_obj.filtered_tasks_cursor = split_page(list_obj.filtered_tasks, page_size)
+    return lists
+
+
+def get_list_tasks_page(list_obj, filters=None, after=None, page_size=DEFAULT_TASKS_PAGE_SIZE, task_fields=None):
+    """
+    Página de tareas de una lista ordenadas por (rank, id), a partir del cursor ``after``.
+    Retorna (tareas, cursor de la siguiente página o None).
+    """
+    tasks = apply_task_filters(Task.objects.filter(list=list_obj), filters or {})
+    if after:
+        rank, task_id = decode_task_cursor(after)
+        tasks = tasks.filter(Q(rank__gt=rank) | Q(rank=rank, id__gt=task_id))
+    tasks = with_task_details(tasks.order_by('rank', 'id'), task_fields)[:page_size + 1]
+    return split_page(tasks, page_size)
+
+
+def get_list_tasks(list_obj):
+    """Tareas de una lista obtenida con get_board_lists (la primera página si está paginada)"""
+    if hasattr(list_obj, 'page_tasks'):
+        return list_obj.page_tasks
+    return list_obj.tasks.all()
+
+
+def get_list_filtered_tasks(list_obj):
+    """Tareas filtradas de una lista obtenida con get_board_lists"""
+    if hasattr(list_obj, 'filtered_tasks'):
+        return list_obj.filtered_tasks
+    return get_list_tasks(list_obj)
+
+
+def get_list_task_count(list_obj):
+    if hasattr(list_obj, 'task_total'):
+        return list_obj.task_total
+    return len(list_obj.tasks.all())
+
+
+def get_list_filtered_task_count(list_obj):
+    if hasattr(list_obj, 'filtered_task_total'):
+        return list_obj.filtered_task_total
+    if hasattr(list_obj, 'task_total') and not hasattr(list_obj, 'filtered_tasks'):
+        return list_obj.task_total
+    return len(get_list_filtered_tasks(list_obj))
+
+
+def count_filtered_tasks(lists):
+    return sum(get_list_filtered_task_count(lst) for lst in lists)
@@ -0,0 +1,60 @@
+"""
+Versionado y caché de instantáneas del tablero.
+
+Cada endpoint que modifica el tablero llama a bump_board_version(). /api/board/
+usa esa versión para calcular un ETag (y responder 304 si el cliente ya tiene
+la última versión) y para guardar en caché la respuesta serializada.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import BoardPreference
+
+
+def bump_board_version(board_user):
+    """Incrementa la versión del tablero de board_user (una sola consulta UPDATE)"""
+    if board_user is None:
+        return
+    updated = BoardPreference.objects.filter(user=board_user).update(version=F('version') + 1)
+    if not updated:
+        BoardPreference.objects.get_or_create(user=board_user, defaults={'color': 'transparent', 'version': 1})
+
+
+def board_etag(request, board_user, version, filters, **variant):
+    """
+    ETag de /api/board/ para este usuario. Incluye el rol y el usuario porque la
+    respuesta contiene secciones propias de cada uno (invitaciones, actividades, 2FA).
+    ``variant`` son los demás parámetros que cambian la respuesta (paginación, secciones, campos).
+    """
+    role = 'admin' if (request.user.is_staff or request.user.is_superuser) else 'student'
+    raw = json.dumps([
+        board_user.id,
+        version,
+        request.user.id,
+        role,
+        request.get_host(),
+        sorted(filters.items()),
+        sorted(variant.items()),
+    ])
+    return '"board-{}"'.format(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(',')]
+    return etag in candidates or f'W/{etag}' in candidates or '*' in candidates
+
+
+def get_board_snapshot(etag):
+    return cache.get(f'kanban:board:{etag}')
+
+
+def set_board_snapshot(etag, data):
+    timeout = getattr(settings, 'BOARD_CACHE_TIMEOUT', 300)
+    cache.set(f'kanban:board:{etag}', data, timeout)
@@ -0,0 +1,139 @@
+"""
+Datos del tablero que cada petición necesita: a qué tablero pertenece el
+usuario, su rol y las preferencias del tablero.
+
+- El usuario compartido de los administradores ('admin_shared') y si un
+  estudiante pertenece al tablero compartido (tiene una invitación aceptada)
+  se guardan en la caché de Django solo si es compartida entre procesos
+  (CACHE_URL): las señales (kanban.signals) los descartan con
+  forget_board_membership() / forget_shared_admin_user(), y con una caché local
+  eso solo afectaría al proceso que recibió el cambio. Sin caché compartida se
+  leen de la base, una vez por petición gracias a get_board_context.
+- BoardContext reúne todo lo anterior y las preferencias del tablero, y se
+  resuelve una sola vez por petición (get_board_context). Las preferencias no
+  se guardan entre peticiones porque su versión cambia con cada modificación.
+
+Los valores se guardan en caché solo cuando se confirma la transacción, para
+no conservar filas de una transacción que después se revierte.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import BoardPreference, Invitation
+
+SHARED_ADMIN_USERNAME = 'admin_shared'
+
+# Segundos que se guarda la pertenencia de un estudiante al tablero compartido
+MEMBERSHIP_CACHE_TIMEOUT = 300
+
+_SHARED_ADMIN_KEY = 'kanban:shared-admin-user'
+
+# Cachés que viven en memoria de cada proceso: no sirven para datos que otro proceso invalida
+_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache_enabled():
+    """True si la caché de Django es compartida entre procesos (ver CACHE_URL en settings)"""
+    return settings.CACHES['default']['BACKEND'] not in _LOCAL_CACHE_BACKENDS
+
+
+def get_shared_admin_user():
+    """Obtiene o crea el usuario compartido para administradores"""
+    use_cache = shared_cache_enabled()
+    if use_cache:
+        user = cache.get(_SHARED_ADMIN_KEY)
+        if user is not None:
+            return user
+    user, created = User.objects.get_or_create(
+        username=SHARED_ADMIN_USERNAME,
+        defaults={
+            'is_staff': True,
+            'is_superuser': True,
+        }
+    )
+    if use_cache:
+        transaction.on_commit(lambda: cache.set(_SHARED_ADMIN_KEY, user, MEMBERSHIP_CACHE_TIMEOUT))
+    return user
+
+
+def forget_shared_admin_user():
+    """Descarta el usuario compartido guardado (al modificarlo o eliminarlo)"""
+    cache.delete(_SHARED_ADMIN_KEY)
+    transaction.on_commit(lambda: cache.delete(_SHARED_ADMIN_KEY))
+
+
+def _membership_key(user_id):
+    return f'kanban:board-membership:{user_id}'
+
+
+def is_shared_board_member(user):
+    """True si el estudiante tiene una invitación aceptada"""
+    if not shared_cache_enabled():
+        return Invitation.objects.filter(student=user, accepted=True).exists()
+    key = _membership_key(user.id)
+    member = cache.get(key)
+    if member is None:
+        member = Invitation.objects.filter(student=user, accepted=True).exists()
+        transaction.on_commit(lambda: cache.set(key, member, MEMBERSHIP_CACHE_TIMEOUT))
+    return member
+
+
+def forget_board_membership(user):
+    """Descarta la pertenencia guardada de ``user`` (al guardar o eliminar una invitación)"""
+    key = _membership_key(user.id)
+    cache.delete(key)
+    # Otra petición pudo volver a guardarla antes de que se confirme el cambio
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_user_for_board(user):
+    """Retorna el usuario apropiado para mostrar el tablero"""
+    # Los administradores y los estudiantes invitados usan el tablero compartido
+    if user.is_staff or user.is_superuser or is_shared_board_member(user):
+        return get_shared_admin_user()
+    # Si no es administrador ni tiene invitación, usar su propio usuario
+    return user
+
+
+class BoardContext:
+    """Usuario, tablero, rol y preferencias de una petición"""
+
+    def __init__(self, user):
+        self.user = user
+        self.is_admin = user.is_staff or user.is_superuser
+        self.board_user = get_user_for_board(user)
+        self._preference = None
+
+    @property
+    def can_delete(self):
+        # Solo los administradores pueden eliminar
+        return self.is_admin
+
+    @property
+    def is_shared_board(self):
+        return self.board_user.id != self.user.id
+
+    @property
+    def preference(self):
+        """Preferencias del tablero, solo para leer (los tableros se preparan en kanban.provisioning)"""
+        if self._preference is None:
+            self._preference = (
+                BoardPreference.objects.filter(user=self.board_user).first()
+                or BoardPreference(user=self.board_user)
+            )
+        return self._preference
+
+
+def get_board_context(request):
+    """BoardContext de la petición; se resuelve la primera vez y se reutiliza"""
+    http_request = getattr(request, '_request', request)
+    context = getattr(http_request, '_board_context', None)
+    if context is None or context.user.id != request.user.id:
+        context = BoardContext(request.user)
+        http_request._board_context = context
+    return context
@@ -0,0 +1,191 @@
+"""
+Secciones del payload de /api/board/.
+
+El cliente elige qué secciones recibir con ?include=lists,appearance,... y qué
+campos de cada tarea con ?fields=id,title,due_date. Sin include se envían todas
+las secciones, como antes; una actualización tras arrastrar tarjetas puede
+pedir solo ?include=lists y no pagar estudiantes, actividades ni creadores.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Prefetch, Q
+from django.templatetags.static import static
+
+from .board import get_board_lists, paginate_board_lists, count_filtered_tasks, has_active_filters
+from .activity_feed import get_activity_page
+from .board_context import is_shared_board_member
+from .changes import encode_cursor
+from .models import Task, Activity, ActivityComment, Invitation, TwoFactorProfile
+from .serializers import (
+    BoardListSerializer, TaskSerializer, ActivitySerializer, InvitationSerializer,
+    BoardPreferenceSerializer, UserSerializer,
+)
+from .views import get_user_type, can_delete, BOARD_COLORS, hex_to_rgba, get_max_attachment_size
+
+BOARD_SECTIONS = (
+    'lists',
+    'user',
+    'students',
+    'invitations',
+    'activities',
+    'appearance',
+    'creators',
+    'filters',
+    'settings',
+)
+
+# Campos que siempre se envían en cada tarea aunque no se pidan en ?fields=
+REQUIRED_TASK_FIELDS = ('id', 'list', 'rank')
+
+# Campos que ya no se envían; se aceptan en ?fields= para no romper a los clientes anteriores
+REMOVED_TASK_FIELDS = ('order',)
+
+
+def parse_sections(params):
+    """Secciones pedidas en ?include=. Lanza ValueError si alguna no existe."""
+    raw = params.get('include', '').strip()
+    if not raw:
+        return BOARD_SECTIONS
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = requested - set(BOARD_SECTIONS)
+    if unknown:
+        raise ValueError(f'Secciones desconocidas: {", ".join(sorted(unknown))}')
+    return tuple(name for name in BOARD_SECTIONS if name in requested)
+
+
+def parse_task_fields(params):
+    """Campos de tarea pedidos en ?fields=, o None para todos. Lanza ValueError si alguno no existe."""
+    raw = params.get('fields', '').strip()
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(',') if name.strip()} - set(REMOVED_TASK_FIELDS)
+    unknown = requested - set(TaskSerializer.Meta.fields)
+    if unknown:
+        raise ValueError(f'Campos desconocidos: {", ".join(sorted(unknown))}')
+    requested.update(REQUIRED_TASK_FIELDS)
+    return tuple(name for name in TaskSerializer.Meta.fields if name in requested)
+
+
+def is_invited_student(user):
+    return is_shared_board_member(user)
+
+
+def get_visible_activities(user, limit=None, is_invited=None):
+    """
+    Actividades que puede ver ``user``: un administrador ve las de sus estudiantes
+    invitados y las propias; un estudiante invitado, solo las suyas.
+    Retorna (queryset, puede_ver, título de la sección).
+    """
+    is_admin = user.is_staff or user.is_superuser
+    if not is_admin and is_invited is None:
+        is_invited = is_invited_student(user)
+    comment_prefetch = Prefetch(
+        'comments',
+        queryset=ActivityComment.objects.select_related('author').order_by('created_at')
+    )
+
+    if is_admin:
+        invited_students = Invitation.objects.filter(admin=user, accepted=True).values_list('student_id', flat=True)
+        activities = Activity.objects.filter(Q(user_id__in=invited_students) | Q(user=user))
+        heading = 'Actividades de usuarios invitados'
+    elif is_invited:
+        activities = Activity.objects.filter(user=user)
+        heading = 'Mis actividades'
+    else:
+        return Activity.objects.none(), False, 'Actividades recientes'
+
+    # Sin select_related: los nombres que se muestran están en Activity.snapshot
+    activities = activities.prefetch_related(comment_prefetch).order_by('-created_at', '-id')
+    if limit:
+        activities = activities[:limit]
+    return activities, True, heading
+
+
+def get_invitable_students(admin_user):
+    """Estudiantes que el administrador todavía no ha invitado"""
+    invited_student_ids = Invitation.objects.filter(admin=admin_user).values_list('student_id', flat=True)
+    return User.objects.filter(is_staff=False, is_superuser=False).exclude(id__in=invited_student_ids)
+
+
+def get_board_creators(board_user):
+    """Usuarios que crearon alguna tarea del tablero (para el filtro por creador)"""
+    creator_ids = Task.objects.filter(
+        list__user=board_user, created_by__isnull=False
+    ).values_list('created_by', flat=True).distinct()
+    return User.objects.filter(id__in=creator_ids).order_by('username')
+
+
+def build_board_payload(request, board_user, preference, sections=BOARD_SECTIONS, filters=None,
+                        page_size=None, task_fields=None):
+    """Calcula solo las secciones pedidas del payload de /api/board/"""
+    user = request.user
+    is_admin = user.is_staff or user.is_superuser
+    filters = filters or {}
+    is_invited = None
+    if not is_admin and ('user' in sections or 'activities' in sections):
+        is_invited = is_invited_student(user)
+    data = {'success': True}
+
+    if 'lists' in sections:
+        # Cursor para /api/board/changes/, tomado antes de leer el tablero
+        data['changes_cursor'] = encode_cursor(board_user)
+        lists = get_board_lists(board_user, filters, page_size=page_size, task_fields=task_fields)
+        if page_size:
+            lists = paginate_board_lists(lists, page_size)
+        context = {'request': request, 'task_fields': task_fields}
+        data['lists'] = BoardListSerializer(lists, many=True, context=context).data
+        data['total_filtered_tasks'] = count_filtered_tasks(lists)
+        data['page_size'] = page_size
+
+    if 'user' in sections:
+        data['user'] = UserSerializer(user).data
+        data['user_type'] = get_user_type(user)
+        data['can_delete'] = can_delete(user)
+        data['is_invited'] = bool(is_invited)
+
+    if 'students' in sections:
+        data['students'] = UserSerializer(get_invitable_students(user), many=True).data if is_admin else []
+
+    if 'invitations' in sections:
+        if is_admin:
+            pending_invitations = Invitation.objects.filter(admin=user, accepted=False)
+        else:
+            pending_invitations = Invitation.objects.filter(student=user, accepted=False)
+        data['pending_invitations'] = InvitationSerializer(
+            pending_invitations.select_related('admin', 'student'), many=True
+        ).data
+
+    if 'activities' in sections:
+        activities, can_view_activities, activities_heading = get_visible_activities(user, is_invited=is_invited)
+        activities, activities_cursor = get_activity_page(activities) if can_view_activities else ([], None)
+        data['activities'] = ActivitySerializer(activities, many=True).data
+        data['activities_cursor'] = activities_cursor
+        data['can_view_activities'] = can_view_activities
+        data['activities_heading'] = activities_heading
+
+    if 'appearance' in sections:
+        if preference.background_image:
+            board_background_image = request.build_absolute_uri(preference.background_image.url)
+        else:
+            board_background_image = request.build_absolute_uri(static('kanban/img/board-bg.jpg'))
+        data['board_colors'] = BOARD_COLORS
+        data['board_color'] = preference.color
+        data['board_overlay_color'] = hex_to_rgba(preference.color)
+        data['board_background_image'] = board_background_image
+        data['preferences'] = BoardPreferenceSerializer(preference, context={'request': request}).data
+
+    if 'creators' in sections:
+        data['creators'] = UserSerializer(get_board_creators(board_user), many=True).data
+
+    if 'filters' in sections:
+        data['filters'] = filters
+        data['has_filters'] = has_active_filters(filters)
+
+    if 'settings' in sections:
+        try:
+            tf_profile = user.two_factor_profile
+        except TwoFactorProfile.DoesNotExist:
+            tf_profile = None
+        data['two_factor_enabled'] = tf_profile.enabled if tf_profile else False
+        data['attachment_max_size_mb'] = get_max_attachment_size() // (1024 * 1024)
+
+    return data
@@ -0,0 +1,72 @@
+"""
+Elementos del calendario (/api/calendar/).
+
+Las tareas y subtareas se leen con iterator() ya ordenadas por fecha de entrega
+y se mezclan con heapq.merge, así que los elementos se pueden recorrer uno a uno
+sin cargar ni ordenar todo el tablero en memoria (ver kanban.streaming).
+"""
+import heapq
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, Subtask
+from .views import classify_due
+
+# Filas que se leen de la base de datos en cada lote
+CALENDAR_CHUNK_SIZE = 500
+
+
+def calendar_sort_key(item):
+    """Sin fecha al final; a igual fecha, subtareas antes que tareas"""
+    return (item['due_date'] or '9999-12-31', item['type'])
+
+
+def _due_fields(due_date, today):
+    due_in = (due_date - today).days if due_date else None
+    return {
+        'due_date': due_date.strftime('%Y-%m-%d') if due_date else None,
+        'due_in': due_in,
+        'due_in_abs': abs(due_in) if due_in is not None else None,
+        'status': classify_due(due_in),
+    }
+
+
+def task_calendar_item(task, today):
+    return {
+        'type': 'Tarea',
+        'title': task.title,
+        'list_name': task.list.name,
+        'parent': None,
+        'created_by': task.created_by.username if task.created_by else 'Administrador',
+        **_due_fields(task.due_date, today),
+    }
+
+
+def subtask_calendar_item(subtask, today):
+    return {
+        'type': 'Subtarea',
+        'title': subtask.title,
+        'list_name': subtask.task.list.name,
+        'parent': subtask.task.title,
+        'created_by': subtask.created_by.username if subtask.created_by else 'Administrador',
+        **_due_fields(subtask.due_date, today),
+    }
+
+
+def iter_calendar_items(board_user, today=None, chunk_size=CALENDAR_CHUNK_SIZE):
+    """Elementos del calendario de board_user en el orden de calendar_sort_key()"""
+    today = today or timezone.now().date()
+    due_order = F('due_date').asc(nulls_last=True)
+    tasks = Task.objects.filter(list__user=board_user).select_related(
+        'list', 'created_by'
+    ).order_by(due_order, 'rank', 'id')
+    subtasks = Subtask.objects.filter(task__list__user=board_user, task__archived_at__isnull=True).select_related(
+        'task', 'task__list', 'created_by'
+    ).order_by(due_order, 'rank', 'id')
+
+    return heapq.merge(
+        (task_calendar_item(task, today) for task in tasks.iterator(chunk_size=chunk_size)),
+        (subtask_calendar_item(subtask, today) for subtask in subtasks.iterator(chunk_size=chunk_size)),
+        key=calendar_sort_key,
+    )
@@ -0,0 +1,165 @@
+"""
+Sincronización incremental del tablero (/api/board/changes/?since=<cursor>).
+
+Retorna solo las listas, tareas, subtareas y adjuntos creados o modificados
+desde el cursor, y los elementos eliminados como tombstones (DeletedBoardItem).
+Las eliminaciones en cascada no generan tombstones propios: si llega el
+tombstone de una lista, el cliente descarta también sus tareas y subtareas.
+
+El cursor es opaco para el cliente. Cada respuesta incluye uno nuevo, tomado
+antes de leer los cambios; las consultas repiten una pequeña ventana anterior
+al cursor para no perder escrituras que confirmaron tarde, así que un mismo
+elemento puede llegar dos veces y el cliente debe aplicarlo de forma idempotente.
+"""
+import base64
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import List, Task, Subtask, TaskAttachment, SubtaskAttachment, DeletedBoardItem, BoardPreference
+from .serializers import (
+    ListChangeSerializer, TaskChangeSerializer, SubtaskChangeSerializer,
+    TaskAttachmentChangeSerializer, SubtaskAttachmentChangeSerializer,
+)
+
+# Segundos que se repiten antes del cursor en cada consulta
+CURSOR_OVERLAP = timedelta(seconds=2)
+
+# Máximo de elementos por tipo; si se supera el cliente debe recargar el tablero completo
+CHANGES_LIMIT = 500
+
+
+def get_changes_retention():
+    """Tiempo que se conservan los tombstones (BOARD_CHANGES_RETENTION_DAYS, 30 días por defecto)"""
+    return timedelta(days=getattr(settings, 'BOARD_CHANGES_RETENTION_DAYS', 30))
+
+
+def encode_cursor(board_user, moment=None):
+    moment = moment or timezone.now()
+    raw = f'{board_user.id}:{moment.isoformat()}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, board_user):
+    """
+    Retorna la fecha del cursor, o None si el cursor pertenece a otro tablero.
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        user_id, iso_moment = raw.split(':', 1)
+        moment = datetime.fromisoformat(iso_moment)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Cursor inválido: {cursor}') from e
+    if int(user_id) != board_user.id:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def record_deletion(board_user, object_type, object_id):
+    """Guarda el tombstone de un elemento eliminado del tablero de board_user"""
+    if board_user is None or object_id is None:
+        return
+    DeletedBoardItem.objects.create(board_user=board_user, object_type=object_type, object_id=object_id)
+
+
+def purge_deleted_items(now=None):
+    """Elimina los tombstones más antiguos que el período de retención"""
+    now = now or timezone.now()
+    deleted, _ = DeletedBoardItem.objects.filter(deleted_at__lt=now - get_changes_retention()).delete()
+    return deleted
+
+
+def _limited(queryset):
+    rows = list(queryset[:CHANGES_LIMIT + 1])
+    return rows, len(rows) > CHANGES_LIMIT
+
+
+def reset_response(board_user):
+    """Respuesta que indica al cliente que debe recargar /api/board/ completo"""
+    return {
+        'success': True,
+        'reset': True,
+        'cursor': encode_cursor(board_user),
+    }
+
+
+def get_board_changes(board_user, since, request=None):
+    """
+    Construye la respuesta de cambios del tablero de board_user desde ``since``.
+    Si since es demasiado antiguo o hay demasiados cambios, retorna reset_response().
+    """
+    now = timezone.now()
+    if since < now - get_changes_retention():
+        return reset_response(board_user)
+
+    cursor = encode_cursor(board_user, now)
+    window_start = since - CURSOR_OVERLAP
+    context = {'request': request}
+
+    lists, lists_overflow = _limited(
+        List.objects.filter(user=board_user, updated_at__gte=window_start)
+        .select_related('created_by').order_by('updated_at', 'id')
+    )
+    tasks, tasks_overflow = _limited(
+        Task.objects.filter(list__user=board_user, updated_at__gte=window_start)
+        .select_related('created_by').order_by('updated_at', 'id')
+    )
+    subtasks, subtasks_overflow = _limited(
+        Subtask.objects.filter(task__list__user=board_user, task__archived_at__isnull=True, updated_at__gte=window_start)
+        .select_related('created_by').order_by('updated_at', 'id')
+    )
+    task_attachments, task_attachments_overflow = _limited(
+        TaskAttachment.objects.filter(
+            task__list__user=board_user, task__archived_at__isnull=True, uploaded_at__gte=window_start
+        )
+        .select_related('uploaded_by').order_by('uploaded_at', 'id')
+    )
+    subtask_attachments, subtask_attachments_overflow = _limited(
+        SubtaskAttachment.objects.filter(
+            subtask__task__list__user=board_user, subtask__task__archived_at__isnull=True,
+            uploaded_at__gte=window_start
+        )
+        .select_related('uploaded_by').order_by('uploaded_at', 'id')
+    )
+    deleted, deleted_overflow = _limited(
+        DeletedBoardItem.objects.filter(board_user=board_user, deleted_at__gte=window_start).order_by('deleted_at', 'id')
+    )
+
+    if any((lists_overflow, tasks_overflow, subtasks_overflow, task_attachments_overflow,
+            subtask_attachments_overflow, deleted_overflow)):
+        return reset_response(board_user)
+
+    board = None
+    preference = BoardPreference.objects.filter(user=board_user, updated_at__gte=window_start).first()
+    if preference is not None:
+        if preference.background_image:
+            background_url = preference.background_image.url
+            if request is not None:
+                background_url = request.build_absolute_uri(background_url)
+        else:
+            background_url = None
+        board = {
+            'board_color': preference.color,
+            'background_image_url': background_url,
+        }
+
+    return {
+        'success': True,
+        'reset': False,
+        'cursor': cursor,
+        'board': board,
+        'lists': ListChangeSerializer(lists, many=True, context=context).data,
+        'tasks': TaskChangeSerializer(tasks, many=True, context=context).data,
+        'subtasks': SubtaskChangeSerializer(subtasks, many=True, context=context).data,
+        'task_attachments': TaskAttachmentChangeSerializer(task_attachments, many=True, context=context).data,
+        'subtask_attachments': SubtaskAttachmentChangeSerializer(subtask_attachments, many=True, context=context).data,
+        'deleted': [
+            {'type': item.object_type, 'id': item.object_id, 'deleted_at': item.deleted_at}
+            for item in deleted
+        ],
+    }
@@ -0,0 +1,336 @@
+"""
+Channel layers para varios procesos de daphne.
+
+InMemoryChannelLayer solo entrega los mensajes dentro del proceso que los
+envía: con más de un proceso ASGI, una actividad registrada en uno no llega a
+los WebSockets abiertos en los demás. CHANNEL_LAYER_URL (ver settings) elige la
+capa:
+
+- redis://...    channels_redis.core.RedisChannelLayer
+- postgres://... PostgresNotifyChannelLayer (LISTEN/NOTIFY, sin Redis)
+- vacía          InMemoryChannelLayer (un solo proceso, desarrollo)
+
+BroadcastChannelLayer guarda, como InMemoryChannelLayer, los grupos y las colas
+de los consumers de su proceso. group_send() y los envíos a canales de otro
+proceso se publican en un transporte compartido; cada proceso escucha el
+transporte en un hilo y entrega los mensajes a sus propios consumers. Las
+subclases solo implementan publish() y listen().
+
+LocalBroker y LocalBrokerChannelLayer son un transporte de prueba sin
+servicios externos: un servidor local que reenvía cada mensaje a todos los
+procesos conectados (lo usa el comando benchmark_channel_layer).
+"""
+import asyncio
+import json
+import logging
+import random
+import select
+import string
+import threading
+import time
+import zlib
+from base64 import b64decode, b64encode
+from copy import deepcopy
+from multiprocessing.connection import Client, Listener
+
+from channels.layers import InMemoryChannelLayer
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre revisiones de si el hilo que escucha debe terminar
+_POLL_INTERVAL = 1.0
+
+# Segundos de espera antes de reconectar el hilo que escucha tras un error
+_RECONNECT_DELAY = 2.0
+
+
+def encode_message(kind, name, message):
+    """Texto ASCII con el destino (grupo 'g' o canal 'c') y el mensaje"""
+    data = json.dumps([kind, name, message], separators=(',', ':')).encode()
+    return b64encode(zlib.compress(data)).decode('ascii')
+
+
+def decode_message(payload):
+    kind, name, message = json.loads(zlib.decompress(b64decode(payload)))
+    return kind, name, message
+
+
+class BroadcastChannelLayer(InMemoryChannelLayer):
+    """Grupos y colas locales del proceso más un transporte compartido entre procesos"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Marca los canales propios de este proceso (ver new_channel)
+        self.process_id = 'bc' + ''.join(random.choice(string.ascii_letters) for _ in range(12))
+        # Se activa cuando el hilo ya recibe mensajes del transporte
+        self.listening = threading.Event()
+        self._stopping = threading.Event()
+        self._listener = None
+        self._loop = None
+
+    # Transporte (lo implementan las subclases)
+
+    def publish(self, payload):
+        """Publica ``payload`` (ver encode_message) para todos los procesos; bloqueante"""
+        raise NotImplementedError
+
+    def listen(self, callback, stopping):
+        """
+        Llama a ``callback(payload)`` con cada mensaje publicado hasta que se
+        active ``stopping``; debe activar self.listening al suscribirse.
+        """
+        raise NotImplementedError
+
+    # API de channels
+
+    async def new_channel(self, prefix='specific.'):
+        return '%s%s!%s' % (prefix, self.process_id, ''.join(random.choice(string.ascii_letters) for _ in range(12)))
+
+    def _is_local(self, channel):
+        # Los canales sin "!" no son de un proceso: se entregan en el proceso que envía
+        return '!' not in channel or self.non_local_name(channel).endswith(self.process_id + '!')
+
+    async def send(self, channel, message):
+        if self._is_local(channel):
+            return await super().send(channel, message)
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_channel_name(channel)
+        await self._publish('c', channel, message)
+
+    async def receive(self, channel):
+        self._ensure_listener()
+        return await super().receive(channel)
+
+    async def group_add(self, group, channel):
+        await super().group_add(group, channel)
+        self._ensure_listener()
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        self.require_valid_group_name(group)
+        # También los consumers de este proceso lo reciben por el transporte
+        await self._publish('g', group, message)
+
+    async def close(self):
+        self._stopping.set()
+        if self._listener is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._listener.join, _POLL_INTERVAL * 2)
+
+    async def _publish(self, kind, name, message):
+        payload = encode_message(kind, name, message)
+        await asyncio.get_running_loop().run_in_executor(None, self.publish, payload)
+
+    # Hilo que escucha el transporte
+
+    def _ensure_listener(self):
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen_forever, name='kanban-channel-layer', daemon=True)
+        self._listener.start()
+
+    def _listen_forever(self):
+        while not self._stopping.is_set():
+            try:
+                self.listen(self._on_payload, self._stopping)
+            except Exception as e:
+                logger.error(f"Channel layer: error al escuchar, se reconecta: {e}", exc_info=True)
+                self._stopping.wait(_RECONNECT_DELAY)
+            finally:
+                self.listening.clear()
+
+    def _on_payload(self, payload):
+        try:
+            kind, name, message = decode_message(payload)
+        except (ValueError, TypeError, zlib.error) as e:
+            logger.warning(f"Channel layer: mensaje inválido descartado: {e}")
+            return
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._deliver, kind, name, message)
+
+    def _deliver(self, kind, name, message):
+        """Entrega en el event loop del proceso a sus canales del grupo o al canal indicado"""
+        if kind == 'g':
+            self._clean_expired()
+            channels = list(self.groups.get(name, {}))
+        else:
+            channels = [name] if self._is_local(name) else []
+        for channel in channels:
+            queue = self.channels.setdefault(channel, asyncio.Queue(maxsize=self.get_capacity(channel)))
+            try:
+                queue.put_nowait((time.time() + self.expiry, deepcopy(message)))
+            except asyncio.QueueFull:
+                # Igual que InMemoryChannelLayer.group_send: un consumer lleno no frena al resto
+                logger.warning(f"Channel layer: canal lleno, mensaje descartado: {channel}")
+
+
+class PostgresNotifyChannelLayer(BroadcastChannelLayer):
+    """
+    Transporte con LISTEN/NOTIFY de PostgreSQL. NOTIFY admite hasta 8000 bytes:
+    los mensajes más grandes se guardan en la tabla ``table`` (se crea si no
+    existe) y se notifica solo su id; las filas se borran pasado ``expiry``.
+    """
+
+    # Bytes máximos de un mensaje enviado directamente en el NOTIFY
+    MAX_NOTIFY_BYTES = 7900
+
+    def __init__(self, dsn, notify_channel='kanban_channel_layer', table='kanban_channel_layer_message', **kwargs):
+        super().__init__(**kwargs)
+        self.dsn = dsn
+        self.notify_channel = notify_channel
+        self.table = table
+        self._publish_lock = threading.Lock()
+        self._connection = None
+        self._table_ready = False
+
+    def _connect(self):
+        import psycopg2
+
+        connection = psycopg2.connect(self.dsn)
+        connection.autocommit = True
+        return connection
+
+    def _publish_connection(self):
+        if self._connection is None or self._connection.closed:
+            self._connection = self._connect()
+            self._table_ready = False
+        return self._connection
+
+    def publish(self, payload):
+        from psycopg2 import Error
+
+        with self._publish_lock:
+            try:
+                with self._publish_connection().cursor() as cursor:
+                    if len(payload) > self.MAX_NOTIFY_BYTES:
+                        payload = '#%d' % self._store(cursor, payload)
+                    cursor.execute('SELECT pg_notify(%s, %s)', [self.notify_channel, payload])
+            except Error:
+                # La próxima publicación abre otra conexión
+                if self._connection is not None:
+                    self._connection.close()
+                self._connection = None
+                raise
+
+    def _store(self, cursor, payload):
+        from psycopg2 import sql
+
+        table = sql.Identifier(self.table)
+        if not self._table_ready:
+            cursor.execute(sql.SQL(
+                'CREATE UNLOGGED TABLE IF NOT EXISTS {} '
+                '(id bigserial PRIMARY KEY, payload text NOT NULL, created_at timestamptz NOT NULL DEFAULT now())'
+            ).format(table))
+            self._table_ready = True
+        cursor.execute(sql.SQL('DELETE FROM {} WHERE created_at < now() - make_interval(secs => %s)').format(table),
+                       [self.expiry])
+        cursor.execute(sql.SQL('INSERT INTO {} (payload) VALUES (%s) RETURNING id').format(table), [payload])
+        return cursor.fetchone()[0]
+
+    def listen(self, callback, stopping):
+        from psycopg2 import sql
+
+        connection = self._connect()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.notify_channel)))
+            self.listening.set()
+            while not stopping.is_set():
+                if select.select([connection], [], [], _POLL_INTERVAL) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    payload = connection.notifies.pop(0).payload
+                    if payload.startswith('#'):
+                        payload = self._load(connection, int(payload[1:]))
+                        if payload is None:
+                            continue
+                    callback(payload)
+        finally:
+            connection.close()
+
+    def _load(self, connection, message_id):
+        from psycopg2 import sql
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL('SELECT payload FROM {} WHERE id = %s').format(sql.Identifier(self.table)),
+                           [message_id])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+
+class LocalBroker:
+    """Servidor local que reenvía cada mensaje publicado a todos los procesos que escuchan"""
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=b'kanban-channel-layer'):
+        self._server = Listener(address, authkey=authkey)
+        self.address = self._server.address
+        self.authkey = authkey
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._accept, name='kanban-local-broker', daemon=True).start()
+        return self
+
+    def close(self):
+        self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        try:
+            if connection.recv() == 'listen':
+                connection.send('ok')
+                with self._lock:
+                    self._subscribers.append(connection)
+                return
+            while True:
+                payload = connection.recv()
+                # Con el lock: una conexión no admite envíos simultáneos de varios hilos
+                with self._lock:
+                    for subscriber in list(self._subscribers):
+                        try:
+                            subscriber.send(payload)
+                        except OSError:
+                            self._subscribers.remove(subscriber)
+        except (EOFError, OSError):
+            pass
+
+
+class LocalBrokerChannelLayer(BroadcastChannelLayer):
+    """Transporte por un LocalBroker en ``address``, para probar la entrega entre procesos"""
+
+    def __init__(self, address, authkey=b'kanban-channel-layer', **kwargs):
+        super().__init__(**kwargs)
+        self.address = tuple(address)
+        self.authkey = authkey
+        self._publish_lock = threading.Lock()
+        self._connection = None
+
+    def publish(self, payload):
+        with self._publish_lock:
+            if self._connection is None:
+                self._connection = Client(self.address, authkey=self.authkey)
+                self._connection.send('publish')
+            self._connection.send(payload)
+
+    def listen(self, callback, stopping):
+        connection = Client(self.address, authkey=self.authkey)
+        try:
+            connection.send('listen')
+            connection.recv()
+            self.listening.set()
+            while not stopping.is_set():
+                if connection.poll(_POLL_INTERVAL):
+                    callback(connection.recv())
+        finally:
+            connection.close()
@@ -1,13 +1,21 @@
 import json
 import logging
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from .activity_log import activity_groups
+
 logger = logging.getLogger(__name__)
 
 
 class ActivityConsumer(AsyncWebsocketConsumer):
-    GROUP_NAME = 'activities'
+    """
+    Cada conexión se suma a los grupos de su tablero y rol (ver
+    kanban.activity_log.activity_groups), así recibe solo las actividades que
+    puede ver. Los grupos de self.groups se dejan al desconectar
+    (AsyncWebsocketConsumer.websocket_disconnect).
+    """
 
     async def connect(self):
         logger.info(f"Intentando conectar WebSocket. Path: {self.scope.get('path')}")
@@ -30,14 +38,16 @@ class ActivityConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            logger.info(f"Usuario autenticado: {user.username}, agregando al grupo '{self.GROUP_NAME}'")
             # Verificar que channel_layer esté disponible
             if not self.channel_layer:
                 logger.error("Channel layer no disponible en el consumer")
                 await self.close(code=4003)
                 return
             
-            await self.channel_layer.group_add(self.GROUP_NAME, self.channel_name)
+            self.groups = await database_sync_to_async(activity_groups)(user)
+            logger.info(f"Usuario autenticado: {user.username}, agregando a los grupos {self.groups}")
+            for group in self.groups:
+                await self.channel_layer.group_add(group, self.channel_name)
             await self.accept()
             logger.info(f"Conexión WebSocket aceptada para usuario: {user.username}, channel_name: {self.channel_name}")
         except Exception as e:
@@ -45,16 +55,12 @@ class ActivityConsumer(AsyncWebsocketConsumer):
             await self.close(code=4002)
 
     async def disconnect(self, close_code):
-        logger.info(f"Desconectando WebSocket, codigo: {close_code}")
-        try:
-            await self.channel_layer.group_discard(self.GROUP_NAME, self.channel_name)
-        except Exception as e:
-            logger.error(f"Error al desconectar del grupo: {e}", exc_info=True)
+        logger.info(f"Desconectando WebSocket, codigo: {close_code}, grupos: {self.groups}")
 
-    async def activity_broadcast(self, event):
+    async def activity_batch(self, event):
+        # Lote enviado por kanban.activity_log: cada actividad va al cliente por separado, como antes
         try:
-            payload = event.get('payload', {})
-            logger.info(f"Enviando broadcast de actividad: {payload.get('activity_type')} a {self.channel_name}")
-            await self.send(text_data=json.dumps(payload))
+            for payload in event.get('payloads', []):
+                await self.send(text_data=json.dumps(payload))
         except Exception as e:
-            logger.error(f"Error al enviar broadcast: {e}", exc_info=True)
+            logger.error(f"Error al enviar lote de actividades: {e}", exc_info=True)
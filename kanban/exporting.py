@@ -0,0 +1,290 @@
+"""
+Exportación del tablero por partes: NDJSON, CSV o ZIP con los adjuntos.
+
+- ndjson: un objeto JSON por línea con un campo ``type``: 'board' (encabezado),
+  'list', 'task', 'subtask', 'task_attachment', 'subtask_attachment',
+  'activity' y 'comment'.
+- csv: las tareas y subtareas con las columnas que acepta la importación
+  (type, list, title, due_date, completed; ver kanban.importing), así el
+  archivo se puede volver a importar en otro tablero.
+- zip: board.ndjson y los archivos adjuntos con la misma ruta que tienen en
+  el almacenamiento (attachments/tasks/<id>/..., attachments/subtasks/<id>/...).
+
+Las filas se leen con values().iterator() de a EXPORT_CHUNK_SIZE y los
+adjuntos con File.chunks(), así que la memoria no depende del tamaño del
+tablero. El ZIP se escribe sin volver atrás en el archivo (descriptores de
+datos), por eso también se puede enviar mientras se genera.
+
+Las exportaciones generadas con Celery se guardan en export_storage
+(EXPORTS_ROOT, fuera de MEDIA_ROOT, así que no tienen URL pública). Se
+descargan con un token firmado (export_token) que solo vale para quien la pidió
+y durante EXPORT_EXPIRY_HOURS; purge_expired_exports borra las vencidas.
+"""
+import csv
+import os
+import tempfile
+import uuid
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+
+from .board_sections import get_visible_activities
+from .models import List, Task, Subtask, TaskAttachment, SubtaskAttachment, Activity, ActivityComment
+from .renderers import ORJSONRenderer
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'zip')
+
+# Filas que se leen de la base en cada consulta del iterador
+EXPORT_CHUNK_SIZE = 2000
+
+# Líneas NDJSON por pedazo de la respuesta
+EXPORT_LINES_PER_CHUNK = 500
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'zip': 'application/zip',
+}
+
+EXPORT_CSV_COLUMNS = ('type', 'list', 'title', 'due_date', 'completed')
+
+EXPORT_TOKEN_SALT = 'kanban.exporting.download'
+
+export_storage = FileSystemStorage(location=settings.EXPORTS_ROOT)
+
+_renderer = ORJSONRenderer()
+
+
+def export_filename(board_user, fmt):
+    return f'tablero-{board_user.username}-{timezone.now():%Y%m%d-%H%M%S}.{fmt}'
+
+
+def _rows(queryset, *fields, **expressions):
+    return queryset.values(*fields, **expressions).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _board_subtasks(board_user):
+    # Task.objects ya excluye las tareas archivadas; sus subtareas y adjuntos se filtran aparte
+    return Subtask.objects.filter(task__list__user=board_user, task__archived_at__isnull=True)
+
+
+def _board_attachments(board_user):
+    """(adjuntos de tareas, adjuntos de subtareas) de las tareas no archivadas del tablero"""
+    return (
+        TaskAttachment.objects.filter(task__list__user=board_user, task__archived_at__isnull=True),
+        SubtaskAttachment.objects.filter(
+            subtask__task__list__user=board_user, subtask__task__archived_at__isnull=True
+        ),
+    )
+
+
+def _visible_activities(user):
+    activities, can_view, _ = get_visible_activities(user)
+    if not can_view:
+        return Activity.objects.none()
+    # Solo los filtros: sin select_related ni prefetch, que cargarían todo en memoria
+    return Activity.objects.filter(id__in=activities.values('id'))
+
+
+def iter_export_records(board_user, user):
+    """Registros del tablero de board_user (con las actividades que ``user`` puede ver)"""
+    yield {
+        'type': 'board',
+        'board': board_user.username,
+        'exported_by': user.username,
+        'exported_at': timezone.now(),
+    }
+    lists = List.objects.filter(user=board_user).order_by('rank', 'id')
+    for row in _rows(lists, 'id', 'name', 'color', 'rank', 'updated_at', created_by_username=F('created_by__username')):
+        yield {'type': 'list', **row}
+
+    tasks = Task.objects.filter(list__user=board_user).order_by('list__rank', 'list_id', 'rank', 'id')
+    for row in _rows(tasks, 'id', 'list_id', 'title', 'rank', 'due_date', 'updated_at',
+                     created_by_username=F('created_by__username')):
+        yield {'type': 'task', **row}
+
+    subtasks = _board_subtasks(board_user).order_by('task_id', 'rank', 'id')
+    for row in _rows(subtasks, 'id', 'task_id', 'title', 'completed', 'rank', 'due_date', 'updated_at',
+                     created_by_username=F('created_by__username')):
+        yield {'type': 'subtask', **row}
+
+    task_attachments, subtask_attachments = _board_attachments(board_user)
+    for record_type, attachments, parent in (
+        ('task_attachment', task_attachments, 'task_id'),
+        ('subtask_attachment', subtask_attachments, 'subtask_id'),
+    ):
+        for row in _rows(attachments.order_by('id'), 'id', parent, 'file', 'uploaded_at',
+                         uploaded_by_username=F('uploaded_by__username')):
+            yield {'type': record_type, **row}
+
+    activities = _visible_activities(user)
+    for row in _rows(activities.order_by('created_at', 'id'), 'id', 'activity_type', 'description',
+                     'task_id', 'list_id', 'subtask_id', 'snapshot', 'created_at', username=F('user__username')):
+        yield {'type': 'activity', **row}
+
+    comments = ActivityComment.objects.filter(activity__in=activities).order_by('created_at', 'id')
+    for row in _rows(comments, 'id', 'activity_id', 'comment', 'created_at', author_username=F('author__username')):
+        yield {'type': 'comment', **row}
+
+
+def iter_ndjson(board_user, user):
+    """Líneas NDJSON, entregadas de a EXPORT_LINES_PER_CHUNK"""
+    lines = []
+    for record in iter_export_records(board_user, user):
+        lines.append(_renderer.render(record))
+        if len(lines) >= EXPORT_LINES_PER_CHUNK:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+class _Buffer:
+    """Destino de escritura que acumula lo escrito hasta que se lo retira con take()"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+class _TextWriter:
+    """Adaptador de texto a bytes UTF-8 para csv.writer"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def write(self, value):
+        return self.buffer.write(value.encode('utf-8'))
+
+
+def iter_csv(board_user):
+    """CSV de tareas y subtareas en el formato de la importación"""
+    buffer = _Buffer()
+    text = _TextWriter(buffer)
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    yield b'\xef\xbb\xbf' + buffer.take()
+
+    tasks = _rows(
+        Task.objects.filter(list__user=board_user).order_by('list__rank', 'list_id', 'rank', 'id'),
+        'id', 'title', 'due_date', list_name=F('list__name')
+    )
+    # Mismo orden de tareas que arriba: se recorren a la par, sin agrupar en memoria
+    subtasks = _rows(
+        _board_subtasks(board_user).order_by(
+            'task__list__rank', 'task__list_id', 'task__rank', 'task_id', 'rank', 'id'
+        ),
+        'task_id', 'title', 'due_date', 'completed'
+    )
+    pending = next(subtasks, None)
+    for count, task in enumerate(tasks, 1):
+        writer.writerow(('task', task['list_name'], task['title'], task['due_date'].isoformat(), ''))
+        while pending is not None and pending['task_id'] == task['id']:
+            writer.writerow((
+                'subtask', '', pending['title'], pending['due_date'].isoformat(), '1' if pending['completed'] else ''
+            ))
+            pending = next(subtasks, None)
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.take()
+    yield buffer.take()
+
+
+def iter_zip(board_user, user):
+    """ZIP con board.ndjson y los archivos adjuntos, generado por partes"""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('board.ndjson', 'w', force_zip64=True) as entry:
+            for line in iter_ndjson(board_user, user):
+                entry.write(line)
+                yield buffer.take()
+
+        for queryset in _board_attachments(board_user):
+            for attachment in queryset.order_by('id').only('id', 'file').iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                try:
+                    attachment.file.open('rb')
+                except (FileNotFoundError, OSError):
+                    # El archivo ya no está en el almacenamiento: queda solo su registro
+                    continue
+                try:
+                    with archive.open(attachment.file.name, 'w', force_zip64=True) as entry:
+                        for chunk in attachment.file.chunks():
+                            entry.write(chunk)
+                            yield buffer.take()
+                finally:
+                    attachment.file.close()
+    yield buffer.take()
+
+
+def iter_export(board_user, user, fmt):
+    """Pedazos (bytes) de la exportación en el formato ``fmt``"""
+    if fmt == 'csv':
+        chunks = iter_csv(board_user)
+    elif fmt == 'zip':
+        chunks = iter_zip(board_user, user)
+    else:
+        chunks = iter_ndjson(board_user, user)
+    return (chunk for chunk in chunks if chunk)
+
+
+def save_export(board_user, user, fmt):
+    """Genera la exportación en un archivo temporal y la guarda en export_storage; devuelve su ruta"""
+    with tempfile.TemporaryFile() as output:
+        for chunk in iter_export(board_user, user, fmt):
+            output.write(chunk)
+        output.seek(0)
+        return export_storage.save(f'{uuid.uuid4().hex}/{export_filename(board_user, fmt)}', File(output))
+
+
+def export_token(path, user):
+    """Token firmado para descargar la exportación ``path``; solo vale para ``user``"""
+    return signing.dumps({'path': path, 'user': user.id}, salt=EXPORT_TOKEN_SALT)
+
+
+def _expiry():
+    return timedelta(hours=settings.EXPORT_EXPIRY_HOURS)
+
+
+def open_export(token, user):
+    """Archivo de la exportación del token, o None si no es de ``user``, venció o ya se borró"""
+    try:
+        data = signing.loads(token, salt=EXPORT_TOKEN_SALT, max_age=_expiry())
+    except signing.BadSignature:
+        return None
+    if data.get('user') != user.id or not export_storage.exists(data['path']):
+        return None
+    return export_storage.open(data['path'], 'rb')
+
+
+def purge_expired_exports(now=None):
+    """Borra las exportaciones guardadas hace más de EXPORT_EXPIRY_HOURS; devuelve cuántas"""
+    if not os.path.isdir(export_storage.location):
+        return 0
+    cutoff = (now or timezone.now()) - _expiry()
+    deleted = 0
+    for folder in export_storage.listdir('')[0]:
+        _, files = export_storage.listdir(folder)
+        for name in files:
+            path = f'{folder}/{name}'
+            if export_storage.get_modified_time(path) < cutoff:
+                export_storage.delete(path)
+                deleted += 1
+        if not any(export_storage.listdir(folder)):
+            os.rmdir(export_storage.path(folder))
+    return deleted
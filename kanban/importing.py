@@ -0,0 +1,276 @@
+"""
+Importación masiva de tareas y subtareas desde CSV o JSON.
+
+El archivo se lee por partes y nunca se carga completo en memoria:
+
+- CSV con encabezado. Columnas: ``list``, ``title`` y opcionalmente
+  ``due_date`` (AAAA-MM-DD), ``completed`` y ``type`` ('task' o 'subtask').
+  Una fila 'subtask' pertenece a la última tarea que aparece antes que ella.
+- JSON: un arreglo de objetos o un objeto por línea (JSON Lines). Cada objeto
+  es una tarea: ``{"list": ..., "title": ..., "due_date": ..., "subtasks":
+  [{"title": ..., "completed": ..., "due_date": ...}]}``.
+
+Las listas se buscan por nombre en el tablero y se crean si no existen. Las
+tareas se guardan por lotes de IMPORT_CHUNK_SIZE, cada uno en su propia
+transacción, con un bulk_create de tareas y otro de subtareas; las claves de
+orden se generan al final de cada lista sin leer las tareas existentes. Si una
+fila no es válida se detiene la importación y los lotes anteriores quedan
+guardados (ImportFormatError.stats dice cuántos).
+"""
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+
+from .board_cache import bump_board_version
+from .models import List, Task, Subtask
+from .ranking import is_valid_rank, rank_for_position, rank_sequence, rebalance_ranks
+from .views import log_activities
+
+# Tareas que se guardan en cada transacción
+IMPORT_CHUNK_SIZE = 2000
+
+# Filas por INSERT en bulk_create
+IMPORT_BATCH_SIZE = 1000
+
+# Caracteres que se leen del archivo JSON en cada paso
+_JSON_READ_SIZE = 64 * 1024
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'si', 'sí', 'x'}
+
+IMPORT_FORMATS = ('csv', 'json')
+
+
+class ImportFormatError(ValueError):
+    """Fila inválida en el archivo; ``stats`` tiene lo que ya se importó"""
+
+    def __init__(self, message, stats=None):
+        super().__init__(message)
+        self.stats = stats
+
+
+def detect_format(filename, requested=None):
+    """'csv' o 'json' según ``requested`` o la extensión del archivo"""
+    fmt = (requested or '').strip().lower()
+    if not fmt:
+        extension = (filename or '').rsplit('.', 1)[-1].lower()
+        fmt = 'csv' if extension == 'csv' else 'json' if extension in ('json', 'jsonl', 'ndjson') else ''
+    if fmt not in IMPORT_FORMATS:
+        raise ImportFormatError('Formato no soportado; use csv o json')
+    return fmt
+
+
+def _text(value, field, max_length, where, required=True):
+    value = '' if value is None else str(value).strip()
+    if not value and required:
+        raise ImportFormatError(f'{where}: falta "{field}"')
+    if len(value) > max_length:
+        raise ImportFormatError(f'{where}: "{field}" supera {max_length} caracteres')
+    return value
+
+
+def _date(value, where):
+    value = '' if value is None else str(value).strip()
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ImportFormatError(f'{where}: fecha inválida "{value}" (use AAAA-MM-DD)')
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in _TRUE_VALUES
+
+
+def _subtask_item(data, where):
+    if not isinstance(data, dict):
+        raise ImportFormatError(f'{where}: cada subtarea debe ser un objeto')
+    return {
+        'title': _text(data.get('title'), 'title', 200, where),
+        'due_date': _date(data.get('due_date'), where),
+        'completed': _flag(data.get('completed')),
+    }
+
+
+def _task_item(data, where):
+    return {
+        'list': _text(data.get('list'), 'list', 100, where),
+        'title': _text(data.get('title'), 'title', 200, where),
+        'due_date': _date(data.get('due_date'), where),
+        'subtasks': [],
+    }
+
+
+def iter_csv_items(stream):
+    """Tareas (con sus subtareas) de un CSV en ``stream`` (texto)"""
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames or not {'list', 'title'} <= {name.strip() for name in reader.fieldnames}:
+        raise ImportFormatError('El CSV debe tener las columnas "list" y "title"')
+    current = None
+    for row in reader:
+        row = {(key or '').strip(): value for key, value in row.items()}
+        where = f'Fila {reader.line_num}'
+        kind = (row.get('type') or 'task').strip().lower()
+        if kind == 'subtask':
+            if current is None:
+                raise ImportFormatError(f'{where}: subtarea sin una tarea antes')
+            current['subtasks'].append(_subtask_item(row, where))
+        elif kind == 'task':
+            if current is not None:
+                yield current
+            current = _task_item(row, where)
+        else:
+            raise ImportFormatError(f'{where}: tipo desconocido "{kind}"')
+    if current is not None:
+        yield current
+
+
+def _iter_json_objects(stream):
+    """Objetos de un arreglo JSON o de JSON Lines, decodificados de a uno"""
+    decoder = json.JSONDecoder()
+    buffer, index, eof, number = '', 0, False, 0
+    while True:
+        while index < len(buffer) and buffer[index] in ' \t\r\n,[]':
+            index += 1
+        if index < len(buffer):
+            try:
+                obj, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ImportFormatError(f'Elemento {number + 1}: JSON inválido ({e.msg})')
+            else:
+                number += 1
+                index = end
+                yield number, obj
+                continue
+        elif eof:
+            return
+        chunk = stream.read(_JSON_READ_SIZE)
+        eof = not chunk
+        buffer = buffer[index:] + chunk
+        index = 0
+
+
+def iter_json_items(stream):
+    """Tareas (con sus subtareas) de un JSON en ``stream`` (texto)"""
+    for number, data in _iter_json_objects(stream):
+        where = f'Elemento {number}'
+        if not isinstance(data, dict):
+            raise ImportFormatError(f'{where}: cada tarea debe ser un objeto')
+        item = _task_item(data, where)
+        subtasks = data.get('subtasks') or []
+        if not isinstance(subtasks, list):
+            raise ImportFormatError(f'{where}: "subtasks" debe ser un arreglo')
+        item['subtasks'] = [_subtask_item(subtask, where) for subtask in subtasks]
+        yield item
+
+
+def iter_import_items(stream, fmt):
+    return iter_csv_items(stream) if fmt == 'csv' else iter_json_items(stream)
+
+
+class _BoardImporter:
+    def __init__(self, board_user, user):
+        self.board_user = board_user
+        self.user = user
+        self.lists = {}
+        self.last_ranks = {}
+        self.stats = {'lists': 0, 'tasks': 0, 'subtasks': 0, 'chunks': 0}
+
+    def resolve_list(self, name):
+        """Lista del tablero con ese nombre (la crea si no existe)"""
+        list_obj = self.lists.get(name)
+        if list_obj is None:
+            list_obj = List.objects.filter(user=self.board_user, name=name).order_by('rank', 'id').first()
+            if list_obj is None:
+                list_obj = List.objects.create(
+                    name=name,
+                    user=self.board_user,
+                    rank=rank_for_position(List.objects.filter(user=self.board_user)),
+                    created_by=self.user,
+                )
+                self.stats['lists'] += 1
+            self.lists[name] = list_obj
+        return list_obj
+
+    def _last_rank(self, list_obj):
+        if list_obj.id not in self.last_ranks:
+            siblings = Task.objects.filter(list=list_obj)
+            rank = siblings.order_by('-rank', '-id').values_list('rank', flat=True).first()
+            if rank is not None and not is_valid_rank(rank):
+                rebalance_ranks(siblings)
+                rank = siblings.order_by('-rank', '-id').values_list('rank', flat=True).first()
+            self.last_ranks[list_obj.id] = rank
+        return self.last_ranks[list_obj.id]
+
+    def save_chunk(self, items):
+        by_list = {}
+        for item in items:
+            by_list.setdefault(self.resolve_list(item['list']).id, []).append(item)
+
+        tasks = []
+        for list_id, list_items in by_list.items():
+            list_obj = self.lists[list_items[0]['list']]
+            ranks = rank_sequence(len(list_items), self._last_rank(list_obj), None)
+            self.last_ranks[list_id] = ranks[-1]
+            for item, rank in zip(list_items, ranks):
+                task = Task(title=item['title'], list=list_obj, rank=rank, created_by=self.user)
+                if item['due_date']:
+                    task.due_date = item['due_date']
+                tasks.append((task, item['subtasks']))
+        Task.objects.bulk_create([task for task, _ in tasks], batch_size=IMPORT_BATCH_SIZE)
+
+        subtasks = []
+        for task, items in tasks:
+            for item, rank in zip(items, rank_sequence(len(items))):
+                subtask = Subtask(
+                    title=item['title'], task=task, completed=item['completed'], rank=rank, created_by=self.user
+                )
+                if item['due_date']:
+                    subtask.due_date = item['due_date']
+                subtasks.append(subtask)
+        Subtask.objects.bulk_create(subtasks, batch_size=IMPORT_BATCH_SIZE)
+
+        bump_board_version(self.board_user)
+        self.stats['tasks'] += len(tasks)
+        self.stats['subtasks'] += len(subtasks)
+        self.stats['chunks'] += 1
+
+
+def import_board(board_user, user, items, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Guarda en el tablero de board_user las tareas de ``items`` (ver
+    iter_import_items), creadas por ``user``. Llama a ``progress(stats)``
+    después de cada lote. Retorna un dict con las listas creadas, las tareas,
+    las subtareas y los lotes guardados.
+    """
+    importer = _BoardImporter(board_user, user)
+    items = iter(items)
+    try:
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                importer.save_chunk(chunk)
+            if progress:
+                progress(dict(importer.stats))
+    except ImportFormatError as e:
+        e.stats = dict(importer.stats)
+        raise
+    finally:
+        # Lo guardado hasta aquí queda confirmado: también se registra la actividad
+        if importer.stats['tasks']:
+            log_activities(user, [{
+                'activity_type': 'create_task',
+                'description': (
+                    f'Importó {importer.stats["tasks"]} tareas y {importer.stats["subtasks"]} subtareas'
+                    f' - Creadas por {user.username}'
+                ),
+            }])
+    return dict(importer.stats)
@@ -0,0 +1,180 @@
+"""
+Muestra el plan (EXPLAIN) de las consultas reales de las rutas más usadas:
+tablero, cambios, calendario, actividades, análisis de actividad,
+recordatorios e invitaciones.
+Uso: python manage.py audit_query_plans [--tasks 1000] [--boards 9] [--verbose-plans]
+
+Crea un tablero de prueba y --boards tableros más de otros usuarios (para que
+el tablero medido sea solo una parte de cada tabla, como en producción) dentro
+de una transacción que se revierte al final, así que no deja datos en la base.
+Las consultas se capturan ejecutando las vistas y las funciones de cada ruta,
+y se explican con EXPLAIN QUERY PLAN en
+SQLite o EXPLAIN en PostgreSQL. Termina con error si alguna recorre completa
+(SCAN / Seq Scan) una de las tablas grandes de HOT_TABLES: así un índice que
+falta o una consulta que deja de usarlo se detecta antes de llegar a producción.
+"""
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kanban.api_views import api_board, api_board_changes, api_calendar, api_activities, api_activity_analytics
+from kanban.board_context import is_shared_board_member, get_user_for_board
+from kanban.changes import encode_cursor
+from kanban.seeding import seed_board, seed_students, seed_activities
+from kanban.tasks import reminder_tasks_due, reminder_subtasks_due
+
+# Tablas que crecen con el uso: recorrerlas completas en una ruta caliente es una regresión
+HOT_TABLES = (
+    'kanban_task',
+    'kanban_subtask',
+    'kanban_taskattachment',
+    'kanban_subtaskattachment',
+    'kanban_activity',
+    'kanban_activitycomment',
+    'kanban_activitydailyrollup',
+    'kanban_invitation',
+    'kanban_deletedboarditem',
+)
+
+# "SCAN kanban_task" (SQLite, sin USING INDEX) o "Seq Scan on kanban_task" (PostgreSQL)
+_SQLITE_SCAN = re.compile(r'\bSCAN (\w+)(?: AS \w+)?\s*$')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Muestra los planes de las consultas de las rutas más usadas y detecta recorridos completos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000, help='Tareas de cada tablero de prueba')
+        parser.add_argument('--activities', type=int, default=1000, help='Actividades de cada tablero de prueba')
+        parser.add_argument('--boards', type=int, default=9, help='Tableros de otros usuarios que se crean además del medido')
+        parser.add_argument('--verbose-plans', action='store_true', help='Imprimir el plan de cada consulta')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Base de datos no soportada: {connection.vendor}')
+        scans = []
+        try:
+            with transaction.atomic():
+                for index in range(options['boards']):
+                    self.seed_other_board(index, options)
+                admin = User.objects.create_user(username='__plan_admin__', is_staff=True, is_superuser=True)
+                board_user = get_user_for_board(admin)
+                seed_board(board_user, tasks=options['tasks'], creator=admin)
+                students = seed_students(admin, count=5, prefix='plan')
+                seed_activities(board_user, [admin, *students], count=options['activities'])
+                self.analyze()
+
+                for path, run in self.paths(admin, students[0], board_user):
+                    with CaptureQueriesContext(connection) as ctx:
+                        run()
+                    scans.extend(self.report(path, ctx.captured_queries, options['verbose_plans']))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if scans:
+            raise CommandError(
+                f'{len(scans)} consulta(s) recorren tablas completas: '
+                + '; '.join(f'{path}: {table}' for path, table in scans)
+            )
+        self.stdout.write(self.style.SUCCESS('Ninguna consulta de las rutas calientes recorre tablas completas.'))
+
+    def seed_other_board(self, index, options):
+        """Tablero personal de un estudiante sin invitación e invitaciones de otro administrador"""
+        owner = User.objects.create_user(username=f'__plan_owner_{index}__')
+        seed_board(owner, tasks=options['tasks'], creator=owner)
+        seed_activities(owner, [owner], count=options['activities'])
+        other_admin = User.objects.create_user(username=f'__plan_other_admin_{index}__', is_staff=True)
+        seed_students(other_admin, count=5, prefix=f'plan_other_{index}')
+
+    def analyze(self):
+        """Estadísticas actualizadas para que el planificador vea el tablero de prueba"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                for table in HOT_TABLES:
+                    cursor.execute(f'ANALYZE {table}')
+            else:
+                cursor.execute('ANALYZE')
+
+    def paths(self, admin, student, board_user):
+        factory = APIRequestFactory()
+        today = timezone.localdate()
+
+        def view(view_func, user, path, params=None):
+            def run():
+                request = factory.get(path, params or {})
+                force_authenticate(request, user=user)
+                response = view_func(request)
+                if hasattr(response, 'render'):
+                    response.render()
+                if response.status_code != 200:
+                    raise CommandError(f'{path} respondió {response.status_code}')
+            return run
+
+        def membership():
+            cache.delete(f'kanban:board-membership:{student.id}')
+            is_shared_board_member(student)
+
+        def reminders():
+            for days in (1, 3, 7):
+                list(reminder_tasks_due(today + timedelta(days=days)))
+                list(reminder_subtasks_due(today + timedelta(days=days)))
+
+        since = encode_cursor(board_user, timezone.now() - timedelta(hours=1))
+        return (
+            ('tablero (administrador)', view(api_board, admin, '/api/board/')),
+            ('tablero (estudiante)', view(api_board, student, '/api/board/')),
+            ('cambios', view(api_board_changes, admin, '/api/board/changes/', {'since': since})),
+            ('calendario', view(api_calendar, admin, '/api/calendar/')),
+            ('actividades (administrador)', view(api_activities, admin, '/api/activities/')),
+            ('actividades (estudiante)', view(api_activities, student, '/api/activities/')),
+            ('actividades por tipo', view(api_activities, admin, '/api/activities/', {'type': 'edit_task'})),
+            ('análisis de actividad', view(api_activity_analytics, admin, '/api/analytics/activity/')),
+            ('recordatorios', reminders),
+            ('invitaciones', membership),
+        )
+
+    def explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+    def full_scans(self, plan):
+        pattern = _SQLITE_SCAN if connection.vendor == 'sqlite' else _POSTGRES_SCAN
+        tables = []
+        for line in plan:
+            match = pattern.search(line.strip())
+            if match and match.group(1) in HOT_TABLES:
+                tables.append(match.group(1))
+        return tables
+
+    def report(self, path, queries, verbose):
+        selects = [query['sql'] for query in queries if query['sql'].lstrip().upper().startswith('SELECT')]
+        scans = []
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{path}: {len(selects)} consultas'))
+        for sql in selects:
+            plan = self.explain(sql)
+            tables = self.full_scans(plan)
+            scans.extend((path, table) for table in tables)
+            if verbose or tables:
+                label = self.style.ERROR(f'  recorre {", ".join(tables)}: ') if tables else '  '
+                self.stdout.write(f'{label}{sql[:200]}')
+                for line in plan:
+                    self.stdout.write(f'      {line}')
+        return scans
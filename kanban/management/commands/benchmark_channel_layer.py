@@ -0,0 +1,158 @@
+"""
+Mide la entrega de mensajes de grupo del channel layer entre procesos.
+Uso: python manage.py benchmark_channel_layer --workers 4 --messages 2000 [--local-broker]
+
+Lanza --workers procesos que se suman a un mismo grupo (como los consumers de
+varios procesos de daphne) y envía --messages mensajes con group_send desde
+este proceso, como kanban.activity_log con las actividades. Sin --local-broker
+usa el layer de CHANNEL_LAYERS (ver CHANNEL_LAYER_URL en settings); con
+--local-broker usa LocalBrokerChannelLayer sobre un servidor local
+(kanban.channel_layers.LocalBroker), sin Redis ni PostgreSQL.
+
+Imprime los mensajes enviados por segundo y las entregas por segundo
+(mensajes × procesos). Termina con error si algún proceso no recibió todos los
+mensajes a tiempo o recibió alguno repetido.
+"""
+import asyncio
+import multiprocessing
+import queue
+import time
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban.channel_layers import BroadcastChannelLayer, LocalBroker, LocalBrokerChannelLayer
+
+
+def _make_layer(layer_config):
+    if layer_config is None:
+        # Proceso nuevo (spawn): el layer de settings necesita Django configurado
+        import django
+
+        django.setup()
+        return get_channel_layer()
+    return LocalBrokerChannelLayer(**layer_config)
+
+
+async def _consume(layer_config, group, expected, timeout, ready, results):
+    layer = _make_layer(layer_config)
+    channel = await layer.new_channel()
+    await layer.group_add(group, channel)
+    listening = getattr(layer, 'listening', None)
+    if listening is not None:
+        await asyncio.get_running_loop().run_in_executor(None, listening.wait, timeout)
+    ready.put(True)
+
+    seen, duplicates, finished = set(), 0, None
+    deadline = time.monotonic() + timeout
+    try:
+        while len(seen) < expected:
+            message = await asyncio.wait_for(layer.receive(channel), max(deadline - time.monotonic(), 0))
+            if message['seq'] in seen:
+                duplicates += 1
+            seen.add(message['seq'])
+            finished = time.time()
+    except asyncio.TimeoutError:
+        pass
+    results.put({'received': len(seen), 'duplicates': duplicates, 'finished': finished})
+    await layer.group_discard(group, channel)
+    if hasattr(layer, 'close'):
+        await layer.close()
+
+
+def _worker(layer_config, group, expected, timeout, ready, results):
+    asyncio.run(_consume(layer_config, group, expected, timeout, ready, results))
+
+
+class Command(BaseCommand):
+    help = 'Mide la entrega de mensajes de grupo del channel layer entre varios procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Procesos que reciben los mensajes')
+        parser.add_argument('--messages', type=int, default=2000, help='Mensajes enviados al grupo')
+        parser.add_argument('--payload-size', type=int, default=300, help='Bytes de texto de cada mensaje')
+        parser.add_argument('--timeout', type=float, default=60, help='Segundos de espera por los procesos')
+        parser.add_argument('--local-broker', action='store_true',
+                            help='Usar un servidor local en vez del layer configurado')
+
+    def handle(self, *args, **options):
+        broker = None
+        if options['local_broker']:
+            broker = LocalBroker().start()
+            layer_config = {'address': broker.address, 'authkey': broker.authkey}
+            layer = LocalBrokerChannelLayer(**layer_config)
+        else:
+            layer = get_channel_layer()
+            if layer is None or (
+                isinstance(layer, InMemoryChannelLayer) and not isinstance(layer, BroadcastChannelLayer)
+            ):
+                raise CommandError(
+                    'InMemoryChannelLayer no entrega mensajes entre procesos: '
+                    'configure CHANNEL_LAYER_URL o use --local-broker'
+                )
+            layer_config = None
+
+        try:
+            workers, results = self.run_workers(layer, layer_config, options)
+        finally:
+            if broker is not None:
+                broker.close()
+        self.report(layer, workers, results, options)
+
+    def run_workers(self, layer, layer_config, options):
+        group = f'benchmark.{uuid.uuid4().hex}'
+        messages, timeout = options['messages'], options['timeout']
+        # spawn también funciona en Windows (los scripts .bat del proyecto)
+        context = multiprocessing.get_context('spawn')
+        ready, results = context.Queue(), context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(layer_config, group, messages, timeout, ready, results), daemon=True)
+            for _ in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for _ in workers:
+                ready.get(timeout=timeout)
+        except queue.Empty:
+            raise CommandError('Los procesos no se suscribieron al grupo a tiempo')
+
+        body = 'x' * options['payload_size']
+        started = time.time()
+        async_to_sync(self.send_all)(layer, group, messages, body)
+        sent = time.time()
+
+        collected = []
+        try:
+            for _ in workers:
+                collected.append(results.get(timeout=timeout + 5))
+        except queue.Empty:
+            raise CommandError('Algún proceso no terminó a tiempo')
+        for worker in workers:
+            worker.join(timeout=5)
+        return workers, {'started': started, 'sent': sent, 'workers': collected}
+
+    async def send_all(self, layer, group, messages, body):
+        for seq in range(messages):
+            await layer.group_send(group, {'type': 'benchmark.message', 'seq': seq, 'body': body})
+
+    def report(self, layer, workers, results, options):
+        messages = options['messages']
+        started, sent = results['started'], results['sent']
+        received = sum(result['received'] for result in results['workers'])
+        duplicates = sum(result['duplicates'] for result in results['workers'])
+        finished = max((result['finished'] or sent) for result in results['workers'])
+        expected = messages * len(workers)
+
+        self.stdout.write(
+            f'{type(layer).__name__}: {len(workers)} procesos, {messages} mensajes de {options["payload_size"]} bytes'
+        )
+        self.stdout.write(f'Envío: {messages} mensajes en {sent - started:.2f} s '
+                          f'({messages / max(sent - started, 1e-9):.0f} msg/s)')
+        self.stdout.write(f'Entrega: {received} de {expected} en {finished - started:.2f} s '
+                          f'({received / max(finished - started, 1e-9):.0f} entregas/s)')
+        if received < expected or duplicates:
+            raise CommandError(f'Se perdieron {expected - received} entregas y se repitieron {duplicates}')
+        self.stdout.write(self.style.SUCCESS('Todos los procesos recibieron todos los mensajes.'))
@@ -0,0 +1,218 @@
+"""
+Benchmark de la API del tablero y de los recordatorios de Celery.
+Uso: python manage.py benchmark_kanban --scales 10,1000,50000 --output benchmark.json
+     python manage.py benchmark_kanban --compare benchmark-anterior.json
+
+Para cada escala crea, dentro de una transacción que se revierte al final, un
+tablero con esa cantidad de tareas (con subtareas y adjuntos), estudiantes
+invitados y actividades. Mide tiempo (mediana de --repeat ejecuciones),
+número de consultas y pico de memoria (tracemalloc) de cada operación, y guarda
+los resultados en JSON.
+
+Con --compare termina con error si alguna operación ejecuta más consultas que
+en el archivo anterior, o si su tiempo o memoria crecen más que --tolerance.
+Conviene ejecutarlo sobre una base vacía: el tablero compartido de los
+administradores incluye las tareas que ya existan.
+"""
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kanban.api_views import api_board, api_calendar, api_activities, api_reorder_tasks, api_move_task
+from kanban.models import List, Task
+from kanban.provisioning import ensure_default_lists
+from kanban.seeding import seed_board, seed_students, seed_activities
+from kanban.tasks import send_due_date_reminders, send_board_reminders_to_all_users
+from kanban.views import get_user_for_board
+
+DEFAULT_SCALES = '10,1000,50000'
+
+# Diferencias menores que estas no cuentan como regresión (ruido de medición)
+MIN_REGRESSION = {'wall_ms_min': 10, 'peak_kib': 256}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, consultas y memoria de la API del tablero en tableros de varios tamaños'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default=DEFAULT_SCALES, help='Tareas por tablero, separadas por comas')
+        parser.add_argument('--repeat', type=int, default=3, help='Ejecuciones por operación para medir el tiempo')
+        parser.add_argument('--students', type=int, default=5, help='Estudiantes invitados por tablero')
+        parser.add_argument('--output', default='kanban_benchmark.json', help='Archivo JSON de resultados')
+        parser.add_argument('--compare', help='Archivo JSON de una ejecución anterior para detectar regresiones')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Aumento relativo de tiempo o memoria aceptado al comparar (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(value) for value in options['scales'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError(f'--scales inválido: {options["scales"]}')
+
+        results = {}
+        # Los recordatorios no deben enviar correos reales, y /api/board/ no debe
+        # responder desde la instantánea en caché (las versiones se repiten al revertir)
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            for scale in scales:
+                self.stdout.write(f'Tablero de {scale} tareas...')
+                results[str(scale)] = self.run_scale(scale, options)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': self.get_commit(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+        self.stdout.write(f'Resultados guardados en {options["output"]}')
+
+        if options['compare']:
+            regressions = self.compare(options['compare'], results, options['tolerance'])
+            if regressions:
+                raise CommandError('Regresiones: ' + '; '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a ' + options['compare']))
+
+    def run_scale(self, scale, options):
+        measurements = {}
+        try:
+            with transaction.atomic():
+                admin = User.objects.create_user(
+                    username=f'__benchmark_admin_{scale}__', email='admin@example.com',
+                    is_staff=True, is_superuser=True
+                )
+                board_user = get_user_for_board(admin)
+                ensure_default_lists(board_user)
+                students = seed_students(admin, count=options['students'])
+                seed_board(board_user, tasks=scale, creator=admin)
+                seed_activities(board_user, students, count=scale)
+
+                # Reordenar invertida la lista de la primera tarea y mover una tarea a otra lista
+                first_list = Task.objects.filter(list__user=board_user).order_by('id').first().list
+                second_list = List.objects.filter(user=board_user).exclude(id=first_list.id).order_by('rank').first()
+                task_ids = list(Task.objects.filter(list=first_list).order_by('-rank').values_list('id', flat=True))
+                moved_task_id = task_ids[-1]
+
+                operations = [
+                    ('api_board', lambda: self.call(api_board, 'get', '/api/board/', admin)),
+                    ('api_calendar', lambda: self.call(api_calendar, 'get', '/api/calendar/', admin)),
+                    ('api_activities', lambda: self.call(api_activities, 'get', '/api/activities/', admin)),
+                    ('api_reorder_tasks', lambda: self.call(
+                        api_reorder_tasks, 'post', '/api/tasks/reorder/', admin,
+                        {'list_id': first_list.id, 'task_ids': task_ids}
+                    )),
+                    ('api_move_task', lambda: self.call(
+                        api_move_task, 'post', f'/api/tasks/{moved_task_id}/move/', admin,
+                        {'list_id': second_list.id}, task_id=moved_task_id
+                    )),
+                    ('send_due_date_reminders', send_due_date_reminders),
+                    ('send_board_reminders_to_all_users', send_board_reminders_to_all_users),
+                ]
+
+                for name, operation in operations:
+                    measurements[name] = self.measure(operation, options['repeat'])
+                    self.stdout.write(
+                        f'  {name:34} {measurements[name]["wall_ms"]:10.1f} ms '
+                        f'{measurements[name]["queries"]:7} consultas '
+                        f'{measurements[name]["peak_kib"] / 1024:8.1f} MiB'
+                    )
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return measurements
+
+    def call(self, view, method, path, user, data=None, **kwargs):
+        factory = APIRequestFactory()
+        if method == 'get':
+            request = factory.get(path)
+        else:
+            request = factory.post(path, data or {}, format='json')
+        force_authenticate(request, user=user)
+        response = view(request, **kwargs)
+        if response.status_code >= 400:
+            raise CommandError(f'{path} respondió {response.status_code}')
+        response.render()
+        return response
+
+    def measure(self, operation, repeat):
+        """
+        Cada ejecución corre dentro de un savepoint que se revierte, para que
+        todas partan del mismo estado. La primera no se mide (calienta cachés
+        de Python y de la base de datos).
+        """
+        sid = transaction.savepoint()
+        operation()
+        transaction.savepoint_rollback(sid)
+
+        timings = []
+        for _ in range(max(repeat, 1)):
+            sid = transaction.savepoint()
+            start = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - start) * 1000)
+            transaction.savepoint_rollback(sid)
+
+        sid = transaction.savepoint()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as ctx:
+            operation()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        transaction.savepoint_rollback(sid)
+
+        return {
+            'wall_ms': round(statistics.median(timings), 2),
+            'wall_ms_min': round(min(timings), 2),
+            'queries': len(ctx.captured_queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, path, results, tolerance):
+        try:
+            with open(path, encoding='utf-8') as previous_file:
+                previous = json.load(previous_file)['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'No se pudo leer {path}: {e}')
+
+        regressions = []
+        for scale, operations in results.items():
+            for name, current in operations.items():
+                before = previous.get(scale, {}).get(name)
+                if not before:
+                    continue
+                label = f'{name} ({scale} tareas)'
+                if current['queries'] > before['queries']:
+                    regressions.append(f'{label}: {before["queries"]} -> {current["queries"]} consultas')
+                # Se compara el mejor tiempo, menos sensible al ruido que la mediana
+                for key, unit in (('wall_ms_min', 'ms'), ('peak_kib', 'KiB')):
+                    grew = current[key] - before[key]
+                    if grew > MIN_REGRESSION[key] and current[key] > before[key] * (1 + tolerance):
+                        regressions.append(f'{label}: {before[key]} -> {current[key]} {unit}')
+        return regressions
@@ -0,0 +1,101 @@
+"""
+Compara el costo de codificar /api/board/ y /api/calendar/ con cada renderer.
+Uso: python manage.py benchmark_renderers --tasks 5000 --iterations 5
+
+Crea un tablero de prueba dentro de una transacción que se revierte al final.
+Para cada endpoint y renderer imprime el mejor tiempo de codificación y el
+tamaño de la respuesta (sin comprimir y con gzip). Termina con error si la
+respuesta de orjson o de MessagePack no contiene los mismos datos que la de
+JSONRenderer.
+"""
+import gzip
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kanban.api_views import api_board, api_calendar
+from kanban.renderers import ORJSONRenderer, MessagePackRenderer, msgpack, orjson
+from kanban.seeding import seed_board
+from kanban.views import get_user_for_board
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compara tiempo de codificación y tamaño de /api/board/ y /api/calendar/ por renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Tareas del tablero de prueba')
+        parser.add_argument('--iterations', type=int, default=5, help='Repeticiones por renderer (se toma la mejor)')
+
+    def handle(self, *args, **options):
+        renderers = [('json', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('orjson', ORJSONRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('orjson no está instalado: ORJSONRenderer usa json de la biblioteca estándar'))
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack no está instalado: se omite application/msgpack'))
+
+        payloads = {}
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='__renderer_benchmark__', is_staff=True, is_superuser=True)
+                board_user = get_user_for_board(user)
+                seed_board(board_user, tasks=options['tasks'], creator=user)
+                payloads['/api/board/'] = self.fetch(api_board, '/api/board/', user)
+                payloads['/api/calendar/'] = self.fetch(api_calendar, '/api/calendar/', user)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        failures = []
+        for path, data in payloads.items():
+            expected = json.loads(JSONRenderer().render(data))
+            baseline = None
+            self.stdout.write(f'{path} ({options["tasks"]} tareas)')
+            for name, renderer in renderers:
+                elapsed, body = self.encode(renderer, data, options['iterations'])
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f'  {name:8} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:4.1f}  '
+                    f'{len(body) / 1024:9.1f} KiB  {len(gzip.compress(body)) / 1024:8.1f} KiB gzip'
+                )
+                if self.decode(name, body) != expected:
+                    failures.append(f'{path}: {name} no produce los mismos datos que JSONRenderer')
+
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Todos los renderers producen los mismos datos.'))
+
+    def fetch(self, view, path, user):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=user)
+        response = view(request)
+        if response.status_code != 200:
+            raise CommandError(f'{path} respondió {response.status_code}')
+        return response.data
+
+    def encode(self, renderer, data, iterations):
+        best = None
+        body = b''
+        for _ in range(max(iterations, 1)):
+            start = time.perf_counter()
+            body = renderer.render(data)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
+
+    def decode(self, name, body):
+        if name == 'msgpack':
+            return msgpack.unpackb(body, raw=False)
+        return json.loads(body)
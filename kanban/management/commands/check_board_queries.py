@@ -0,0 +1,92 @@
+"""
+Verifica que /api/board/ ejecute un número fijo de consultas sin importar el tamaño del tablero.
+Uso: python manage.py check_board_queries --tasks 5000 --budget 20
+
+Crea un tablero de prueba dentro de una transacción que se revierte al final,
+por lo que no deja datos en la base. Termina con error si se excede el presupuesto,
+si el número de consultas crece con el tamaño del tablero o si la lectura del
+tablero escribe en la base (los tableros se preparan en kanban.provisioning).
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from kanban.api_views import api_board
+from kanban.board import BOARD_QUERY_BUDGET
+from kanban.board_cache import bump_board_version
+from kanban.seeding import seed_board
+from kanban.views import get_user_for_board
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _is_read(sql):
+    return sql.lstrip().split(None, 1)[0].upper() in ('SELECT', 'SAVEPOINT', 'RELEASE')
+
+
+class Command(BaseCommand):
+    help = 'Verifica el presupuesto de consultas de /api/board/ en un tablero grande'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Tareas del tablero grande')
+        parser.add_argument('--budget', type=int, default=BOARD_QUERY_BUDGET, help='Máximo de consultas permitidas')
+        parser.add_argument('--page-size', type=int, default=0, help='Medir /api/board/ paginado con este tamaño de página')
+        parser.add_argument('--verbose-queries', action='store_true', help='Imprimir las consultas ejecutadas')
+
+    def handle(self, *args, **options):
+        results = []
+        try:
+            with transaction.atomic():
+                admin = User.objects.create_user(username='__query_budget_admin__', is_staff=True, is_superuser=True)
+                student = User.objects.create_user(username='__query_budget_student__')
+
+                for label, user in (('administrador', admin), ('estudiante', student)):
+                    board_user = get_user_for_board(user)
+                    seed_board(board_user, tasks=10, creator=user)
+                    # Las listas por defecto y las preferencias se crearon junto con el usuario
+                    self.measure(user, dict(options, verbose_queries=False))
+                    # Invalidar la instantánea para medir la construcción completa, no la caché
+                    bump_board_version(board_user)
+                    small = self.measure(user, options)
+                    seed_board(board_user, tasks=options['tasks'], creator=user)
+                    large = self.measure(user, options)
+                    results.append((label, small, large))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        failures = []
+        for label, small, large in results:
+            self.stdout.write(f'{label}: {small} consultas (tablero pequeño), {large} consultas ({options["tasks"]} tareas extra)')
+            if large > options['budget']:
+                failures.append(f'{label}: {large} consultas superan el presupuesto de {options["budget"]}')
+            if large != small:
+                failures.append(f'{label}: las consultas crecen con el tablero ({small} -> {large})')
+
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Presupuesto de consultas de /api/board/ respetado.'))
+
+    def measure(self, user, options):
+        factory = APIRequestFactory()
+        params = {'q': 'Tarea'}
+        if options['page_size']:
+            params['page_size'] = options['page_size']
+        request = factory.get('/api/board/', params)
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_board(request)
+            response.render()
+        if response.status_code != 200:
+            raise CommandError(f'/api/board/ respondió {response.status_code}')
+        if options['verbose_queries']:
+            for query in ctx.captured_queries:
+                self.stdout.write(query['sql'])
+        writes = [query['sql'] for query in ctx.captured_queries if not _is_read(query['sql'])]
+        if writes:
+            raise CommandError(f'/api/board/ escribió en la base: {writes[0]}')
+        return len(ctx.captured_queries)
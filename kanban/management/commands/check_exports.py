@@ -0,0 +1,98 @@
+"""
+Verifica que las exportaciones del tablero dejen fuera las tareas archivadas.
+Uso: python manage.py check_exports --tasks 6
+
+Crea un tablero de prueba dentro de una transacción que se revierte al final,
+archiva una tarea del medio y exporta el tablero en CSV y NDJSON. Termina con
+error si falta alguna subtarea de las tareas activas (el CSV recorre tareas y
+subtareas a la par) o si aparece la tarea archivada, sus subtareas o sus
+adjuntos.
+"""
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from kanban.board_context import get_user_for_board
+from kanban.exporting import iter_csv, iter_export_records
+from kanban.models import Task, Subtask, TaskAttachment, SubtaskAttachment
+from kanban.seeding import seed_board
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Verifica que las exportaciones no incluyan tareas archivadas ni pierdan subtareas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=6, help='Tareas del tablero de prueba (al menos 3)')
+
+    def handle(self, *args, **options):
+        if options['tasks'] < 3:
+            raise CommandError('Se necesitan al menos 3 tareas para archivar una del medio')
+        failures = []
+        try:
+            with transaction.atomic():
+                admin = User.objects.create_user(username='__export_check__', is_staff=True, is_superuser=True)
+                board_user = get_user_for_board(admin)
+                seed_board(board_user, tasks=options['tasks'], lists=1, creator=admin)
+                tasks = list(Task.objects.filter(list__user=board_user, title__startswith='Tarea ').order_by('rank', 'id'))
+                archived = tasks[len(tasks) // 2]
+                Task.all_objects.filter(id=archived.id).update(archived_at=timezone.now())
+                failures.extend(self.check_csv(board_user, archived))
+                failures.extend(self.check_records(board_user, admin, archived))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Las exportaciones dejan fuera la tarea archivada y conservan el resto.'))
+
+    def check_csv(self, board_user, archived):
+        text = b''.join(iter_csv(board_user)).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(text)))[1:]
+        exported = [row[2] for row in rows if row[0] == 'subtask']
+        expected = list(Subtask.objects.filter(
+            task__list__user=board_user, task__archived_at__isnull=True
+        ).values_list('title', flat=True))
+        failures = []
+        # Sobran si se cuelan las de la tarea archivada; faltan si el recorrido a la par se corta
+        if len(exported) != len(expected):
+            failures.append(f'CSV: {len(exported)} subtareas exportadas de {len(expected)}')
+        if any(row[0] == 'task' and row[2] == archived.title for row in rows):
+            failures.append('CSV: incluye la tarea archivada')
+        self.stdout.write(f'CSV: {len(exported)} subtareas de {len(expected)}')
+        return failures
+
+    def check_records(self, board_user, user, archived):
+        counts = {}
+        failures = []
+        archived_subtasks = set(Subtask.objects.filter(task=archived).values_list('id', flat=True))
+        for record in iter_export_records(board_user, user):
+            counts[record['type']] = counts.get(record['type'], 0) + 1
+            if (
+                (record['type'] == 'task' and record['id'] == archived.id)
+                or (record['type'] in ('subtask', 'task_attachment') and record.get('task_id') == archived.id)
+                or (record['type'] == 'subtask_attachment' and record['subtask_id'] in archived_subtasks)
+            ):
+                failures.append(f'NDJSON: {record["type"]} {record["id"]} pertenece a la tarea archivada')
+        expected = {
+            'subtask': Subtask.objects.filter(task__list__user=board_user, task__archived_at__isnull=True).count(),
+            'task_attachment': TaskAttachment.objects.filter(
+                task__list__user=board_user, task__archived_at__isnull=True
+            ).count(),
+            'subtask_attachment': SubtaskAttachment.objects.filter(
+                subtask__task__list__user=board_user, subtask__task__archived_at__isnull=True
+            ).count(),
+        }
+        for record_type, count in expected.items():
+            self.stdout.write(f'NDJSON: {counts.get(record_type, 0)} {record_type} de {count}')
+            if counts.get(record_type, 0) != count:
+                failures.append(f'NDJSON: {counts.get(record_type, 0)} {record_type} exportados de {count}')
+        return failures
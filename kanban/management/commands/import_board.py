@@ -0,0 +1,62 @@
+"""
+Importa tareas y subtareas desde un archivo CSV o JSON (ver kanban/importing.py).
+Uso: python manage.py import_board tareas.csv --user admin
+
+Las tareas se crean en el tablero que usa --user (el compartido si es
+administrador o estudiante invitado) y quedan creadas por ese usuario. El
+archivo se lee por partes y se guarda por lotes; se imprime el avance después
+de cada lote.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban.activity_log import flush_activities
+from kanban.importing import IMPORT_CHUNK_SIZE, ImportFormatError, detect_format, import_board, iter_import_items
+from kanban.views import get_user_for_board
+
+
+class Command(BaseCommand):
+    help = 'Importa tareas y subtareas desde un archivo CSV o JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo CSV o JSON')
+        parser.add_argument('--user', required=True, help='Usuario que importa las tareas')
+        parser.add_argument('--format', choices=('csv', 'json'), help='Formato (por defecto según la extensión)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Tareas por transacción')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Usuario no encontrado: {options["user"]}')
+        board_user = get_user_for_board(user)
+        started = time.perf_counter()
+
+        def progress(stats):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Lote {stats["chunks"]}: {stats["tasks"]} tareas, {stats["subtasks"]} subtareas ({elapsed:.1f} s)'
+            )
+
+        try:
+            fmt = detect_format(options['path'], options['format'])
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                stats = import_board(
+                    board_user, user, iter_import_items(stream, fmt),
+                    chunk_size=max(1, options['chunk_size']), progress=progress
+                )
+        except ImportFormatError as e:
+            raise CommandError(f'{e} (importado hasta aquí: {e.stats})')
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        finally:
+            # Registrar la actividad de la importación antes de que termine el proceso
+            flush_activities()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{stats["tasks"]} tareas y {stats["subtasks"]} subtareas importadas en {elapsed:.1f} s '
+            f'({stats["lists"]} listas nuevas) en el tablero de {board_user.username}.'
+        ))
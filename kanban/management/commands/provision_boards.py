@@ -0,0 +1,36 @@
+"""
+Prepara los tableros que ya existían: listas básicas y preferencias.
+Uso: python manage.py provision_boards
+
+Los tableros nuevos se preparan al crear el usuario o al aceptar una invitación
+(ver kanban/provisioning.py y kanban/signals.py). Este comando completa los
+anteriores; se puede ejecutar cuantas veces se quiera.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kanban.board_context import get_shared_admin_user
+from kanban.models import Invitation
+from kanban.provisioning import provision_board
+
+
+class Command(BaseCommand):
+    help = 'Crea las listas básicas y las preferencias de los tableros existentes'
+
+    def handle(self, *args, **options):
+        invited = Invitation.objects.filter(accepted=True).values('student_id')
+        # Estudiantes con tablero propio: ni administradores ni invitados
+        owners = User.objects.filter(is_staff=False, is_superuser=False).exclude(id__in=invited)
+
+        boards = updated = 0
+        with transaction.atomic():
+            if provision_board(get_shared_admin_user()):
+                updated += 1
+            boards += 1
+        for user in owners.order_by('id').iterator():
+            with transaction.atomic():
+                if provision_board(user):
+                    updated += 1
+            boards += 1
+        self.stdout.write(self.style.SUCCESS(f'{boards} tablero(s) revisados, {updated} actualizado(s).'))
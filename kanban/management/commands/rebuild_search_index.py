@@ -0,0 +1,24 @@
+"""
+Vuelve a crear los índices de búsqueda del tablero (ver kanban/search.py).
+Uso: python manage.py rebuild_search_index
+
+En SQLite elimina y recrea la tabla FTS5 y sus triggers con los datos actuales.
+Es necesario después de una migración que reconstruya las tablas de tareas,
+subtareas, adjuntos o actividades, porque SQLite descarta sus triggers.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from kanban.search import create_search_index, drop_search_index, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a crear los índices de búsqueda del tablero'
+
+    def handle(self, *args, **options):
+        # schema_editor() ya es atómico; en SQLite no puede abrirse dentro de otra
+        # transacción porque desactiva las claves foráneas antes de empezar
+        with connection.schema_editor() as schema_editor:
+            drop_search_index(schema_editor)
+            create_search_index(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f'Índices de búsqueda recreados (motor: {get_search_backend()}).'))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0013_create_initial_superuser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='boardpreference',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Versión del tablero'),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='activity_type',
+            field=models.CharField(choices=[('create_task', 'Crear Tarea'), ('edit_task', 'Editar Tarea'), ('delete_task', 'Eliminar/Cerrar Tarea'), ('move_task', 'Mover Tarea'), ('create_list', 'Crear Lista'), ('create_subtask', 'Crear Subtarea'), ('edit_subtask', 'Editar Subtarea'), ('toggle_subtask', 'Completar/Descompletar Subtarea'), ('delete_subtask', 'Eliminar Subtarea'), ('add_attachment', 'Adjuntar archivo'), ('delete_attachment', 'Eliminar archivo')], max_length=50, verbose_name='Tipo de Actividad'),
+        ),
+    ]
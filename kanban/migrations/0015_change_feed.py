@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0014_boardpreference_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última actualización'),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última actualización'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última actualización'),
+        ),
+        migrations.CreateModel(
+            name='DeletedBoardItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('list', 'Lista'), ('task', 'Tarea'), ('subtask', 'Subtarea'), ('task_attachment', 'Adjunto de Tarea'), ('subtask_attachment', 'Adjunto de Subtarea')], max_length=20, verbose_name='Tipo')),
+                ('object_id', models.BigIntegerField(verbose_name='ID del elemento')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de eliminación')),
+                ('board_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_board_items', to=settings.AUTH_USER_MODEL, verbose_name='Tablero')),
+            ],
+            options={
+                'verbose_name': 'Elemento eliminado',
+                'verbose_name_plural': 'Elementos eliminados',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['board_user', 'deleted_at'], name='kanban_deleted_board_idx')],
+            },
+        ),
+    ]
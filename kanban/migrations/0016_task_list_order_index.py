@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0015_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['list', 'order', 'id'], name='kanban_task_list_order_idx'),
+        ),
+    ]
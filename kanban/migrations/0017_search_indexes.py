@@ -0,0 +1,30 @@
+"""
+Migración personalizada para la búsqueda de texto del tablero (ver kanban/search.py).
+
+- PostgreSQL: extensión pg_trgm e índices GIN de texto completo y trigramas.
+- SQLite: tabla virtual FTS5 kanban_search_fts, triggers que la mantienen y
+  carga inicial con los datos existentes. Si SQLite no tiene FTS5 no se crea
+  nada y la búsqueda usa icontains.
+"""
+from django.db import migrations
+
+from kanban.search import create_search_index, drop_search_index
+
+
+def create_search_indexes(apps, schema_editor):
+    create_search_index(schema_editor)
+
+
+def drop_search_indexes(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0016_task_list_order_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
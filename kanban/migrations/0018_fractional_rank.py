@@ -0,0 +1,106 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+from kanban.ranking import rank_sequence
+from kanban.search import create_search_index, drop_search_index
+
+
+def _backfill(model, parent_field, batch_size=1000):
+    """Asigna claves consecutivas a los hijos de cada padre, según (order, id)"""
+    pending = []
+    group = []
+    current_parent = None
+
+    def flush_group():
+        for obj_id, rank in zip(group, rank_sequence(len(group))):
+            pending.append(model(id=obj_id, rank=rank))
+
+    rows = model.objects.order_by(parent_field, 'order', 'id').values_list('id', parent_field)
+    for obj_id, parent_id in rows.iterator(chunk_size=batch_size):
+        if parent_id != current_parent:
+            flush_group()
+            group = []
+            current_parent = parent_id
+        group.append(obj_id)
+        if len(pending) >= batch_size:
+            model.objects.bulk_update(pending, ['rank'])
+            pending = []
+    flush_group()
+    model.objects.bulk_update(pending, ['rank'], batch_size=batch_size)
+
+
+def backfill_ranks(apps, schema_editor):
+    _backfill(apps.get_model('kanban', 'List'), 'user_id')
+    _backfill(apps.get_model('kanban', 'Task'), 'list_id')
+    _backfill(apps.get_model('kanban', 'Subtask'), 'task_id')
+
+
+# En SQLite, agregar columnas reconstruye las tablas (renombrándolas), lo que
+# falla con los triggers de búsqueda de otras tablas que las referencian:
+# se quitan antes y se vuelven a crear al final
+
+def drop_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        drop_search_index(schema_editor)
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        create_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0017_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        migrations.AlterModelOptions(
+            name='list',
+            options={'ordering': ['rank', 'id'], 'verbose_name': 'Lista', 'verbose_name_plural': 'Listas'},
+        ),
+        migrations.AlterModelOptions(
+            name='subtask',
+            options={'ordering': ['rank', 'id'], 'verbose_name': 'Subtarea', 'verbose_name_plural': 'Subtareas'},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['rank', 'id'], 'verbose_name': 'Tarea', 'verbose_name_plural': 'Tareas'},
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='kanban_task_list_order_idx',
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='rank',
+            field=models.CharField(default='', max_length=255, verbose_name='Clave de orden'),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='rank',
+            field=models.CharField(default='', max_length=255, verbose_name='Clave de orden'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default='', max_length=255, verbose_name='Clave de orden'),
+        ),
+        migrations.RunPython(backfill_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['user', 'rank', 'id'], name='kanban_list_user_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['task', 'rank', 'id'], name='kanban_subtask_task_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['list', 'rank', 'id'], name='kanban_task_list_rank_idx'),
+        ),
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:03
+
+from django.db import migrations, models
+import django.db.models.manager
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0018_fractional_rank'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'base_manager_name': 'all_objects', 'ordering': ['rank', 'id'], 'verbose_name': 'Tarea', 'verbose_name_plural': 'Tareas'},
+        ),
+        migrations.AlterModelManagers(
+            name='task',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='kanban_task_list_rank_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Archivada el'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['list', 'rank', 'id'], name='kanban_task_active_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', False)), fields=['list', '-archived_at', '-id'], name='kanban_task_archived_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0019_task_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['-created_at', '-id'], name='kanban_activity_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='kanban_activity_user_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0020_activity_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='activity_archive/', verbose_name='Archivo')),
+                ('oldest', models.DateTimeField(verbose_name='Actividad más antigua')),
+                ('newest', models.DateTimeField(verbose_name='Actividad más reciente')),
+                ('activities', models.PositiveIntegerField(verbose_name='Actividades')),
+                ('comments', models.PositiveIntegerField(verbose_name='Comentarios')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Archivo de actividades',
+                'verbose_name_plural': 'Archivos de actividades',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('activity_type', models.CharField(choices=[('create_task', 'Crear Tarea'), ('edit_task', 'Editar Tarea'), ('delete_task', 'Eliminar/Cerrar Tarea'), ('move_task', 'Mover Tarea'), ('create_list', 'Crear Lista'), ('create_subtask', 'Crear Subtarea'), ('edit_subtask', 'Editar Subtarea'), ('toggle_subtask', 'Completar/Descompletar Subtarea'), ('delete_subtask', 'Eliminar Subtarea'), ('add_attachment', 'Adjuntar archivo'), ('delete_attachment', 'Eliminar archivo')], max_length=50, verbose_name='Tipo de Actividad')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Cantidad')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de actividades',
+                'verbose_name_plural': 'Resúmenes diarios de actividades',
+                'ordering': ['-day'],
+                'unique_together': {('day', 'user', 'activity_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Los resúmenes pasan a contar todas las actividades, no solo las archivadas:
+    los existentes quedan en el tablero compartido (el único donde se registran
+    actividades) y se les suman las actividades que siguen en la tabla.
+    """
+    User = apps.get_model('auth', 'User')
+    Activity = apps.get_model('kanban', 'Activity')
+    ActivityDailyRollup = apps.get_model('kanban', 'ActivityDailyRollup')
+    if not Activity.objects.exists() and not ActivityDailyRollup.objects.exists():
+        return
+    board_user, _ = User.objects.get_or_create(
+        username='admin_shared', defaults={'is_staff': True, 'is_superuser': True}
+    )
+    ActivityDailyRollup.objects.update(board_user=board_user)
+    existing = {
+        (rollup.day, rollup.user_id, rollup.activity_type): rollup
+        for rollup in ActivityDailyRollup.objects.all()
+    }
+    live = Activity.objects.annotate(day=TruncDate('created_at')).values(
+        'day', 'user_id', 'activity_type'
+    ).annotate(total=Count('id')).order_by()
+    new_rollups = []
+    for row in live:
+        rollup = existing.get((row['day'], row['user_id'], row['activity_type']))
+        if rollup is None:
+            new_rollups.append(ActivityDailyRollup(
+                day=row['day'], board_user=board_user, user_id=row['user_id'],
+                activity_type=row['activity_type'], count=row['total'],
+            ))
+        else:
+            rollup.count += row['total']
+            rollup.save(update_fields=['count'])
+    ActivityDailyRollup.objects.bulk_create(new_rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0021_activity_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitydailyrollup',
+            name='board_user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='board_activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Tablero'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Separada de 0022: en PostgreSQL no se puede alterar la tabla en la misma
+    # transacción que actualizó sus filas
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0022_activity_rollup_board'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitydailyrollup',
+            name='board_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='board_activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Tablero'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='activitydailyrollup',
+            unique_together={('board_user', 'day', 'user', 'activity_type')},
+        ),
+    ]
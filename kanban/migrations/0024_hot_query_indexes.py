@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0023_activity_rollup_board_required'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['student', 'accepted'], name='kanban_invitation_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['due_date'], name='kanban_subtask_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True), ('reminder_sent', False)), fields=['due_date'], name='kanban_task_reminder_idx'),
+        ),
+    ]
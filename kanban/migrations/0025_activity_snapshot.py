@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+from kanban.search import create_search_index, drop_search_index
+
+
+def backfill_snapshots(apps, schema_editor):
+    """
+    Copia en ``snapshot`` los nombres actuales de cada actividad existente: las
+    nuevas los guardan al registrarse (ver kanban.activity_log.write_activities).
+    """
+    Activity = apps.get_model('kanban', 'Activity')
+    activities = Activity.objects.select_related(
+        'user', 'task__created_by', 'list__created_by', 'subtask__created_by'
+    ).order_by('id')
+    batch = []
+    for activity in activities.iterator(chunk_size=2000):
+        task, list_obj, subtask = activity.task, activity.list, activity.subtask
+        creators = [obj.created_by for obj in (task, subtask, list_obj) if obj and obj.created_by]
+        activity.snapshot = {
+            'username': activity.user.username,
+            'task_title': task.title if task else None,
+            'list_name': list_obj.name if list_obj else None,
+            'subtask_title': subtask.title if subtask else None,
+            'creator': creators[0].username if creators else None,
+        }
+        batch.append(activity)
+        if len(batch) >= 2000:
+            Activity.objects.bulk_update(batch, ['snapshot'])
+            batch = []
+    Activity.objects.bulk_update(batch, ['snapshot'])
+
+
+# En SQLite, agregar la columna reconstruye kanban_activity y se pierden sus
+# triggers de búsqueda: se quitan antes y se vuelven a crear al final (como en 0018)
+
+def drop_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        drop_search_index(schema_editor)
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        create_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0024_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        migrations.AddField(
+            model_name='activity',
+            name='snapshot',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Datos al registrar'),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
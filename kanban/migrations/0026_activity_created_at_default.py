@@ -0,0 +1,36 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+from kanban.search import create_search_index, drop_search_index
+
+
+# En SQLite, cambiar la columna reconstruye kanban_activity y se pierden sus
+# triggers de búsqueda: se quitan antes y se vuelven a crear al final (como en 0025)
+
+def drop_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        drop_search_index(schema_editor)
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        create_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0025_activity_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        migrations.AlterField(
+            model_name='activity',
+            name='created_at',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name='Fecha de creación'
+            ),
+        ),
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
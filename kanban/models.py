@@ -11,33 +11,83 @@ def default_due_date():
 class List(models.Model):
     """Modelo para las columnas del tablero Kanban"""
     name = models.CharField(max_length=100, verbose_name="Nombre")
+    # order ya no se mantiene ni se envía en la API: el orden lo da rank (ver
+    # kanban.ranking). Igual en Task y Subtask.
     order = models.IntegerField(default=0, verbose_name="Orden")
+    rank = models.CharField(max_length=255, default='', verbose_name="Clave de orden")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lists', verbose_name="Usuario")
     color = models.CharField(max_length=50, default='yellow', verbose_name="Color")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_lists', verbose_name="Creado por")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última actualización")
 
     class Meta:
         verbose_name = "Lista"
         verbose_name_plural = "Listas"
-        ordering = ['order']
+        ordering = ['rank', 'id']
+        indexes = [
+            models.Index(fields=['user', 'rank', 'id'], name='kanban_list_user_rank_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class TaskQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(archived_at__isnull=True)
+
+    def archived(self):
+        return self.filter(archived_at__isnull=False)
+
+
+class ActiveTaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """Solo las tareas activas: las archivadas (ver kanban.archive) quedan fuera del tablero"""
+
+    def get_queryset(self):
+        return super().get_queryset().active()
+
+
 class Task(models.Model):
     """Modelo para las tareas/tarjetas del tablero Kanban"""
     title = models.CharField(max_length=200, verbose_name="Título")
     list = models.ForeignKey(List, on_delete=models.CASCADE, related_name='tasks', verbose_name="Lista")
     order = models.IntegerField(default=0, verbose_name="Orden")
+    rank = models.CharField(max_length=255, default='', verbose_name="Clave de orden")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_tasks', verbose_name="Creado por")
     due_date = models.DateField(default=default_due_date, verbose_name="Fecha de vencimiento")
     reminder_sent = models.BooleanField(default=False, verbose_name="Recordatorio enviado")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última actualización")
+    archived_at = models.DateTimeField(null=True, blank=True, verbose_name="Archivada el")
+
+    # objects solo ve las tareas activas; all_objects también las archivadas
+    objects = ActiveTaskManager()
+    all_objects = TaskQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Tarea"
         verbose_name_plural = "Tareas"
-        ordering = ['order']
+        ordering = ['rank', 'id']
+        base_manager_name = 'all_objects'
+        indexes = [
+            # Índices parciales: el tablero solo recorre las tareas activas y la
+            # búsqueda en el archivo solo las archivadas
+            models.Index(
+                fields=['list', 'rank', 'id'],
+                name='kanban_task_active_rank_idx',
+                condition=models.Q(archived_at__isnull=True),
+            ),
+            models.Index(
+                fields=['list', '-archived_at', '-id'],
+                name='kanban_task_archived_idx',
+                condition=models.Q(archived_at__isnull=False),
+            ),
+            # Recordatorios por fecha de vencimiento (ver kanban.tasks.reminder_tasks_due)
+            models.Index(
+                fields=['due_date'],
+                name='kanban_task_reminder_idx',
+                condition=models.Q(reminder_sent=False, archived_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -49,18 +99,56 @@ class Subtask(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='subtasks', verbose_name="Tarea")
     completed = models.BooleanField(default=False, verbose_name="Completada")
     order = models.IntegerField(default=0, verbose_name="Orden")
+    rank = models.CharField(max_length=255, default='', verbose_name="Clave de orden")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_subtasks', verbose_name="Creado por")
     due_date = models.DateField(default=default_due_date, verbose_name="Fecha de vencimiento")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última actualización")
 
     class Meta:
         verbose_name = "Subtarea"
         verbose_name_plural = "Subtareas"
-        ordering = ['order']
+        ordering = ['rank', 'id']
+        indexes = [
+            models.Index(fields=['task', 'rank', 'id'], name='kanban_subtask_task_rank_idx'),
+            # Recordatorios de subtareas pendientes (ver kanban.tasks.reminder_subtasks_due)
+            models.Index(
+                fields=['due_date'],
+                name='kanban_subtask_pending_due_idx',
+                condition=models.Q(completed=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class DeletedBoardItem(models.Model):
+    """Registro de elementos eliminados del tablero (tombstones) para la sincronización incremental"""
+    OBJECT_TYPES = [
+        ('list', 'Lista'),
+        ('task', 'Tarea'),
+        ('subtask', 'Subtarea'),
+        ('task_attachment', 'Adjunto de Tarea'),
+        ('subtask_attachment', 'Adjunto de Subtarea'),
+    ]
+
+    board_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deleted_board_items', verbose_name="Tablero")
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPES, verbose_name="Tipo")
+    object_id = models.BigIntegerField(verbose_name="ID del elemento")
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de eliminación")
+
+    class Meta:
+        verbose_name = "Elemento eliminado"
+        verbose_name_plural = "Elementos eliminados"
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['board_user', 'deleted_at'], name='kanban_deleted_board_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_object_type_display()} #{self.object_id} ({self.board_user.username})"
+
+
 class Invitation(models.Model):
     """Modelo para las invitaciones de estudiantes a tableros compartidos"""
     admin = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_invitations', verbose_name="Administrador")
@@ -73,6 +161,10 @@ class Invitation(models.Model):
         verbose_name_plural = "Invitaciones"
         unique_together = ['admin', 'student']
         ordering = ['-created_at']
+        indexes = [
+            # Pertenencia de un estudiante al tablero compartido (ver kanban.board_context)
+            models.Index(fields=['student', 'accepted'], name='kanban_invitation_student_idx'),
+        ]
 
     def __str__(self):
         status = "Aceptada" if self.accepted else "Pendiente"
@@ -101,25 +193,35 @@ class Activity(models.Model):
     task = models.ForeignKey(Task, on_delete=models.SET_NULL, null=True, blank=True, related_name='activities', verbose_name="Tarea")
     list = models.ForeignKey(List, on_delete=models.SET_NULL, null=True, blank=True, related_name='activities', verbose_name="Lista")
     subtask = models.ForeignKey(Subtask, on_delete=models.SET_NULL, null=True, blank=True, related_name='activities', verbose_name="Subtarea")
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creación")
+    # Nombres tomados al registrar la actividad (ver build_snapshot): el historial se
+    # muestra sin leer usuarios, tareas ni listas y no cambia si se renombran o eliminan
+    snapshot = models.JSONField(default=dict, blank=True, verbose_name="Datos al registrar")
+    # Hora de la petición que la registró, no la de la escritura en segundo plano (ver kanban.activity_log)
+    created_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Fecha de creación")
 
     class Meta:
         verbose_name = "Actividad"
         verbose_name_plural = "Actividades"
         ordering = ['-created_at']
+        indexes = [
+            # Páginas del historial por (created_at, id), con y sin filtro de usuario (ver kanban.activity_feed)
+            models.Index(fields=['-created_at', '-id'], name='kanban_activity_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='kanban_activity_user_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user.username} - {self.get_activity_type_display()} - {self.description}"
+        return f"{self.snapshot.get('username')} - {self.get_activity_type_display()} - {self.description}"
 
-    @property
-    def related_creator(self):
-        if self.task and self.task.created_by:
-            return self.task.created_by
-        if self.subtask and self.subtask.created_by:
-            return self.subtask.created_by
-        if self.list and self.list.created_by:
-            return self.list.created_by
-        return None
+    @staticmethod
+    def build_snapshot(username, task_title=None, list_name=None, subtask_title=None, creator=None):
+        """Contenido de ``snapshot``; ``creator`` es quien creó la tarea, subtarea o lista"""
+        return {
+            'username': username,
+            'task_title': task_title,
+            'list_name': list_name,
+            'subtask_title': subtask_title,
+            'creator': creator,
+        }
 
 
 class ActivityComment(models.Model):
@@ -138,6 +240,43 @@ class ActivityComment(models.Model):
         return f"{self.author.username}: {self.comment[:40]}"
 
 
+class ActivityDailyRollup(models.Model):
+    """Cantidad de actividades por día, tablero, usuario y tipo (ver kanban.activity_rollups)"""
+    day = models.DateField(verbose_name="Día")
+    board_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='board_activity_rollups', verbose_name="Tablero")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_rollups', verbose_name="Usuario")
+    activity_type = models.CharField(max_length=50, choices=Activity.ACTIVITY_TYPES, verbose_name="Tipo de Actividad")
+    count = models.PositiveIntegerField(default=0, verbose_name="Cantidad")
+
+    class Meta:
+        verbose_name = "Resumen diario de actividades"
+        verbose_name_plural = "Resúmenes diarios de actividades"
+        ordering = ['-day']
+        # También es el índice de las consultas por tablero y rango de días
+        unique_together = ['board_user', 'day', 'user', 'activity_type']
+
+    def __str__(self):
+        return f"{self.day} - {self.user.username} - {self.activity_type}: {self.count}"
+
+
+class ActivityArchive(models.Model):
+    """Archivo NDJSON comprimido con actividades (y sus comentarios) retiradas de la tabla"""
+    file = models.FileField(upload_to='activity_archive/', verbose_name="Archivo")
+    oldest = models.DateTimeField(verbose_name="Actividad más antigua")
+    newest = models.DateTimeField(verbose_name="Actividad más reciente")
+    activities = models.PositiveIntegerField(verbose_name="Actividades")
+    comments = models.PositiveIntegerField(verbose_name="Comentarios")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de creación")
+
+    class Meta:
+        verbose_name = "Archivo de actividades"
+        verbose_name_plural = "Archivos de actividades"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.file.name} ({self.activities} actividades)"
+
+
 class TwoFactorProfile(models.Model):
     """Configuración de autenticación de dos factores basada en TOTP"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='two_factor_profile', verbose_name="Usuario")
@@ -207,6 +346,7 @@ class BoardPreference(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='board_preference', verbose_name="Usuario")
     color = models.CharField(max_length=20, default='transparent', verbose_name="Color del tablero")
     background_image = models.ImageField(upload_to='board_backgrounds/', null=True, blank=True, verbose_name="Imagen de fondo")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión del tablero")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última actualización")
 
     class Meta:
@@ -0,0 +1,76 @@
+"""
+Preparación de los tableros: listas básicas y preferencias.
+
+Se hace una sola vez, al escribir, y no en cada lectura del tablero:
+
+- Al crear un usuario (kanban.signals) se prepara su tablero; el de los
+  administradores es el tablero compartido.
+- Al aceptar una invitación se verifica el tablero compartido del administrador.
+- Para los tableros que ya existían está el comando ``provision_boards``.
+
+Así /api/board/, /api/calendar/ y las vistas HTML solo leen.
+"""
+from .board_cache import bump_board_version
+from .board_context import get_user_for_board
+from .models import List, BoardPreference
+
+# Las claves de orden de las listas básicas son menores que FIRST_RANK ('a0'),
+# así quedan antes que las listas creadas por los usuarios (ver kanban.ranking)
+DEFAULT_LISTS = [
+    {'name': 'Pendiente', 'color': 'yellow', 'order': 0, 'rank': '9x'},
+    {'name': 'En Progreso', 'color': 'green', 'order': 1, 'rank': '9y'},
+    {'name': 'Finalizado', 'color': 'black', 'order': 2, 'rank': '9z'},
+]
+
+
+def ensure_default_lists(board_user):
+    """Garantiza que existan las listas básicas del tablero. Retorna True si hubo cambios."""
+    # Una sola consulta en el caso común (las tres listas ya existen y están al día)
+    existing = {
+        list_obj.name: list_obj
+        for list_obj in List.objects.filter(
+            user=board_user, name__in=[data['name'] for data in DEFAULT_LISTS]
+        ).order_by('-id')
+    }
+    changed = False
+    for data in DEFAULT_LISTS:
+        list_obj = existing.get(data['name'])
+        if list_obj is None:
+            List.objects.create(
+                user=board_user,
+                name=data['name'],
+                color=data['color'],
+                order=data['order'],
+                rank=data['rank'],
+            )
+            changed = True
+            continue
+        updated = False
+        if list_obj.color != data['color']:
+            list_obj.color = data['color']
+            updated = True
+        if list_obj.order != data['order']:
+            list_obj.order = data['order']
+            updated = True
+        if list_obj.rank != data['rank']:
+            list_obj.rank = data['rank']
+            updated = True
+        if updated:
+            list_obj.save(update_fields=['color', 'order', 'rank', 'updated_at'])
+        changed = changed or updated
+    if changed:
+        bump_board_version(board_user)
+    return changed
+
+
+def provision_board(board_user):
+    """Listas básicas y preferencias del tablero de board_user. Retorna True si hubo cambios."""
+    _, created = BoardPreference.objects.get_or_create(user=board_user, defaults={'color': 'transparent'})
+    return ensure_default_lists(board_user) or created
+
+
+def provision_user_board(user):
+    """Prepara el tablero que usa ``user`` (el compartido si es administrador o está invitado)"""
+    board_user = get_user_for_board(user)
+    provision_board(board_user)
+    return board_user
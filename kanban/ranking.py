@@ -0,0 +1,264 @@
+"""
+Claves de orden (``rank``) de listas, tareas y subtareas.
+
+Cada elemento guarda una cadena que se compara lexicográficamente: para poner
+una tarjeta entre otras dos basta con generar una clave entre las de sus
+vecinas, sin tocar el resto de la lista. Es el esquema de "fractional indexing":
+
+- La clave empieza con una parte entera de largo variable: la primera letra
+  indica cuántos dígitos tiene ('a' = 1 dígito, 'b' = 2, ...; '9' = 1 dígito
+  negativo, '8' = 2, ...). Agregar al final o al principio solo incrementa o
+  decrementa esa parte, así que las claves crecen de forma logarítmica.
+- Después puede venir una parte fraccionaria, que se usa al insertar entre dos
+  claves consecutivas. Nunca termina en '0'.
+
+Solo se usan dígitos y minúsculas ('0'-'9', 'a'-'z'): así el orden es el mismo
+en SQLite (binario) y con cualquier collation de PostgreSQL. Cuando una clave
+nueva supera RANK_REBALANCE_LENGTH, rank_for_position reasigna claves cortas a
+todos los hermanos en la misma transacción; la tarea diaria
+rebalance_board_ranks (ver kanban.tasks) se ocupa de las que quedaron largas
+por otros caminos. rank_between nunca devuelve claves más largas que la columna.
+
+Las funciones del final reciben querysets con los hermanos de un mismo padre
+(las listas de un tablero, las tareas de una lista o las subtareas de una tarea).
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+ZERO = DIGITS[0]
+
+# Largo a partir del cual conviene reasignar las claves de los hermanos
+RANK_REBALANCE_LENGTH = 24
+
+# Largo de la columna rank (CharField de List, Task y Subtask)
+RANK_MAX_LENGTH = 255
+
+# Clave del primer elemento de una lista vacía
+FIRST_RANK = 'a' + ZERO
+
+# Menor parte entera representable: no se puede decrementar más
+_SMALLEST_INTEGER = '0' + ZERO * 10
+
+
+def _integer_length(head):
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if '0' <= head <= '9':
+        return ord('9') - ord(head) + 2
+    raise ValueError(f'Clave de orden inválida: {head}')
+
+
+def _integer_part(key):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f'Clave de orden inválida: {key}')
+    return key[:length]
+
+
+def validate_rank(key):
+    """Lanza ValueError si ``key`` no es una clave de orden válida"""
+    if not key or key == _SMALLEST_INTEGER:
+        raise ValueError(f'Clave de orden inválida: {key!r}')
+    if any(char not in DIGITS for char in key):
+        raise ValueError(f'Clave de orden inválida: {key}')
+    integer = _integer_part(key)
+    if key[len(integer):].endswith(ZERO):
+        raise ValueError(f'Clave de orden inválida: {key}')
+
+
+def is_valid_rank(key):
+    try:
+        validate_rank(key)
+    except ValueError:
+        return False
+    return True
+
+
+def _midpoint(a, b):
+    """Parte fraccionaria entre a y b (b=None significa 1)"""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        position = DIGITS.index(digits[index]) + 1
+        if position < len(DIGITS):
+            digits[index] = DIGITS[position]
+            return head + ''.join(digits)
+        digits[index] = ZERO
+    # Acarreo: la parte entera pasa a tener un dígito más (o uno menos si era negativa)
+    if head == '9':
+        return 'a' + ZERO
+    if head == 'z':
+        return None
+    new_head = chr(ord(head) + 1)
+    if new_head > 'a':
+        digits.append(ZERO)
+    else:
+        digits.pop()
+    return new_head + ''.join(digits)
+
+
+def _decrement_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        position = DIGITS.index(digits[index]) - 1
+        if position >= 0:
+            digits[index] = DIGITS[position]
+            return head + ''.join(digits)
+        digits[index] = DIGITS[-1]
+    if head == 'a':
+        return '9' + DIGITS[-1]
+    if head == '0':
+        return None
+    new_head = chr(ord(head) - 1)
+    if new_head < '9':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return new_head + ''.join(digits)
+
+
+def rank_between(before=None, after=None):
+    """
+    Clave estrictamente entre ``before`` y ``after``. None significa sin límite:
+    rank_between(ultima, None) agrega al final y rank_between(None, primera) al principio.
+    Lanza ValueError si la clave no entra en la columna (RANK_MAX_LENGTH).
+    """
+    key = _rank_between(before, after)
+    if len(key) > RANK_MAX_LENGTH:
+        raise ValueError(f'La clave entre {before} y {after} supera {RANK_MAX_LENGTH} caracteres')
+    return key
+
+
+def _rank_between(before, after):
+    if before is not None:
+        validate_rank(before)
+    if after is not None:
+        validate_rank(after)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f'{before} >= {after}')
+
+    if before is None:
+        if after is None:
+            return FIRST_RANK
+        integer = _integer_part(after)
+        fraction = after[len(integer):]
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint('', fraction)
+        if integer < after:
+            return integer
+        decremented = _decrement_integer(integer)
+        if decremented is None:
+            raise ValueError('No hay claves menores disponibles')
+        return decremented
+
+    integer = _integer_part(before)
+    fraction = before[len(integer):]
+    if after is None:
+        incremented = _increment_integer(integer)
+        return integer + _midpoint(fraction, None) if incremented is None else incremented
+
+    after_integer = _integer_part(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after[len(integer):])
+    incremented = _increment_integer(integer)
+    if incremented is not None and incremented < after:
+        return incremented
+    return integer + _midpoint(fraction, None)
+
+
+def rank_sequence(count, before=None, after=None):
+    """``count`` claves ordenadas entre before y after (claves consecutivas si no hay límites)"""
+    if count <= 0:
+        return []
+    if after is None:
+        keys = []
+        current = before
+        for _ in range(count):
+            current = rank_between(current, None)
+            keys.append(current)
+        return keys
+    if before is None:
+        keys = []
+        current = after
+        for _ in range(count):
+            current = rank_between(None, current)
+            keys.append(current)
+        return list(reversed(keys))
+    # Entre dos claves: bisección, para que las claves queden parejas y cortas
+    middle = count // 2
+    key = rank_between(before, after)
+    return rank_sequence(middle, before, key) + [key] + rank_sequence(count - middle - 1, key, after)
+
+
+def needs_rebalance(key):
+    return len(key or '') > RANK_REBALANCE_LENGTH
+
+
+def rebalance_ranks(siblings):
+    """
+    Reasigna claves cortas y consecutivas a ``siblings`` respetando su orden
+    actual (rank, id). Bloquea las filas: debe llamarse dentro de una transacción.
+    Retorna cuántos elementos cambiaron.
+    """
+    objects = list(siblings.select_for_update().order_by('rank', 'id').only('id', 'rank', 'updated_at'))
+    now = timezone.now()
+    changed = []
+    for obj, rank in zip(objects, rank_sequence(len(objects))):
+        if obj.rank != rank:
+            obj.rank = rank
+            obj.updated_at = now
+            changed.append(obj)
+    siblings.model.objects.bulk_update(changed, ['rank', 'updated_at'], batch_size=1000)
+    return len(changed)
+
+
+def _bounds(siblings, after_id, before_id):
+    """(clave anterior, clave siguiente) del hueco donde va el elemento"""
+    if after_id is None and before_id is None:
+        return siblings.order_by('-rank', '-id').values_list('rank', flat=True).first(), None
+    anchor = after_id if after_id is not None else before_id
+    pivot = siblings.filter(id=anchor).values_list('rank', flat=True).first()
+    if pivot is None:
+        raise LookupError(f'Elemento {anchor} no encontrado')
+    if after_id is not None:
+        following = siblings.filter(Q(rank__gt=pivot) | Q(rank=pivot, id__gt=anchor)).order_by('rank', 'id')
+        return pivot, following.values_list('rank', flat=True).first()
+    previous = siblings.filter(Q(rank__lt=pivot) | Q(rank=pivot, id__lt=anchor)).order_by('-rank', '-id')
+    return previous.values_list('rank', flat=True).first(), pivot
+
+
+def rank_for_position(siblings, after_id=None, before_id=None):
+    """
+    Clave para ubicar un elemento entre ``siblings`` (sin incluirlo): justo
+    después de after_id, justo antes de before_id o, si no viene ninguno, al
+    final. Si las claves vecinas están repetidas o no son válidas, o si la
+    clave nueva supera RANK_REBALANCE_LENGTH, rebalancea los hermanos y vuelve a
+    calcularla (conviene llamarla dentro de la transacción que guarda el
+    elemento). Lanza LookupError si el vecino no pertenece a siblings.
+    """
+    try:
+        key = rank_between(*_bounds(siblings, after_id, before_id))
+    except ValueError:
+        key = None
+    if key is None or needs_rebalance(key):
+        with transaction.atomic():
+            rebalance_ranks(siblings)
+            key = rank_between(*_bounds(siblings, after_id, before_id))
+    return key
@@ -0,0 +1,87 @@
+"""
+Renderers y parsers de la API.
+
+- ORJSONRenderer / ORJSONParser: mismo formato application/json que los de DRF,
+  pero codificado con orjson, varias veces más rápido en tableros grandes.
+  Si orjson no está instalado se comportan como JSONRenderer / JSONParser.
+- MessagePackRenderer / MessagePackParser: formato binario application/msgpack,
+  opcional. El cliente lo pide con ``Accept: application/msgpack`` o ?format=msgpack;
+  si msgpack no está instalado no se registran (ver REST_FRAMEWORK en settings).
+
+Los tipos que ni orjson ni msgpack saben codificar (Decimal, timedelta, textos
+traducibles, etc.) se convierten con el encoder de DRF, así que la respuesta
+tiene los mismos valores que con JSONRenderer.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Conversión de tipos no nativos, igual que el encoder de DRF"""
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer codificado con orjson (usa el de DRF si orjson no está instalado)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Las fechas pasan por _default para que tengan el mismo formato que con JSONRenderer
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decodificado con orjson (usa el de DRF si orjson no está instalado)"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
+
@@ -0,0 +1,186 @@
+"""
+Reordenamiento de listas, tareas y subtareas (arrastrar y soltar).
+
+Cada operación corre en una sola transacción: bloquea las filas afectadas
+(select_for_update en PostgreSQL), las lee con una consulta, guarda solo las que
+cambian con un bulk_update y registra las actividades con un solo INSERT.
+El número de consultas no depende de cuántos elementos se envían.
+
+Las claves de orden (ver kanban.ranking) se reescriben lo menos posible: los
+elementos que ya estaban en el padre y forman la subsecuencia creciente más
+larga conservan su clave, y el resto recibe claves nuevas entre las de sus
+vecinos. Mover una tarjeta dentro de una lista de mil cambia una sola fila.
+Si alguna clave nueva supera RANK_REBALANCE_LENGTH, se reasignan las de todos
+los hijos del padre en la misma transacción.
+"""
+from bisect import bisect_left
+
+from django.db import transaction
+from django.utils import timezone
+
+from .board_cache import bump_board_version
+from .models import List, Task, Subtask
+from .ranking import is_valid_rank, needs_rebalance, rank_sequence, rebalance_ranks
+from .views import log_activities
+
+
+def _unique_ids(ids):
+    """IDs enteros sin repetir, en el orden recibido. Lanza ValueError si alguno no es válido."""
+    unique = []
+    seen = set()
+    for value in ids or []:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'ID inválido: {value}')
+        if value not in seen:
+            seen.add(value)
+            unique.append(value)
+    return unique
+
+
+def _fetch_locked(queryset, ids, label):
+    """Objetos de ``ids`` bloqueados hasta el fin de la transacción, en ese orden"""
+    objects = {obj.id: obj for obj in queryset.select_for_update(of=('self',)).filter(id__in=ids)}
+    missing = [str(obj_id) for obj_id in ids if obj_id not in objects]
+    if missing:
+        raise ValueError(f'{label} no encontradas: {", ".join(missing)}')
+    return [objects[obj_id] for obj_id in ids]
+
+
+
+def _longest_increasing(ranks):
+    """Índices de la subsecuencia estrictamente creciente más larga de ``ranks`` (los None se saltan)"""
+    tails = []
+    tail_ranks = []
+    previous = [None] * len(ranks)
+    for index, rank in enumerate(ranks):
+        if rank is None:
+            continue
+        position = bisect_left(tail_ranks, rank)
+        if position:
+            previous[index] = tails[position - 1]
+        if position == len(tails):
+            tails.append(index)
+            tail_ranks.append(rank)
+        else:
+            tails[position] = index
+            tail_ranks[position] = rank
+    kept = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        kept.add(index)
+        index = previous[index]
+    return kept
+
+
+def _bound(siblings):
+    """Clave del primer hermano de ``siblings`` (ya ordenado), o None"""
+    rank = siblings.values_list('rank', flat=True).first()
+    return rank if rank and is_valid_rank(rank) else None
+
+
+def _assign_ranks(objects, in_parent, siblings):
+    """
+    Deja ``objects`` (en el orden pedido) con claves crecientes. Solo conservan
+    su clave los que ``in_parent(obj)``; ``siblings`` son los demás hijos del
+    padre, que se usan como límite para no intercalarse con ellos al principio
+    ni al final. Retorna los objetos con clave nueva.
+    """
+    ranks = [obj.rank if in_parent(obj) and is_valid_rank(obj.rank) else None for obj in objects]
+    kept = sorted(_longest_increasing(ranks))
+    siblings = siblings.exclude(id__in=[obj.id for obj in objects])
+    if kept:
+        first, last = objects[kept[0]].rank, objects[kept[-1]].rank
+        lower = _bound(siblings.filter(rank__lt=first).order_by('-rank', '-id')) if kept[0] else None
+        upper = _bound(siblings.filter(rank__gt=last).order_by('rank', 'id')) if kept[-1] < len(objects) - 1 else None
+    else:
+        lower, upper = _bound(siblings.order_by('-rank', '-id')), None
+
+    changed = []
+    start = 0
+    for index in kept + [len(objects)]:
+        pending = objects[start:index]
+        next_rank = objects[index].rank if index < len(objects) else upper
+        for obj, rank in zip(pending, rank_sequence(len(pending), lower, next_rank)):
+            obj.rank = rank
+            changed.append(obj)
+        if index < len(objects):
+            lower = objects[index].rank
+        start = index + 1
+    return changed
+
+
+def _rebalance_if_needed(changed, siblings):
+    """Reasigna claves cortas a ``siblings`` si alguna clave nueva de ``changed`` quedó larga"""
+    if any(needs_rebalance(obj.rank) for obj in changed):
+        rebalance_ranks(siblings)
+
+
+def reorder_lists(board_user, list_ids):
+    """Deja las listas de list_ids en ese orden. Retorna cuántas cambiaron."""
+    list_ids = _unique_ids(list_ids)
+    with transaction.atomic():
+        lists = _fetch_locked(List.objects.filter(user=board_user), list_ids, 'Listas')
+        changed = _assign_ranks(lists, lambda list_obj: True, List.objects.filter(user=board_user))
+        now = timezone.now()
+        for list_obj in changed:
+            list_obj.updated_at = now
+        List.objects.bulk_update(changed, ['rank', 'updated_at'])
+        _rebalance_if_needed(changed, List.objects.filter(user=board_user))
+        bump_board_version(board_user)
+    return len(changed)
+
+
+def reorder_tasks(user, board_user, list_id, task_ids):
+    """
+    Deja las tareas de task_ids en la lista list_id, en ese orden.
+    Registra una actividad 'move_task' por cada tarea que cambió de lista.
+    Retorna cuántas tareas cambiaron.
+    """
+    task_ids = _unique_ids(task_ids)
+    with transaction.atomic():
+        list_obj = List.objects.select_for_update().filter(id=list_id, user=board_user).first()
+        if list_obj is None:
+            raise ValueError('Lista no encontrada')
+        tasks = _fetch_locked(
+            Task.objects.filter(list__user=board_user).select_related('list'), task_ids, 'Tareas'
+        )
+        changed = _assign_ranks(tasks, lambda task: task.list_id == list_obj.id, Task.objects.filter(list=list_obj))
+        now = timezone.now()
+        moves = []
+        for task in changed:
+            old_list = task.list
+            if old_list.id != list_obj.id:
+                moves.append({
+                    'activity_type': 'move_task',
+                    'description': f'Movió la tarea "{task.title}" de "{old_list.name}" a "{list_obj.name}"',
+                    'task': task,
+                    'list_obj': list_obj,
+                })
+            task.list = list_obj
+            task.updated_at = now
+        Task.objects.bulk_update(changed, ['list', 'rank', 'updated_at'])
+        _rebalance_if_needed(changed, Task.objects.filter(list=list_obj))
+        log_activities(user, moves)
+        bump_board_version(board_user)
+    return len(changed)
+
+
+def reorder_subtasks(board_user, task_id, subtask_ids):
+    """Deja las subtareas de subtask_ids en la tarea task_id, en ese orden"""
+    subtask_ids = _unique_ids(subtask_ids)
+    with transaction.atomic():
+        task = Task.objects.select_for_update(of=('self',)).filter(id=task_id, list__user=board_user).first()
+        if task is None:
+            raise ValueError('Tarea no encontrada')
+        subtasks = _fetch_locked(Subtask.objects.filter(task__list__user=board_user), subtask_ids, 'Subtareas')
+        changed = _assign_ranks(subtasks, lambda subtask: subtask.task_id == task.id, Subtask.objects.filter(task=task))
+        now = timezone.now()
+        for subtask in changed:
+            subtask.task = task
+            subtask.updated_at = now
+        Subtask.objects.bulk_update(changed, ['task', 'rank', 'updated_at'])
+        _rebalance_if_needed(changed, Subtask.objects.filter(task=task))
+        bump_board_version(board_user)
+    return len(changed)
@@ -0,0 +1,415 @@
+"""
+Búsqueda de texto del tablero.
+
+Cubre títulos de tareas y subtareas, nombres de archivos adjuntos y
+descripciones de actividades; cada coincidencia se atribuye a su tarea.
+
+- PostgreSQL: índices GIN sobre to_tsvector(BOARD_SEARCH_CONFIG, ...) y
+  trigramas (pg_trgm) para coincidencias parciales.
+- SQLite: tabla virtual FTS5 ``kanban_search_fts`` mantenida por triggers.
+- Otros motores (o SQLite sin FTS5): icontains sobre cada tabla.
+
+Los índices, la tabla FTS5 y sus triggers se crean en la migración 0017 con
+create_search_index(); el comando rebuild_search_index los vuelve a crear.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.utils import OperationalError
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Task, Subtask, TaskAttachment, SubtaskAttachment, Activity
+
+FTS_TABLE = 'kanban_search_fts'
+
+# Tipo de cada coincidencia; en FTS5 el rowid es id * 8 + tipo
+KIND_TASK = 1
+KIND_SUBTASK = 2
+KIND_TASK_ATTACHMENT = 3
+KIND_SUBTASK_ATTACHMENT = 4
+KIND_ACTIVITY = 5
+
+KIND_NAMES = {
+    KIND_TASK: 'task',
+    KIND_SUBTASK: 'subtask',
+    KIND_TASK_ATTACHMENT: 'task_attachment',
+    KIND_SUBTASK_ATTACHMENT: 'subtask_attachment',
+    KIND_ACTIVITY: 'activity',
+}
+
+# Peso de cada tipo en el ranking: el título de la tarea pesa más que su historial
+KIND_WEIGHTS = {
+    KIND_TASK: 1.0,
+    KIND_SUBTASK: 0.8,
+    KIND_TASK_ATTACHMENT: 0.6,
+    KIND_SUBTASK_ATTACHMENT: 0.6,
+    KIND_ACTIVITY: 0.3,
+}
+
+DEFAULT_SEARCH_LIMIT = 50
+
+logger = logging.getLogger(__name__)
+
+_fts_available = {}
+
+
+def get_search_config():
+    """Configuración de texto de PostgreSQL (BOARD_SEARCH_CONFIG, 'spanish' por defecto)"""
+    config = getattr(settings, 'BOARD_SEARCH_CONFIG', 'spanish')
+    if not re.fullmatch(r'\w+', config):
+        raise ValueError(f'BOARD_SEARCH_CONFIG inválido: {config}')
+    return config
+
+
+def search_tokens(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def get_search_backend():
+    """Retorna 'postgresql', 'sqlite' (FTS5) o 'basic'"""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        if connection.alias not in _fts_available:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_available[connection.alias] = cursor.fetchone() is not None
+        if _fts_available[connection.alias]:
+            return 'sqlite'
+    return 'basic'
+
+
+def _weight_case(column):
+    cases = ' '.join(f'WHEN {kind} THEN {weight}' for kind, weight in KIND_WEIGHTS.items())
+    return f'CASE {column} {cases} ELSE 0 END'
+
+
+def _postgresql_hits_sql(query):
+    """
+    SQL con columnas (kind, object_id, task_id, rank) para PostgreSQL.
+    Las expresiones coinciden con las de los índices de la migración 0017.
+    """
+    config = get_search_config()
+    tsquery = ' & '.join(f'{token}:*' for token in search_tokens(query))
+    like = '%' + connection.ops.prep_for_like_query(query) + '%'
+
+    def text_branch(kind, table, column, task_column, join=''):
+        vector = f"to_tsvector('{config}'::regconfig, {column})"
+        ts_query = f"to_tsquery('{config}'::regconfig, %s)"
+        sql = (
+            f"SELECT {kind} AS kind, {table}.id AS object_id, {task_column} AS task_id, "
+            f"ts_rank({vector}, {ts_query}) + similarity({column}, %s) AS rank "
+            f"FROM {table} {join} WHERE {vector} @@ {ts_query} OR {column} ILIKE %s"
+        )
+        return sql, [tsquery, query, tsquery, like]
+
+    def file_branch(kind, table, task_column, join=''):
+        sql = (
+            f"SELECT {kind} AS kind, {table}.id AS object_id, {task_column} AS task_id, "
+            f"similarity({table}.file, %s) AS rank FROM {table} {join} WHERE {table}.file ILIKE %s"
+        )
+        return sql, [query, like]
+
+    branches = []
+    if tsquery:
+        branches.append(text_branch(KIND_TASK, 'kanban_task', 'kanban_task.title', 'kanban_task.id'))
+        branches.append(text_branch(KIND_SUBTASK, 'kanban_subtask', 'kanban_subtask.title', 'kanban_subtask.task_id'))
+    branches.append(file_branch(KIND_TASK_ATTACHMENT, 'kanban_taskattachment', 'kanban_taskattachment.task_id'))
+    branches.append(file_branch(
+        KIND_SUBTASK_ATTACHMENT, 'kanban_subtaskattachment', 'kanban_subtask.task_id',
+        join='JOIN kanban_subtask ON kanban_subtask.id = kanban_subtaskattachment.subtask_id',
+    ))
+    if tsquery:
+        vector = f"to_tsvector('{config}'::regconfig, kanban_activity.description)"
+        ts_query = f"to_tsquery('{config}'::regconfig, %s)"
+        branches.append((
+            f"SELECT {KIND_ACTIVITY} AS kind, kanban_activity.id AS object_id, kanban_activity.task_id AS task_id, "
+            f"ts_rank({vector}, {ts_query}) AS rank FROM kanban_activity "
+            f"WHERE kanban_activity.task_id IS NOT NULL AND {vector} @@ {ts_query}",
+            [tsquery, tsquery],
+        ))
+
+    sql = ' UNION ALL '.join(branch_sql for branch_sql, _ in branches)
+    params = [param for _, branch_params in branches for param in branch_params]
+    return sql, params
+
+
+def _sqlite_match_expression(query):
+    # Cada palabra como prefijo ("tarea"*), todas obligatorias
+    return ' '.join(f'"{token}"*' for token in search_tokens(query))
+
+
+def _sqlite_hits_sql(query):
+    sql = (
+        f"SELECT kind, rowid / 8 AS object_id, task_id, -bm25({FTS_TABLE}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+    )
+    return sql, [_sqlite_match_expression(query)]
+
+
+def _basic_task_filter(query):
+    return (
+        Q(title__icontains=query)
+        | Q(id__in=Subtask.objects.filter(title__icontains=query).values('task_id'))
+        | Q(id__in=TaskAttachment.objects.filter(file__icontains=query).values('task_id'))
+        | Q(id__in=SubtaskAttachment.objects.filter(file__icontains=query).values('subtask__task_id'))
+        | Q(id__in=Activity.objects.filter(description__icontains=query, task__isnull=False).values('task_id'))
+    )
+
+
+def filter_tasks_by_search(queryset, query):
+    """Filtra un queryset de tareas por el texto de búsqueda (sin ordenar por relevancia)"""
+    backend = get_search_backend()
+    if backend == 'basic' or not search_tokens(query):
+        return queryset.filter(_basic_task_filter(query))
+    if backend == 'postgresql':
+        hits_sql, params = _postgresql_hits_sql(query)
+    else:
+        hits_sql, params = _sqlite_hits_sql(query)
+    # Subconsulta autocontenida: sirve también dentro de otras subconsultas (conteos por lista)
+    return queryset.filter(id__in=RawSQL(f'SELECT hits.task_id FROM ({hits_sql}) hits', params))
+
+
+def _basic_hits(board_user, query, limit):
+    hits = []
+    for task_id in Task.objects.filter(list__user=board_user, title__icontains=query).values_list('id', flat=True)[:limit]:
+        hits.append((KIND_TASK, task_id, task_id, KIND_WEIGHTS[KIND_TASK]))
+    subtasks = Subtask.objects.filter(
+        task__list__user=board_user, task__archived_at__isnull=True, title__icontains=query
+    ).values_list('id', 'task_id')
+    for subtask_id, task_id in subtasks[:limit]:
+        hits.append((KIND_SUBTASK, subtask_id, task_id, KIND_WEIGHTS[KIND_SUBTASK]))
+    attachments = TaskAttachment.objects.filter(
+        task__list__user=board_user, task__archived_at__isnull=True, file__icontains=query
+    ).values_list('id', 'task_id')
+    for attachment_id, task_id in attachments[:limit]:
+        hits.append((KIND_TASK_ATTACHMENT, attachment_id, task_id, KIND_WEIGHTS[KIND_TASK_ATTACHMENT]))
+    subtask_attachments = SubtaskAttachment.objects.filter(
+        subtask__task__list__user=board_user, subtask__task__archived_at__isnull=True, file__icontains=query
+    ).values_list('id', 'subtask__task_id')
+    for attachment_id, task_id in subtask_attachments[:limit]:
+        hits.append((KIND_SUBTASK_ATTACHMENT, attachment_id, task_id, KIND_WEIGHTS[KIND_SUBTASK_ATTACHMENT]))
+    activities = Activity.objects.filter(task__list__user=board_user, description__icontains=query).values_list('id', 'task_id')
+    for activity_id, task_id in activities[:limit]:
+        hits.append((KIND_ACTIVITY, activity_id, task_id, KIND_WEIGHTS[KIND_ACTIVITY]))
+    return hits
+
+
+def get_search_hits(board_user, query, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Coincidencias del tablero de board_user como tuplas (kind, object_id, task_id, rank),
+    de mayor a menor relevancia.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    backend = get_search_backend()
+    if backend == 'basic' or not search_tokens(query):
+        hits = _basic_hits(board_user, query, limit)
+        return sorted(hits, key=lambda hit: hit[3], reverse=True)
+
+    if backend == 'postgresql':
+        hits_sql, params = _postgresql_hits_sql(query)
+    else:
+        hits_sql, params = _sqlite_hits_sql(query)
+    sql = (
+        f"SELECT hits.kind, hits.object_id, hits.task_id, hits.rank * ({_weight_case('hits.kind')}) AS score "
+        f"FROM ({hits_sql}) hits "
+        "JOIN kanban_task ON kanban_task.id = hits.task_id "
+        "JOIN kanban_list ON kanban_list.id = kanban_task.list_id "
+        "WHERE kanban_list.user_id = %s ORDER BY score DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [board_user.id, limit * 4])
+        return cursor.fetchall()
+
+
+def search_board(board_user, query, filters=None, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Tareas del tablero que coinciden con ``query``, ordenadas por relevancia.
+    Cada resultado indica dónde coincidió y qué subtareas coincidieron.
+    ``filters`` aplica los filtros de creador y fechas del tablero.
+    """
+    from .board import apply_task_filters
+
+    ranked = {}
+    for kind, object_id, task_id, score in get_search_hits(board_user, query, limit):
+        entry = ranked.setdefault(task_id, {'score': 0.0, 'matched_in': [], 'subtask_ids': []})
+        entry['score'] = max(entry['score'], float(score or 0))
+        if KIND_NAMES[kind] not in entry['matched_in']:
+            entry['matched_in'].append(KIND_NAMES[kind])
+        if kind == KIND_SUBTASK:
+            entry['subtask_ids'].append(object_id)
+
+    if not ranked:
+        return []
+
+    date_filters = dict(filters or {}, q='')
+    tasks = apply_task_filters(
+        Task.objects.filter(id__in=list(ranked), list__user=board_user), date_filters
+    ).select_related('list', 'created_by')
+    tasks = {task.id: task for task in tasks}
+    subtask_ids = [subtask_id for entry in ranked.values() for subtask_id in entry['subtask_ids']]
+    subtasks = Subtask.objects.in_bulk(subtask_ids)
+
+    results = []
+    for task_id, entry in sorted(ranked.items(), key=lambda item: item[1]['score'], reverse=True):
+        task = tasks.get(task_id)
+        if task is None:
+            continue
+        results.append({
+            'task': task,
+            'rank': round(entry['score'], 4),
+            'matched_in': entry['matched_in'],
+            'subtasks': [subtasks[subtask_id] for subtask_id in entry['subtask_ids'] if subtask_id in subtasks],
+        })
+        if len(results) >= limit:
+            break
+    return results
+
+
+def _postgresql_index_statements():
+    config = get_search_config()
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS kanban_task_title_fts ON kanban_task USING GIN (to_tsvector('{config}'::regconfig, title))",
+        "CREATE INDEX IF NOT EXISTS kanban_task_title_trgm ON kanban_task USING GIN (title gin_trgm_ops)",
+        f"CREATE INDEX IF NOT EXISTS kanban_subtask_title_fts ON kanban_subtask USING GIN (to_tsvector('{config}'::regconfig, title))",
+        "CREATE INDEX IF NOT EXISTS kanban_subtask_title_trgm ON kanban_subtask USING GIN (title gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS kanban_taskattachment_file_trgm ON kanban_taskattachment USING GIN (file gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS kanban_subtaskattachment_file_trgm ON kanban_subtaskattachment USING GIN (file gin_trgm_ops)",
+        f"CREATE INDEX IF NOT EXISTS kanban_activity_description_fts ON kanban_activity USING GIN (to_tsvector('{config}'::regconfig, description))",
+    ]
+
+
+_POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS kanban_task_title_fts",
+    "DROP INDEX IF EXISTS kanban_task_title_trgm",
+    "DROP INDEX IF EXISTS kanban_subtask_title_fts",
+    "DROP INDEX IF EXISTS kanban_subtask_title_trgm",
+    "DROP INDEX IF EXISTS kanban_taskattachment_file_trgm",
+    "DROP INDEX IF EXISTS kanban_subtaskattachment_file_trgm",
+    "DROP INDEX IF EXISTS kanban_activity_description_fts",
+]
+
+# rowid = id * 8 + tipo (1 tarea, 2 subtarea, 3 adjunto de tarea, 4 adjunto de subtarea, 5 actividad)
+_SQLITE_TRIGGERS = [
+    # Tareas
+    """CREATE TRIGGER kanban_search_task_ai AFTER INSERT ON kanban_task BEGIN
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id) VALUES (NEW.id * 8 + 1, NEW.title, 1, NEW.id);
+    END""",
+    """CREATE TRIGGER kanban_search_task_au AFTER UPDATE OF title ON kanban_task BEGIN
+        UPDATE kanban_search_fts SET content = NEW.title WHERE rowid = NEW.id * 8 + 1;
+    END""",
+    """CREATE TRIGGER kanban_search_task_ad AFTER DELETE ON kanban_task BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 1;
+    END""",
+    # Subtareas (al cambiar de tarea también se mueven sus adjuntos)
+    """CREATE TRIGGER kanban_search_subtask_ai AFTER INSERT ON kanban_subtask BEGIN
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id) VALUES (NEW.id * 8 + 2, NEW.title, 2, NEW.task_id);
+    END""",
+    """CREATE TRIGGER kanban_search_subtask_au AFTER UPDATE OF title, task_id ON kanban_subtask BEGIN
+        UPDATE kanban_search_fts SET content = NEW.title, task_id = NEW.task_id WHERE rowid = NEW.id * 8 + 2;
+        UPDATE kanban_search_fts SET task_id = NEW.task_id
+            WHERE rowid IN (SELECT id * 8 + 4 FROM kanban_subtaskattachment WHERE subtask_id = NEW.id);
+    END""",
+    """CREATE TRIGGER kanban_search_subtask_ad AFTER DELETE ON kanban_subtask BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 2;
+    END""",
+    # Adjuntos de tareas (solo el nombre del archivo, sin la carpeta)
+    """CREATE TRIGGER kanban_search_taskattachment_ai AFTER INSERT ON kanban_taskattachment BEGIN
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+            VALUES (NEW.id * 8 + 3, replace(NEW.file, 'attachments/tasks/' || NEW.task_id || '/', ''), 3, NEW.task_id);
+    END""",
+    """CREATE TRIGGER kanban_search_taskattachment_au AFTER UPDATE OF file, task_id ON kanban_taskattachment BEGIN
+        UPDATE kanban_search_fts SET content = replace(NEW.file, 'attachments/tasks/' || NEW.task_id || '/', ''),
+            task_id = NEW.task_id WHERE rowid = NEW.id * 8 + 3;
+    END""",
+    """CREATE TRIGGER kanban_search_taskattachment_ad AFTER DELETE ON kanban_taskattachment BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 3;
+    END""",
+    # Adjuntos de subtareas
+    """CREATE TRIGGER kanban_search_subtaskattachment_ai AFTER INSERT ON kanban_subtaskattachment BEGIN
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+            VALUES (NEW.id * 8 + 4, replace(NEW.file, 'attachments/subtasks/' || NEW.subtask_id || '/', ''), 4,
+                    (SELECT task_id FROM kanban_subtask WHERE id = NEW.subtask_id));
+    END""",
+    """CREATE TRIGGER kanban_search_subtaskattachment_au AFTER UPDATE OF file, subtask_id ON kanban_subtaskattachment BEGIN
+        UPDATE kanban_search_fts SET content = replace(NEW.file, 'attachments/subtasks/' || NEW.subtask_id || '/', ''),
+            task_id = (SELECT task_id FROM kanban_subtask WHERE id = NEW.subtask_id) WHERE rowid = NEW.id * 8 + 4;
+    END""",
+    """CREATE TRIGGER kanban_search_subtaskattachment_ad AFTER DELETE ON kanban_subtaskattachment BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 4;
+    END""",
+    # Actividades asociadas a una tarea
+    """CREATE TRIGGER kanban_search_activity_ai AFTER INSERT ON kanban_activity WHEN NEW.task_id IS NOT NULL BEGIN
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id) VALUES (NEW.id * 8 + 5, NEW.description, 5, NEW.task_id);
+    END""",
+    """CREATE TRIGGER kanban_search_activity_au AFTER UPDATE OF description, task_id ON kanban_activity BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 5;
+        INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+            SELECT NEW.id * 8 + 5, NEW.description, 5, NEW.task_id WHERE NEW.task_id IS NOT NULL;
+    END""",
+    """CREATE TRIGGER kanban_search_activity_ad AFTER DELETE ON kanban_activity BEGIN
+        DELETE FROM kanban_search_fts WHERE rowid = OLD.id * 8 + 5;
+    END""",
+]
+
+_SQLITE_BACKFILL = [
+    "INSERT INTO kanban_search_fts(rowid, content, kind, task_id) SELECT id * 8 + 1, title, 1, id FROM kanban_task",
+    "INSERT INTO kanban_search_fts(rowid, content, kind, task_id) SELECT id * 8 + 2, title, 2, task_id FROM kanban_subtask",
+    """INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+        SELECT id * 8 + 3, replace(file, 'attachments/tasks/' || task_id || '/', ''), 3, task_id FROM kanban_taskattachment""",
+    """INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+        SELECT a.id * 8 + 4, replace(a.file, 'attachments/subtasks/' || a.subtask_id || '/', ''), 4, s.task_id
+        FROM kanban_subtaskattachment a JOIN kanban_subtask s ON s.id = a.subtask_id""",
+    """INSERT INTO kanban_search_fts(rowid, content, kind, task_id)
+        SELECT id * 8 + 5, description, 5, task_id FROM kanban_activity WHERE task_id IS NOT NULL""",
+]
+
+_SQLITE_TRIGGER_NAMES = [
+    f'kanban_search_{table}_{suffix}'
+    for table in ('task', 'subtask', 'taskattachment', 'subtaskattachment', 'activity')
+    for suffix in ('ai', 'au', 'ad')
+]
+
+
+def create_search_index(schema_editor):
+    """
+    Crea los índices de búsqueda para el motor de schema_editor.connection.
+
+    En SQLite, las migraciones que reconstruyen kanban_task, kanban_subtask,
+    los adjuntos o kanban_activity eliminan los triggers; deben volver a
+    llamar a esta función (o ejecutar el comando rebuild_search_index).
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for statement in _postgresql_index_statements():
+            schema_editor.execute(statement)
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "content, kind UNINDEXED, task_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError as e:
+            logger.warning(f'FTS5 no disponible en SQLite ({e}); la búsqueda usará icontains.')
+            return
+        for statement in _SQLITE_TRIGGERS + _SQLITE_BACKFILL:
+            schema_editor.execute(statement)
+    _fts_available.pop(schema_editor.connection.alias, None)
+
+
+def drop_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for statement in _POSTGRESQL_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'sqlite':
+        for name in _SQLITE_TRIGGER_NAMES:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_available.pop(schema_editor.connection.alias, None)
@@ -0,0 +1,129 @@
+"""
+Generación de tableros de prueba para los comandos de verificación de rendimiento.
+
+Todo se inserta con bulk_create por lotes; se espera que el llamador lo ejecute
+dentro de una transacción que luego se revierte.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .activity_rollups import add_to_rollups, rollup_counts
+from .board_cache import bump_board_version
+from .models import List, Task, Subtask, TaskAttachment, SubtaskAttachment, Invitation, Activity
+from .ranking import rank_sequence
+
+
+def seed_board(board_user, tasks=5000, lists=3, subtasks_per_task=2, attachments_per_task=1,
+               creator=None, batch_size=1000):
+    """
+    Crea ``tasks`` tareas repartidas en ``lists`` listas para ``board_user``,
+    con sus subtareas y adjuntos. Retorna un dict con los totales creados.
+    """
+    creator = creator or board_user
+    today = timezone.now().date()
+
+    last_list_rank = List.objects.filter(user=board_user).order_by('-rank').values_list('rank', flat=True).first()
+    list_ranks = rank_sequence(lists, last_list_rank or None)
+    list_objs = List.objects.bulk_create([
+        List(name=f'Lista {index + 1}', order=100 + index, rank=list_ranks[index], user=board_user,
+             color='purple', created_by=creator)
+        for index in range(lists)
+    ])
+
+    task_ranks = rank_sequence(tasks // lists + 1)
+    subtask_ranks = rank_sequence(subtasks_per_task)
+
+    task_objs = []
+    for index in range(tasks):
+        task_objs.append(Task(
+            title=f'Tarea {index + 1}',
+            list=list_objs[index % lists],
+            order=index // lists + 1,
+            rank=task_ranks[index // lists],
+            created_by=creator,
+            due_date=today + timedelta(days=(index % 90) - 30),
+        ))
+    task_objs = Task.objects.bulk_create(task_objs, batch_size=batch_size)
+
+    subtask_objs = []
+    task_attachments = []
+    for task in task_objs:
+        for sub_index in range(subtasks_per_task):
+            subtask_objs.append(Subtask(
+                title=f'{task.title} - Subtarea {sub_index + 1}',
+                task=task,
+                order=sub_index + 1,
+                rank=subtask_ranks[sub_index],
+                created_by=creator,
+                due_date=task.due_date,
+            ))
+        for att_index in range(attachments_per_task):
+            task_attachments.append(TaskAttachment(
+                task=task,
+                file=f'attachments/tasks/{task.id}/archivo-{att_index + 1}.txt',
+                uploaded_by=creator,
+            ))
+    subtask_objs = Subtask.objects.bulk_create(subtask_objs, batch_size=batch_size)
+    TaskAttachment.objects.bulk_create(task_attachments, batch_size=batch_size)
+
+    subtask_attachments = []
+    if attachments_per_task:
+        for subtask in subtask_objs:
+            subtask_attachments.append(SubtaskAttachment(
+                subtask=subtask,
+                file=f'attachments/subtasks/{subtask.id}/archivo.txt',
+                uploaded_by=creator,
+            ))
+        SubtaskAttachment.objects.bulk_create(subtask_attachments, batch_size=batch_size)
+
+    bump_board_version(board_user)
+    return {
+        'lists': len(list_objs),
+        'tasks': len(task_objs),
+        'subtasks': len(subtask_objs),
+        'attachments': len(task_attachments) + len(subtask_attachments),
+    }
+
+
+def seed_students(admin_user, count=5, prefix='estudiante'):
+    """Crea ``count`` estudiantes con la invitación de admin_user ya aceptada"""
+    students = User.objects.bulk_create([
+        User(username=f'__{prefix}_{admin_user.id}_{index + 1}__', email=f'{prefix}{index + 1}@example.com')
+        for index in range(count)
+    ])
+    Invitation.objects.bulk_create([
+        Invitation(admin=admin_user, student=student, accepted=True)
+        for student in students
+    ])
+    return students
+
+
+def seed_activities(board_user, users, count=1000, batch_size=1000):
+    """Crea ``count`` actividades de ``users`` (en turnos) sobre las tareas del tablero"""
+    if not users or not count:
+        return 0
+    tasks = list(
+        Task.objects.filter(list__user=board_user).select_related('list', 'created_by').order_by('id')[:count]
+    )
+    activities = []
+    for index in range(count):
+        task = tasks[index % len(tasks)] if tasks else None
+        user = users[index % len(users)]
+        activities.append(Activity(
+            user=user,
+            activity_type='edit_task',
+            description=f'Editó la tarea "{task.title}"' if task else 'Editó una tarea',
+            task=task,
+            list=task.list if task else None,
+            snapshot=Activity.build_snapshot(
+                user.username,
+                task_title=task.title if task else None,
+                list_name=task.list.name if task else None,
+                creator=task.created_by.username if task and task.created_by else None,
+            ),
+        ))
+    Activity.objects.bulk_create(activities, batch_size=batch_size)
+    add_to_rollups(rollup_counts(activities, board_user.id))
+    return len(activities)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import List, Task, Subtask, Activity, ActivityComment, Invitation, BoardPreference, TaskAttachment, SubtaskAttachment
+from .board import get_list_tasks, get_list_task_count, get_list_filtered_task_count
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -36,11 +37,12 @@ class SubtaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Subtask
-        fields = ['id', 'title', 'task', 'completed', 'order', 'created_by', 'created_by_username', 'due_date', 'attachments']
-        read_only_fields = ['id']
+        fields = ['id', 'title', 'task', 'completed', 'rank', 'created_by', 'created_by_username', 'due_date', 'attachments']
+        read_only_fields = ['id', 'rank']
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    """Acepta ``fields`` (lista de nombres) para serializar solo esos campos"""
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     list_name = serializers.CharField(source='list.name', read_only=True)
     subtasks = SubtaskSerializer(many=True, read_only=True)
@@ -48,8 +50,21 @@ class TaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Task
-        fields = ['id', 'title', 'list', 'list_name', 'order', 'created_by', 'created_by_username', 'due_date', 'reminder_sent', 'subtasks', 'attachments']
-        read_only_fields = ['id', 'reminder_sent']
+        fields = ['id', 'title', 'list', 'list_name', 'rank', 'created_by', 'created_by_username', 'due_date', 'reminder_sent', 'subtasks', 'attachments']
+        read_only_fields = ['id', 'rank', 'reminder_sent']
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ['archived_at']
+        read_only_fields = TaskSerializer.Meta.read_only_fields + ['archived_at']
 
 
 class ListSerializer(serializers.ModelSerializer):
@@ -60,8 +75,8 @@ class ListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = List
-        fields = ['id', 'name', 'order', 'color', 'user', 'created_by', 'created_by_username', 'tasks', 'filtered_tasks', 'task_count']
-        read_only_fields = ['id']
+        fields = ['id', 'name', 'rank', 'color', 'user', 'created_by', 'created_by_username', 'tasks', 'filtered_tasks', 'task_count']
+        read_only_fields = ['id', 'rank']
     
     def get_filtered_tasks(self, obj):
         # Si hay filtered_tasks (de Prefetch), usarlos; si no, usar tasks normales
@@ -70,6 +85,84 @@ class ListSerializer(serializers.ModelSerializer):
         return TaskSerializer(obj.tasks.all(), many=True).data
 
 
+class BoardListSerializer(serializers.ModelSerializer):
+    """
+    Lista del tablero serializada solo con datos precargados (ver kanban.board.get_board_lists).
+    No ejecuta consultas por lista ni por tarea.
+    """
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    task_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = List
+        fields = ['id', 'name', 'rank', 'color', 'user', 'created_by', 'created_by_username', 'task_count']
+        read_only_fields = ['id', 'rank']
+
+    def get_task_count(self, obj):
+        return get_list_task_count(obj)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # kanban.streaming escribe las tareas aparte, por páginas
+        if not self.context.get('include_tasks', True):
+            return data
+        task_fields = self.context.get('task_fields')
+        data['tasks'] = TaskSerializer(get_list_tasks(instance), many=True, context=self.context, fields=task_fields).data
+        # Sin filtros, filtered_tasks es igual a tasks: reutilizar lo ya serializado
+        if hasattr(instance, 'filtered_tasks'):
+            data['filtered_tasks'] = TaskSerializer(
+                instance.filtered_tasks, many=True, context=self.context, fields=task_fields
+            ).data
+        else:
+            data['filtered_tasks'] = data['tasks']
+        # Tablero paginado: cursores para /api/lists/<id>/tasks/?after=
+        if hasattr(instance, 'page_tasks'):
+            data['tasks_cursor'] = instance.tasks_cursor
+            data['filtered_tasks_cursor'] = getattr(instance, 'filtered_tasks_cursor', instance.tasks_cursor)
+            data['filtered_task_count'] = get_list_filtered_task_count(instance)
+        return data
+
+
+class ListChangeSerializer(serializers.ModelSerializer):
+    """Lista sin tareas anidadas, para /api/board/changes/"""
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+
+    class Meta:
+        model = List
+        fields = ['id', 'name', 'rank', 'color', 'created_by', 'created_by_username', 'updated_at']
+        read_only_fields = fields
+
+
+class TaskChangeSerializer(serializers.ModelSerializer):
+    """Tarea sin subtareas ni adjuntos anidados, para /api/board/changes/"""
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'list', 'rank', 'created_by', 'created_by_username', 'due_date', 'reminder_sent', 'updated_at']
+        read_only_fields = fields
+
+
+class SubtaskChangeSerializer(serializers.ModelSerializer):
+    """Subtarea sin adjuntos anidados, para /api/board/changes/"""
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+
+    class Meta:
+        model = Subtask
+        fields = ['id', 'title', 'task', 'completed', 'rank', 'created_by', 'created_by_username', 'due_date', 'updated_at']
+        read_only_fields = fields
+
+
+class TaskAttachmentChangeSerializer(TaskAttachmentSerializer):
+    class Meta(TaskAttachmentSerializer.Meta):
+        fields = TaskAttachmentSerializer.Meta.fields + ['task']
+
+
+class SubtaskAttachmentChangeSerializer(SubtaskAttachmentSerializer):
+    class Meta(SubtaskAttachmentSerializer.Meta):
+        fields = SubtaskAttachmentSerializer.Meta.fields + ['subtask']
+
+
 class ActivityCommentSerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source='author.username', read_only=True)
     
@@ -80,17 +173,20 @@ class ActivityCommentSerializer(serializers.ModelSerializer):
 
 
 class ActivitySerializer(serializers.ModelSerializer):
-    user_username = serializers.CharField(source='user.username', read_only=True)
+    # Los nombres salen de Activity.snapshot: no hace falta leer usuarios, tareas ni listas
+    user_username = serializers.CharField(source='snapshot.username', read_only=True, default=None)
     activity_type_display = serializers.CharField(source='get_activity_type_display', read_only=True)
-    task_title = serializers.CharField(source='task.title', read_only=True)
-    subtask_title = serializers.CharField(source='subtask.title', read_only=True)
-    list_name = serializers.CharField(source='list.name', read_only=True)
+    task_title = serializers.CharField(source='snapshot.task_title', read_only=True, default=None)
+    subtask_title = serializers.CharField(source='snapshot.subtask_title', read_only=True, default=None)
+    list_name = serializers.CharField(source='snapshot.list_name', read_only=True, default=None)
+    creator = serializers.CharField(source='snapshot.creator', read_only=True, default=None)
     comments = ActivityCommentSerializer(many=True, read_only=True)
     
     class Meta:
         model = Activity
         fields = ['id', 'user', 'user_username', 'activity_type', 'activity_type_display', 'description', 
-                  'task', 'task_title', 'subtask', 'subtask_title', 'list', 'list_name', 'created_at', 'comments']
+                  'task', 'task_title', 'subtask', 'subtask_title', 'list', 'list_name', 'creator',
+                  'created_at', 'comments']
         read_only_fields = ['id', 'created_at']
 
 
@@ -0,0 +1,59 @@
+"""
+Señales del tablero: preparan los tableros al crear usuarios y al aceptar
+invitaciones (ver kanban.provisioning), y descartan la pertenencia y el usuario
+compartido guardados en caché cuando cambian (ver kanban.board_context).
+
+Mientras se ejecuta migrate no se prepara ningún tablero: las migraciones que
+crean usuarios (0013_create_initial_superuser) corren antes de que existan
+todas las columnas de los modelos actuales. Esos tableros los prepara
+provision_boards, que se ejecuta después de migrate (ver Procfile).
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_migrate
+from django.dispatch import receiver
+
+from .board_context import (
+    SHARED_ADMIN_USERNAME, forget_board_membership, forget_shared_admin_user, get_user_for_board,
+)
+from .models import Invitation
+from .provisioning import provision_board, provision_user_board
+
+
+_migrating = False
+
+
+@receiver(pre_migrate, dispatch_uid='kanban_migration_started')
+def migration_started(sender, **kwargs):
+    global _migrating
+    _migrating = True
+
+
+@receiver(post_migrate, dispatch_uid='kanban_migration_finished')
+def migration_finished(sender, **kwargs):
+    global _migrating
+    _migrating = False
+
+
+@receiver(post_save, sender=User, dispatch_uid='kanban_provision_user_board')
+def provision_new_user_board(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not _migrating:
+        provision_user_board(instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid='kanban_shared_admin_saved')
+@receiver(post_delete, sender=User, dispatch_uid='kanban_shared_admin_deleted')
+def shared_admin_changed(sender, instance, **kwargs):
+    if instance.username == SHARED_ADMIN_USERNAME:
+        forget_shared_admin_user()
+
+
+@receiver(post_save, sender=Invitation, dispatch_uid='kanban_invitation_saved')
+def invitation_saved(sender, instance, raw=False, **kwargs):
+    forget_board_membership(instance.student)
+    if instance.accepted and not raw and not _migrating:
+        provision_board(get_user_for_board(instance.admin))
+
+
+@receiver(post_delete, sender=Invitation, dispatch_uid='kanban_invitation_deleted')
+def invitation_deleted(sender, instance, **kwargs):
+    forget_board_membership(instance.student)
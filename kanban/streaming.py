@@ -0,0 +1,148 @@
+"""
+Respuestas por partes (?stream=1) de /api/board/ y /api/calendar/.
+
+En lugar de construir todo el payload en memoria, se escribe el JSON de a
+pedazos con StreamingHttpResponse: las tareas de cada lista se leen por páginas
+de STREAM_CHUNK_SIZE (ver kanban.board.get_list_tasks_page) y los elementos del
+calendario con iterator(). La memoria por petición queda acotada por el tamaño
+del lote, no por el del tablero.
+
+El JSON resultante tiene las mismas claves y valores que la respuesta normal;
+solo cambia el orden de algunas claves (los totales van al final).
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .board import task_count_subquery, has_active_filters, get_list_tasks_page, get_list_filtered_task_count
+from .board_sections import build_board_payload
+from .changes import encode_cursor
+from .models import List
+from .renderers import ORJSONRenderer
+from .serializers import BoardListSerializer, TaskSerializer
+
+# Tareas o elementos del calendario que se serializan en cada pedazo
+STREAM_CHUNK_SIZE = 200
+
+_renderer = ORJSONRenderer()
+
+
+def wants_stream(request):
+    """True si la petición pide ?stream=1 y el formato negociado es JSON"""
+    if request.GET.get('stream', '').strip().lower() not in ('1', 'true', 'yes'):
+        return False
+    return request.accepted_renderer.format == 'json'
+
+
+def _encode(value):
+    return _renderer.render(value)
+
+
+def _open_object(data):
+    """JSON de ``data`` sin la llave de cierre, para seguir agregando claves"""
+    return _encode(data)[:-1]
+
+
+def _iter_array_items(rows):
+    """Elementos de un arreglo JSON ya serializados por lotes, separados por comas"""
+    first = True
+    for chunk in rows:
+        if not chunk:
+            continue
+        yield (b'' if first else b',') + _encode(chunk)[1:-1]
+        first = False
+
+
+def _iter_task_chunks(list_obj, filters, task_fields, context):
+    after = None
+    while True:
+        tasks, after = get_list_tasks_page(list_obj, filters, after, STREAM_CHUNK_SIZE, task_fields)
+        yield TaskSerializer(tasks, many=True, context=context, fields=task_fields).data
+        if after is None:
+            return
+
+
+def iter_board_json(request, board_user, preference, sections, filters=None, task_fields=None):
+    """JSON de /api/board/ (sin paginar) escrito lista por lista"""
+    filters = filters or {}
+    other_sections = tuple(name for name in sections if name != 'lists')
+    data = build_board_payload(request, board_user, preference, other_sections, filters=filters, task_fields=task_fields)
+    if 'lists' not in sections:
+        yield _encode(data)
+        return
+
+    # Cursor para /api/board/changes/, tomado antes de leer el tablero
+    data['changes_cursor'] = encode_cursor(board_user)
+    data['page_size'] = None
+    yield _open_object(data) + b',"lists":['
+
+    active_filters = has_active_filters(filters)
+    lists = List.objects.filter(user=board_user).select_related('created_by').annotate(task_total=task_count_subquery())
+    if active_filters:
+        lists = lists.annotate(filtered_task_total=task_count_subquery(filters))
+    context = {'request': request, 'task_fields': task_fields, 'include_tasks': False}
+
+    total_filtered_tasks = 0
+    for index, list_obj in enumerate(lists.order_by('rank', 'id')):
+        list_data = BoardListSerializer(list_obj, context=context).data
+        yield (b',' if index else b'') + _open_object(list_data) + b',"tasks":['
+        yield from _iter_array_items(_iter_task_chunks(list_obj, None, task_fields, context))
+        yield b'],"filtered_tasks":['
+        yield from _iter_array_items(_iter_task_chunks(list_obj, filters, task_fields, context))
+        yield b']}'
+        total_filtered_tasks += get_list_filtered_task_count(list_obj)
+
+    yield b'],"total_filtered_tasks":' + _encode(total_filtered_tasks) + b'}'
+
+
+def iter_calendar_json(data, items):
+    """JSON de /api/calendar/: ``data`` más los elementos de ``items`` y sus totales"""
+    counts = {'overdue': 0, 'soon': 0, 'total': 0}
+
+    def chunks():
+        iterator = iter(items)
+        while True:
+            chunk = list(islice(iterator, STREAM_CHUNK_SIZE))
+            if not chunk:
+                return
+            for item in chunk:
+                if item['status'] in counts:
+                    counts[item['status']] += 1
+            counts['total'] += len(chunk)
+            yield chunk
+
+    yield _open_object(data) + b',"calendar_items":['
+    yield from _iter_array_items(chunks())
+    totals = {
+        'overdue_count': counts['overdue'],
+        'soon_count': counts['soon'],
+        'total_items': counts['total'],
+    }
+    yield b'],' + _encode(totals)[1:]
+
+
+async def _async_chunks(chunks):
+    # Cada pedazo se genera en el hilo síncrono de Django, donde vive la conexión a la base
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    iterator = iter(chunks)
+    while True:
+        chunk = await next_chunk(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def stream_response(request, chunks, headers=None, content_type='application/json'):
+    """
+    StreamingHttpResponse (JSON por defecto) con los pedazos de ``chunks``. Bajo
+    ASGI (daphne) se entregan con un iterador asíncrono; si no, Django
+    consumiría el generador completo antes de enviar la respuesta.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
@@ -5,15 +5,42 @@ from collections import defaultdict
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
+from django.urls import reverse
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
+from django.db.models.functions import Length
 
 from .models import Task, Subtask, Invitation, List
+from .board_cache import bump_board_version
+from .board_context import get_user_for_board
+from .changes import purge_deleted_items
+from .archive import archive_finished_tasks
+from .activity_retention import compact_activities
+from .exporting import export_token, purge_expired_exports, save_export
+from .ranking import RANK_REBALANCE_LENGTH, rebalance_ranks
 from django.contrib.auth.models import User
 
 logger = logging.getLogger(__name__)
 
 
+def reminder_tasks_due(target_date):
+    """Tareas que vencen en target_date y todavía no recibieron recordatorio"""
+    return Task.objects.filter(
+        due_date=target_date,
+        reminder_sent=False,
+    ).select_related('created_by', 'list').prefetch_related('subtasks')
+
+
+def reminder_subtasks_due(target_date):
+    """Subtareas pendientes (de tareas activas) que vencen en target_date"""
+    return Subtask.objects.filter(
+        due_date=target_date,
+        completed=False,
+        task__archived_at__isnull=True,
+    ).select_related('task', 'task__created_by', 'task__list', 'created_by')
+
+
 @shared_task
 def send_due_date_reminders():
     """
@@ -31,10 +58,7 @@ def send_due_date_reminders():
         target_date = today + timedelta(days=days)
         
         # Obtener tareas que vencen en esta fecha y no han recibido recordatorio
-        tasks = Task.objects.filter(
-            due_date=target_date,
-            reminder_sent=False,
-        ).select_related('created_by', 'list').prefetch_related('subtasks')
+        tasks = reminder_tasks_due(target_date)
 
         for task in tasks:
             recipient = None
@@ -101,7 +125,8 @@ def send_due_date_reminders():
                     fail_silently=False,
                 )
                 task.reminder_sent = True
-                task.save(update_fields=['reminder_sent'])
+                task.save(update_fields=['reminder_sent', 'updated_at'])
+                bump_board_version(task.list.user)
                 reminders_sent += 1
                 logger.info(f"Recordatorio enviado a {recipient} para tarea '{task.title}' (vence en {days_remaining} días)")
             except Exception as e:
@@ -113,10 +138,7 @@ def send_due_date_reminders():
     for days in days_ahead:
         target_date = today + timedelta(days=days)
         
-        subtasks = Subtask.objects.filter(
-            due_date=target_date,
-            completed=False,
-        ).select_related('task', 'task__created_by', 'task__list', 'created_by')
+        subtasks = reminder_subtasks_due(target_date)
 
         for subtask in subtasks:
             # Determinar el destinatario (prioridad: creador de subtarea, luego creador de tarea)
@@ -242,7 +264,7 @@ def send_board_reminders_to_all_users(include_overdue=True, include_1_3_days=Tru
         all_user_tasks = (tasks_created | tasks_in_user_lists | tasks_from_admins).distinct()
         
         # Subtareas creadas por el usuario
-        subtasks_created = Subtask.objects.filter(created_by=user).select_related('task', 'task__list', 'task__created_by')
+        subtasks_created = Subtask.objects.filter(created_by=user, task__archived_at__isnull=True).select_related('task', 'task__list', 'task__created_by')
         
         # Subtareas de tareas relacionadas con el usuario
         subtasks_from_user_tasks = Subtask.objects.filter(
@@ -388,3 +410,97 @@ def send_board_reminders_to_all_users(include_overdue=True, include_1_3_days=Tru
         'errors': errors,
         'users_processed': all_board_users.count()
     }
+
+
+@shared_task
+def purge_deleted_board_items():
+    """Elimina los tombstones de /api/board/changes/ que superan el período de retención"""
+    deleted = purge_deleted_items()
+    logger.info(f"Tombstones del tablero eliminados: {deleted}")
+    return {'deleted': deleted}
+
+
+@shared_task
+def archive_finished_board_tasks():
+    """Archiva las tareas que llevan más de TASK_ARCHIVE_AFTER_DAYS días sin cambios en Finalizado"""
+    archived = archive_finished_tasks()
+    logger.info(f"Tareas terminadas archivadas: {archived}")
+    return {'archived': archived}
+
+
+@shared_task
+def compact_activity_history():
+    """Pasa a archivos comprimidos las actividades que superan su ventana de retención"""
+    result = compact_activities()
+    logger.info(f"Actividades archivadas: {result['archived']} en {result['files']} archivos")
+    return result
+
+
+# (modelo, campo del padre, campo del usuario dueño del tablero)
+RANKED_MODELS = (
+    (List, 'user_id', 'user_id'),
+    (Task, 'list_id', 'list__user_id'),
+    (Subtask, 'task_id', 'task__list__user_id'),
+)
+
+
+@shared_task
+def rebalance_board_ranks():
+    """
+    Reasigna claves de orden cortas a los hermanos de cada padre que tenga
+    alguna clave más larga que RANK_REBALANCE_LENGTH (ver kanban.ranking).
+    Cada padre se procesa en su propia transacción.
+    """
+    totals = {}
+    for model, parent_field, board_field in RANKED_MODELS:
+        parents = model.objects.annotate(rank_length=Length('rank')).filter(
+            rank_length__gt=RANK_REBALANCE_LENGTH
+        ).order_by().values_list(parent_field, board_field).distinct()
+        parents = list(parents)
+        board_users = User.objects.in_bulk({board_user_id for _, board_user_id in parents})
+        changed = 0
+        for parent_id, board_user_id in parents:
+            with transaction.atomic():
+                changed += rebalance_ranks(model.objects.filter(**{parent_field: parent_id}))
+                bump_board_version(board_users.get(board_user_id))
+        totals[model._meta.model_name] = {'parents': len(parents), 'changed': changed}
+    logger.info(f"Claves de orden rebalanceadas: {totals}")
+    return totals
+
+
+@shared_task
+def export_board(user_id, fmt='zip'):
+    """
+    Genera la exportación del tablero de ``user_id`` (ver kanban.exporting) y
+    la guarda en EXPORTS_ROOT. Si el usuario tiene correo se le envía el enlace
+    de descarga (SITE_URL + /api/export/<token>/), que vence a las
+    EXPORT_EXPIRY_HOURS horas. Devuelve la ruta y el enlace relativo.
+    """
+    user = User.objects.get(id=user_id)
+    board_user = get_user_for_board(user)
+    path = save_export(board_user, user, fmt)
+    url = reverse('api:download_export', args=[export_token(path, user)])
+    logger.info(f"Exportación del tablero de {board_user.username} guardada en {path}")
+
+    if user.email:
+        try:
+            send_mail(
+                'Exportación del tablero lista',
+                f'Hola {user.username},\n\nLa exportación del tablero está disponible en: '
+                f'{settings.SITE_URL.rstrip("/")}{url}\n\n'
+                f'El enlace vence en {settings.EXPORT_EXPIRY_HOURS} horas y solo funciona con tu sesión iniciada.\n',
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                fail_silently=False,
+            )
+        except Exception as e:
+            logger.error(f"Error al enviar el enlace de la exportación a {user.email}: {e}")
+    return {'path': path, 'url': url}
+
+
+@shared_task
+def purge_expired_board_exports():
+    """Borra las exportaciones más antiguas que EXPORT_EXPIRY_HOURS (ver kanban.exporting)"""
+    deleted = purge_expired_exports()
+    logger.info(f"Exportaciones vencidas borradas: {deleted}")
+    return deleted
@@ -5,7 +5,8 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse, HttpResponseForbidden
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Max, Prefetch, Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.urls import reverse
 from django.contrib import messages
 from datetime import datetime, timedelta
@@ -19,8 +20,6 @@ from django.templatetags.static import static
 from django.utils import timezone
 
 from django.conf import settings
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 
 import pyotp
 import qrcode
@@ -39,6 +38,16 @@ from .models import (
     TaskAttachment,
     SubtaskAttachment,
 )
+from .board import get_board_filters, has_active_filters, get_board_lists, count_filtered_tasks
+from .board_cache import bump_board_version
+from .changes import record_deletion
+from .activity_log import record_activities
+from .activity_feed import get_activity_filters, get_activity_page, get_activity_page_size
+from .ranking import rank_for_position
+from .board_context import (
+    get_board_context,
+    get_user_for_board,
+)
 from django.contrib.auth.models import User
 
 BOARD_COLORS = [
@@ -63,12 +72,6 @@ def hex_to_rgba(hex_color, alpha=0.65):
         return 'transparent'
     return f'rgba({r}, {g}, {b}, {alpha})'
 
-DEFAULT_LISTS = [
-    {'name': 'Pendiente', 'color': 'yellow', 'order': 0},
-    {'name': 'En Progreso', 'color': 'green', 'order': 1},
-    {'name': 'Finalizado', 'color': 'black', 'order': 2},
-]
-
 
 def get_board_preference(user):
     preference, _ = BoardPreference.objects.get_or_create(user=user, defaults={'color': 'transparent'})
@@ -80,53 +83,6 @@ def get_board_color(user):
     return preference.color
 
 
-def ensure_default_lists(board_user):
-    """Garantiza que existan las listas básicas del tablero"""
-    for data in DEFAULT_LISTS:
-        list_obj, created = List.objects.get_or_create(
-            user=board_user,
-            name=data['name'],
-            defaults={
-                'color': data['color'],
-                'order': data['order'],
-            }
-        )
-        updated = False
-        if list_obj.color != data['color']:
-            list_obj.color = data['color']
-            updated = True
-        if list_obj.order != data['order']:
-            list_obj.order = data['order']
-            updated = True
-        if updated:
-            list_obj.save(update_fields=['color', 'order'])
-
-
-def get_shared_admin_user():
-    """Obtiene o crea el usuario compartido para administradores"""
-    username = 'admin_shared'
-    user, created = User.objects.get_or_create(
-        username=username,
-        defaults={
-            'is_staff': True,
-            'is_superuser': True,
-        }
-    )
-    return user
-
-
-def get_user_for_board(user):
-    """Retorna el usuario apropiado para mostrar el tablero"""
-    # Si el usuario es administrador, usar el usuario compartido
-    if user.is_staff or user.is_superuser:
-        return get_shared_admin_user()
-    # Si el estudiante tiene una invitación aceptada, usar el tablero compartido
-    if Invitation.objects.filter(student=user, accepted=True).exists():
-        return get_shared_admin_user()
-    # Si no es administrador ni tiene invitación, usar su propio usuario
-    return user
-
-
 def can_delete(user):
     """Verifica si un usuario puede eliminar elementos"""
     # Solo los administradores pueden eliminar
@@ -166,79 +122,25 @@ def log_activity(user, activity_type, description, task=None, list_obj=None, sub
     Registra una actividad realizada por un usuario invitado (no administrador).
     Solo registra actividades de usuarios que tienen una invitación aceptada.
     """
-    if not (user.is_staff or user.is_superuser):
-        if not Invitation.objects.filter(student=user, accepted=True).exists():
-            return
-    
-    # Crear el registro de actividad
-    activity = Activity.objects.create(
-        user=user,
-        activity_type=activity_type,
-        description=description,
-        task=task,
-        list=list_obj,
-        subtask=subtask
-    )
+    log_activities(user, [{
+        'activity_type': activity_type,
+        'description': description,
+        'task': task,
+        'list_obj': list_obj,
+        'subtask': subtask,
+    }])
 
-    # Enviar notificación en tiempo real a través de WebSocket
-    try:
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            # Obtener información de manera segura (puede que algunos objetos ya hayan sido eliminados)
-            task_id = None
-            task_title = None
-            subtask_id = None
-            subtask_title = None
-            list_id = None
-            list_name = None
-            
-            try:
-                if activity.task:
-                    task_id = activity.task.id
-                    task_title = activity.task.title
-            except Exception:
-                pass  # La tarea puede haber sido eliminada
-            
-            try:
-                if activity.subtask:
-                    subtask_id = activity.subtask.id
-                    subtask_title = activity.subtask.title
-            except Exception:
-                pass  # La subtarea puede haber sido eliminada
-            
-            try:
-                if activity.list:
-                    list_id = activity.list.id
-                    list_name = activity.list.name
-            except Exception:
-                pass  # La lista puede haber sido eliminada
-            
-            payload = {
-                'type': 'activity',
-                'activity_id': activity.id,
-                'user': activity.user.username,
-                'activity_type': activity.get_activity_type_display(),
-                'description': activity.description,
-                'created_at': activity.created_at.strftime('%d/%m/%Y %H:%M:%S'),
-                'task_id': task_id,
-                'task_title': task_title,
-                'subtask_id': subtask_id,
-                'subtask_title': subtask_title,
-                'list_id': list_id,
-                'list_name': list_name,
-            }
-            async_to_sync(channel_layer.group_send)(
-                'activities',
-                {
-                    'type': 'activity_broadcast',
-                    'payload': payload,
-                }
-            )
-            logger.info(f"Notificación de actividad enviada: {activity.activity_type} por {activity.user.username}")
-        else:
-            logger.warning("Channel layer no disponible. Las notificaciones en tiempo real no funcionarán.")
-    except Exception as e:
-        logger.error(f"Error al enviar notificación en tiempo real: {e}", exc_info=True)
+
+def log_activities(user, entries):
+    """
+    Registra varias actividades de ``user``. Cada entrada es un dict con los
+    argumentos de log_activity (activity_type, description, task, list_obj,
+    subtask). Se guardan y se envían por WebSocket después de confirmar la
+    transacción, fuera de la petición (ver kanban.activity_log).
+    """
+    if not entries:
+        return []
+    return record_activities(user, entries)
 
 
 def login_view(request):
@@ -345,6 +247,7 @@ def two_factor_setup(request):
                 if not profile.enabled:
                     profile.enabled = True
                     profile.save(update_fields=['enabled', 'updated_at'])
+                    bump_board_version(get_board_context(request).board_user)
                 messages.success(request, 'Autenticación de dos pasos habilitada correctamente.')
             else:
                 messages.error(request, 'El código proporcionado no es válido. Intenta nuevamente.')
@@ -352,11 +255,13 @@ def two_factor_setup(request):
             profile.secret = pyotp.random_base32()
             profile.enabled = False
             profile.save(update_fields=['secret', 'enabled', 'updated_at'])
+            bump_board_version(get_board_context(request).board_user)
             messages.success(request, 'Se generó un nuevo código secreto. Debes escanear el nuevo código QR antes de habilitar 2FA.')
         elif action == 'disable':
             if profile.enabled:
                 profile.enabled = False
                 profile.save(update_fields=['enabled', 'updated_at'])
+                bump_board_version(get_board_context(request).board_user)
             messages.success(request, 'Autenticación de dos pasos deshabilitada.')
         else:
             messages.error(request, 'Acción no reconocida.')
@@ -413,16 +318,13 @@ def add_task(request):
     title = request.POST.get('title', 'Nueva Tarea')
     
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     list_obj = get_object_or_404(List, id=list_id, user=board_user)
     
-    # Obtener el máximo orden actual y sumar 1
-    max_order = list_obj.tasks.aggregate(Max('order'))['order__max'] or 0
-    
     task = Task.objects.create(
         title=title,
         list=list_obj,
-        order=max_order + 1,
+        rank=rank_for_position(list_obj.tasks.all()),
         created_by=request.user
     )
     
@@ -435,6 +337,7 @@ def add_task(request):
         list_obj=list_obj
     )
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'task_id': task.id,
@@ -449,15 +352,12 @@ def add_list(request):
     name = request.POST.get('name', 'Nueva Lista')
     
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
-    
-    # Obtener el máximo orden actual y sumar 1
-    max_order = List.objects.filter(user=board_user).aggregate(Max('order'))['order__max'] or 0
+    board_user = get_board_context(request).board_user
     
     list_obj = List.objects.create(
         name=name,
         user=board_user,
-        order=max_order + 1,
+        rank=rank_for_position(List.objects.filter(user=board_user)),
         color='purple',
         created_by=request.user
     )
@@ -470,6 +370,7 @@ def add_list(request):
         list_obj=list_obj
     )
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'list_id': list_obj.id,
@@ -482,7 +383,7 @@ def add_list(request):
 def update_task(request, task_id):
     """Actualizar una tarea existente"""
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     old_title = task.title
     old_due_date = task.due_date
@@ -527,6 +428,7 @@ def update_task(request, task_id):
             list_obj=task.list
         )
 
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'task_id': task.id,
@@ -547,7 +449,7 @@ def delete_task(request, task_id):
         }, status=403)
     
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     task_title = task.title
     task_list = task.list
@@ -561,8 +463,10 @@ def delete_task(request, task_id):
         list_obj=task_list
     )
     
+    record_deletion(board_user, 'task', task.id)
     task.delete()
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'message': 'Tarea eliminada exitosamente'
@@ -593,7 +497,7 @@ def change_list_color(request, list_id):
             }, status=400)
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         list_obj = get_object_or_404(List, id=list_id, user=board_user)
         old_color = list_obj.color
         list_obj.color = new_color
@@ -610,6 +514,7 @@ def change_list_color(request, list_id):
             list_obj=list_obj
         )
         
+        bump_board_version(board_user)
         return JsonResponse({
             'success': True,
             'message': f'Color de lista cambiado de {old_color} a {new_color}',
@@ -637,7 +542,7 @@ def delete_list(request, list_id):
         }, status=403)
     
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     list_obj = get_object_or_404(List, id=list_id, user=board_user)
     
     # Guardar información antes de eliminar para el registro de actividad
@@ -654,9 +559,11 @@ def delete_list(request, list_id):
         list_obj=list_obj
     )
     
+    record_deletion(board_user, 'list', list_obj.id)
     # Eliminar la lista (CASCADE eliminará automáticamente tareas y subtareas)
     list_obj.delete()
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'message': f'Lista eliminada exitosamente. Se eliminaron {task_count} tareas y {subtask_count} subtareas.'
@@ -668,19 +575,18 @@ def delete_list(request, list_id):
 def move_task(request, task_id):
     """Mover una tarea a otra lista"""
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     old_list = task.list
     new_list_id = request.POST.get('list_id')
     
     new_list = get_object_or_404(List, id=new_list_id, user=board_user)
     
-    # Obtener el máximo orden en la nueva lista y sumar 1
-    max_order = new_list.tasks.aggregate(Max('order'))['order__max'] or 0
-    
-    task.list = new_list
-    task.order = max_order + 1
-    task.save()
+    # Al final de la nueva lista: solo se escribe la fila de la tarea
+    with transaction.atomic():
+        task.rank = rank_for_position(Task.objects.filter(list=new_list).exclude(id=task.id))
+        task.list = new_list
+        task.save(update_fields=['list', 'rank', 'updated_at'])
     
     # Registrar actividad
     log_activity(
@@ -691,6 +597,7 @@ def move_task(request, task_id):
         list_obj=new_list
     )
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'task_id': task.id,
@@ -703,17 +610,14 @@ def move_task(request, task_id):
 def add_subtask(request, task_id):
     """Agregar una nueva subtarea a una tarea"""
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
     title = request.POST.get('title', 'Nueva Subtarea')
     
-    # Obtener el máximo orden actual y sumar 1
-    max_order = task.subtasks.aggregate(Max('order'))['order__max'] or 0
-    
     subtask = Subtask.objects.create(
         title=title,
         task=task,
-        order=max_order + 1,
+        rank=rank_for_position(task.subtasks.all()),
         completed=False,
         created_by=request.user
     )
@@ -728,6 +632,7 @@ def add_subtask(request, task_id):
         subtask=subtask
     )
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'subtask_id': subtask.id,
@@ -740,7 +645,7 @@ def add_subtask(request, task_id):
 def update_subtask(request, subtask_id):
     """Actualizar una subtarea existente"""
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     old_title = subtask.title
     old_completed = subtask.completed
@@ -795,6 +700,7 @@ def update_subtask(request, subtask_id):
             subtask=subtask
         )
 
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'subtask_id': subtask.id,
@@ -816,7 +722,7 @@ def delete_subtask(request, subtask_id):
         }, status=403)
     
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     subtask_title = subtask.title
     subtask_task = subtask.task
@@ -832,8 +738,10 @@ def delete_subtask(request, subtask_id):
         subtask=subtask
     )
     
+    record_deletion(board_user, 'subtask', subtask.id)
     subtask.delete()
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'message': 'Subtarea eliminada exitosamente'
@@ -845,7 +753,7 @@ def delete_subtask(request, subtask_id):
 def toggle_subtask(request, subtask_id):
     """Cambiar el estado de completado de una subtarea"""
     # Usar usuario compartido si es administrador
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
     old_completed = subtask.completed
     subtask.completed = not subtask.completed
@@ -862,6 +770,7 @@ def toggle_subtask(request, subtask_id):
         subtask=subtask
     )
     
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'subtask_id': subtask.id,
@@ -873,18 +782,17 @@ def toggle_subtask(request, subtask_id):
 @require_POST
 def reorder_lists(request):
     """Reordenar las listas del tablero"""
+    from . import reorder
+    
     try:
         data = json.loads(request.body)
         list_ids = data.get('list_ids', [])
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        # Actualizar el orden de las listas
-        for index, list_id in enumerate(list_ids):
-            list_obj = get_object_or_404(List, id=list_id, user=board_user)
-            list_obj.order = index
-            list_obj.save()
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder.reorder_lists(board_user, list_ids)
         
         return JsonResponse({
             'success': True,
@@ -901,34 +809,18 @@ def reorder_lists(request):
 @require_POST
 def reorder_tasks(request):
     """Reordenar tareas dentro de una lista o entre listas"""
+    from . import reorder
+    
     try:
         data = json.loads(request.body)
         task_ids = data.get('task_ids', [])
         list_id = data.get('list_id')
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        list_obj = get_object_or_404(List, id=list_id, user=board_user)
-        
-        # Actualizar el orden de las tareas
-        for index, task_id in enumerate(task_ids):
-            task = get_object_or_404(Task, id=task_id, list__user=board_user)
-            old_list = task.list
-            old_list_name = old_list.name if old_list else None
-            task.list = list_obj
-            task.order = index + 1
-            task.save()
-            
-            # Registrar actividad solo si la lista cambió
-            if old_list and old_list != list_obj:
-                log_activity(
-                    request.user,
-                    'move_task',
-                    f'Movió la tarea "{task.title}" de "{old_list_name}" a "{list_obj.name}"',
-                    task=task,
-                    list_obj=list_obj
-                )
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder.reorder_tasks(request.user, board_user, list_id, task_ids)
         
         return JsonResponse({
             'success': True,
@@ -945,22 +837,18 @@ def reorder_tasks(request):
 @require_POST
 def reorder_subtasks(request):
     """Reordenar subtareas dentro de una tarea"""
+    from . import reorder
+    
     try:
         data = json.loads(request.body)
         subtask_ids = data.get('subtask_ids', [])
         task_id = data.get('task_id')
         
         # Usar usuario compartido si es administrador
-        board_user = get_user_for_board(request.user)
+        board_user = get_board_context(request).board_user
         
-        task = get_object_or_404(Task, id=task_id, list__user=board_user)
-        
-        # Actualizar el orden de las subtareas
-        for index, subtask_id in enumerate(subtask_ids):
-            subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
-            subtask.task = task
-            subtask.order = index + 1
-            subtask.save()
+        # Una transacción, una consulta de lectura y un bulk_update (ver kanban.reorder)
+        reorder.reorder_subtasks(board_user, task_id, subtask_ids)
         
         return JsonResponse({
             'success': True,
@@ -978,9 +866,7 @@ def board_view(request):
     """Vista principal del tablero Kanban"""
     is_admin = request.user.is_staff or request.user.is_superuser
     is_invited = False
-    board_user = get_user_for_board(request.user)
-
-    ensure_default_lists(board_user)
+    board_user = get_board_context(request).board_user
 
     comment_prefetch = Prefetch(
         'comments',
@@ -989,70 +875,18 @@ def board_view(request):
 
     all_task_qs = Task.objects.filter(list__user=board_user)
 
-    search_query = request.GET.get('q', '').strip()
-    creator_filter = request.GET.get('creator', '').strip()
-    due_from = request.GET.get('due_from', '').strip()
-    due_to = request.GET.get('due_to', '').strip()
-
-    # Aplicar filtros solo si hay alguno activo
-    task_filters = all_task_qs
-
-    if search_query:
-        task_filters = task_filters.filter(title__icontains=search_query)
-
-    if creator_filter:
-        if creator_filter == 'none':
-            task_filters = task_filters.filter(created_by__isnull=True)
-        else:
-            try:
-                creator_id = int(creator_filter)
-                task_filters = task_filters.filter(created_by_id=creator_id)
-            except ValueError:
-                pass
-
-    if due_from:
-        try:
-            due_from_date = datetime.strptime(due_from, '%Y-%m-%d').date()
-            task_filters = task_filters.filter(due_date__gte=due_from_date)
-        except ValueError:
-            pass
-
-    if due_to:
-        try:
-            due_to_date = datetime.strptime(due_to, '%Y-%m-%d').date()
-            task_filters = task_filters.filter(due_date__lte=due_to_date)
-        except ValueError:
-            pass
+    filters = get_board_filters(request.GET)
+    lists = get_board_lists(board_user, filters, include_all_tasks=False)
 
-    task_filters = task_filters.select_related('created_by', 'list').order_by('order')
-
-    task_attachment_prefetch = Prefetch(
-        'attachments',
-        queryset=TaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
-    )
-    subtask_attachment_prefetch = Prefetch(
-        'attachments',
-        queryset=SubtaskAttachment.objects.select_related('uploaded_by').order_by('-uploaded_at')
-    )
-    subtask_prefetch = Prefetch(
-        'subtasks',
-        queryset=Subtask.objects.select_related('created_by').prefetch_related(subtask_attachment_prefetch).order_by('order')
-    )
-    task_filters = task_filters.prefetch_related(subtask_prefetch, task_attachment_prefetch)
-
-    prefetch_tasks = Prefetch('tasks', queryset=task_filters, to_attr='filtered_tasks')
-
-    lists = List.objects.filter(user=board_user).select_related('created_by').prefetch_related(prefetch_tasks)
-
-    board_color = get_board_color(board_user)
+    preference = get_board_context(request).preference
+    board_color = preference.color
     board_overlay_color = hex_to_rgba(board_color)
-    preference = get_board_preference(board_user)
     if preference.background_image:
         board_background_image = preference.background_image.url
     else:
         board_background_image = static('kanban/img/board-bg.jpg')
 
-    total_filtered_tasks = sum(len(getattr(lst, 'filtered_tasks', [])) for lst in lists)
+    total_filtered_tasks = count_filtered_tasks(lists)
 
     creator_ids = all_task_qs.exclude(created_by__isnull=True).values_list('created_by', flat=True).distinct()
     creators = User.objects.filter(id__in=creator_ids).order_by('username')
@@ -1074,31 +908,22 @@ def board_view(request):
         invited_students = Invitation.objects.filter(admin=request.user, accepted=True).values_list('student_id', flat=True)
         activities = Activity.objects.filter(
             Q(user_id__in=invited_students) | Q(user=request.user)
-        ).select_related(
-            'user',
-            'task__created_by',
-            'task__list',
-            'list__created_by',
-            'subtask__created_by',
-            'subtask__task'
-        ).prefetch_related(comment_prefetch).order_by('-created_at')
+        ).prefetch_related(comment_prefetch)
         can_view_activities = True
         activities_heading = 'Actividades de usuarios invitados'
     else:
         is_invited = Invitation.objects.filter(student=request.user, accepted=True).exists()
         if is_invited:
-            activities = Activity.objects.filter(user=request.user).select_related(
-                'user',
-                'task__created_by',
-                'task__list',
-                'list__created_by',
-                'subtask__created_by',
-                'subtask__task'
-            ).prefetch_related(comment_prefetch).order_by('-created_at')
+            activities = Activity.objects.filter(user=request.user).prefetch_related(comment_prefetch)
             can_view_activities = True
             activities_heading = 'Mis actividades'
         # Si es estudiante, mostrar invitaciones pendientes
         pending_invitations = Invitation.objects.filter(student=request.user, accepted=False)
+
+    # Solo la primera página del historial; el resto se pide con ?after= (ver get_activities)
+    activities_cursor = None
+    if can_view_activities:
+        activities, activities_cursor = get_activity_page(activities)
     
     try:
         tf_profile = request.user.two_factor_profile
@@ -1113,6 +938,7 @@ def board_view(request):
         'pending_invitations': pending_invitations,
         'is_invited': is_invited if not is_admin else False,
         'activities': activities,
+        'activities_cursor': activities_cursor,
         'can_view_activities': can_view_activities,
         'activities_heading': activities_heading,
         'board_colors': BOARD_COLORS,
@@ -1120,13 +946,8 @@ def board_view(request):
         'board_overlay_color': board_overlay_color,
         'board_background_image': board_background_image,
         'creators': creators,
-        'filters': {
-            'q': search_query,
-            'creator': creator_filter,
-            'due_from': due_from,
-            'due_to': due_to,
-        },
-        'has_filters': any([search_query, creator_filter, due_from, due_to]),
+        'filters': filters,
+        'has_filters': has_active_filters(filters),
         'total_filtered_tasks': total_filtered_tasks,
         'two_factor_enabled': tf_profile.enabled if tf_profile else False,
         'two_factor_setup_url': reverse('kanban:two_factor_setup'),
@@ -1146,11 +967,12 @@ def change_board_color(request):
     if color not in BOARD_COLORS and color != 'transparent':
         return JsonResponse({'success': False, 'error': 'Color no permitido'}, status=400)
 
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     preference = get_board_preference(board_user)
     preference.color = color
     preference.save(update_fields=['color', 'updated_at'])
 
+    bump_board_version(board_user)
     return JsonResponse({'success': True, 'message': 'Color actualizado correctamente', 'color': color})
 
 
@@ -1198,6 +1020,8 @@ def invite_student(request):
                 'error': f'Ya existe una invitación pendiente para {student.username}'
             }, status=400)
     
+    bump_board_version(student)
+    bump_board_version(get_board_context(request).board_user)
     return JsonResponse({
         'success': True,
         'message': f'Invitación enviada a {student.username}'
@@ -1225,6 +1049,8 @@ def accept_invitation(request, invitation_id):
         invitation.accepted = True
         invitation.save()
         
+        bump_board_version(request.user)
+        bump_board_version(get_user_for_board(invitation.admin))
         return JsonResponse({
             'success': True,
             'message': 'Invitación aceptada. Ahora puedes ver el tablero compartido'
@@ -1249,6 +1075,8 @@ def reject_invitation(request, invitation_id):
                 'error': 'No tienes permiso para rechazar esta invitación'
             }, status=403)
         
+        bump_board_version(invitation.student)
+        bump_board_version(get_user_for_board(invitation.admin))
         invitation.delete()
         
         return JsonResponse({
@@ -1264,7 +1092,10 @@ def reject_invitation(request, invitation_id):
 
 @login_required
 def get_activities(request):
-    """Obtener actividades de usuarios invitados (solo administradores)"""
+    """
+    Página de actividades de usuarios invitados (ver kanban.activity_feed):
+    acepta ?after=<cursor>, ?page_size= y los filtros user, type, task, from y to.
+    """
     is_admin = request.user.is_staff or request.user.is_superuser
 
     comment_prefetch = Prefetch(
@@ -1276,41 +1107,34 @@ def get_activities(request):
         invited_students = Invitation.objects.filter(admin=request.user, accepted=True).values_list('student_id', flat=True)
         activities = Activity.objects.filter(
             Q(user_id__in=invited_students) | Q(user=request.user)
-        ).select_related(
-            'user',
-            'task__created_by',
-            'task__list',
-            'list__created_by',
-            'subtask__created_by',
-            'subtask__task'
-        ).prefetch_related(comment_prefetch).order_by('-created_at')
+        ).prefetch_related(comment_prefetch)
     else:
         if not Invitation.objects.filter(student=request.user, accepted=True).exists():
             return JsonResponse({
                 'success': False,
                 'error': 'No tienes permisos para ver actividades'
             }, status=403)
-        activities = Activity.objects.filter(user=request.user).select_related(
-            'user',
-            'task__created_by',
-            'task__list',
-            'list__created_by',
-            'subtask__created_by',
-            'subtask__task'
-        ).prefetch_related(comment_prefetch).order_by('-created_at')
+        activities = Activity.objects.filter(user=request.user).prefetch_related(comment_prefetch)
+    
+    try:
+        activities, next_cursor = get_activity_page(
+            activities, get_activity_filters(request.GET), after=request.GET.get('after', '').strip(),
+            page_size=get_activity_page_size(request.GET)
+        )
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Cursor inválido'}, status=400)
     
     activities_data = []
     for activity in activities:
-        creator = activity.related_creator.username if activity.related_creator else None
         activities_data.append({
             'id': activity.id,
-            'user': activity.user.username,
+            'user': activity.snapshot.get('username'),
             'activity_type': activity.get_activity_type_display(),
             'description': activity.description,
             'created_at': activity.created_at.strftime('%d/%m/%Y %H:%M:%S'),
-            'task_id': activity.task.id if activity.task else None,
-            'task_title': activity.task.title if activity.task else None,
-            'creator': creator,
+            'task_id': activity.task_id,
+            'task_title': activity.snapshot.get('task_title'),
+            'creator': activity.snapshot.get('creator'),
             'comments': [
                 {
                     'id': comment.id,
@@ -1324,7 +1148,9 @@ def get_activities(request):
     
     return JsonResponse({
         'success': True,
-        'activities': activities_data
+        'activities': activities_data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
     })
 
 
@@ -1352,6 +1178,7 @@ def add_activity_comment(request, activity_id):
         comment=comment_text
     )
 
+    bump_board_version(get_board_context(request).board_user)
     return JsonResponse({
         'success': True,
         'comment': {
@@ -1413,6 +1240,7 @@ def create_user(request):
         user.is_superuser = True
         user.save(update_fields=['is_staff', 'is_superuser'])
 
+    bump_board_version(get_board_context(request).board_user)
     return JsonResponse({
         'success': True,
         'message': f'Usuario {username} creado correctamente como {"Administrador" if role == "admin" else "Estudiante"}'
@@ -1436,25 +1264,25 @@ def upload_board_background(request):
     if image.content_type not in valid_content_types:
         return JsonResponse({'success': False, 'error': 'Formato de imagen no soportado'}, status=400)
 
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     preference = get_board_preference(board_user)
 
     if preference.background_image:
         preference.background_image.delete(save=False)
 
     preference.background_image = image
-    preference.save()
+    preference.save(update_fields=['background_image', 'updated_at'])
 
+    bump_board_version(board_user)
     return JsonResponse({'success': True, 'image_url': preference.background_image.url})
 
 
 @login_required
 def calendar_view(request):
-    board_user = get_user_for_board(request.user)
-    ensure_default_lists(board_user)
+    board_user = get_board_context(request).board_user
 
-    preference = get_board_preference(board_user)
-    board_color = get_board_color(board_user)
+    preference = get_board_context(request).preference
+    board_color = preference.color
     board_overlay_color = hex_to_rgba(board_color)
     if preference.background_image:
         board_background_image = preference.background_image.url
@@ -1463,8 +1291,8 @@ def calendar_view(request):
 
     today = timezone.now().date()
 
-    tasks = Task.objects.filter(list__user=board_user).select_related('list', 'created_by').order_by('due_date', 'order')
-    subtasks = Subtask.objects.filter(task__list__user=board_user).select_related('task', 'task__list', 'created_by').order_by('due_date', 'order')
+    tasks = Task.objects.filter(list__user=board_user).select_related('list', 'created_by').order_by('due_date', 'rank', 'id')
+    subtasks = Subtask.objects.filter(task__list__user=board_user, task__archived_at__isnull=True).select_related('task', 'task__list', 'created_by').order_by('due_date', 'rank', 'id')
 
     calendar_items = []
 
@@ -1639,7 +1467,7 @@ def api_board_users_for_reminders(request):
 @login_required
 @require_POST
 def upload_task_attachment(request, task_id):
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     task = get_object_or_404(Task, id=task_id, list__user=board_user)
 
     attachment_file = request.FILES.get('file')
@@ -1664,6 +1492,7 @@ def upload_task_attachment(request, task_id):
         list_obj=task.list
     )
 
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'attachment': {
@@ -1679,7 +1508,7 @@ def upload_task_attachment(request, task_id):
 @login_required
 @require_POST
 def upload_subtask_attachment(request, subtask_id):
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     subtask = get_object_or_404(Subtask, id=subtask_id, task__list__user=board_user)
 
     attachment_file = request.FILES.get('file')
@@ -1705,6 +1534,7 @@ def upload_subtask_attachment(request, subtask_id):
         subtask=subtask
     )
 
+    bump_board_version(board_user)
     return JsonResponse({
         'success': True,
         'attachment': {
@@ -1724,7 +1554,7 @@ def delete_task_attachment(request, attachment_id):
         return JsonResponse({'success': False, 'error': 'No tienes permisos para eliminar adjuntos.'}, status=403)
 
     attachment = get_object_or_404(TaskAttachment, id=attachment_id)
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     if not (request.user.is_staff or request.user.is_superuser):
         if attachment.task.list.user != board_user:
             return JsonResponse({'success': False, 'error': 'No tienes acceso a este adjunto.'}, status=403)
@@ -1736,6 +1566,7 @@ def delete_task_attachment(request, attachment_id):
 
     if attachment.file:
         attachment.file.delete(save=False)
+    record_deletion(list_obj.user, 'task_attachment', attachment.id)
     attachment.delete()
 
     log_activity(
@@ -1746,6 +1577,7 @@ def delete_task_attachment(request, attachment_id):
         list_obj=list_obj
     )
 
+    bump_board_version(list_obj.user)
     return JsonResponse({'success': True})
 
 
@@ -1756,7 +1588,7 @@ def delete_subtask_attachment(request, attachment_id):
         return JsonResponse({'success': False, 'error': 'No tienes permisos para eliminar adjuntos.'}, status=403)
 
     attachment = get_object_or_404(SubtaskAttachment, id=attachment_id)
-    board_user = get_user_for_board(request.user)
+    board_user = get_board_context(request).board_user
     if not (request.user.is_staff or request.user.is_superuser):
         if attachment.subtask.task.list.user != board_user:
             return JsonResponse({'success': False, 'error': 'No tienes acceso a este adjunto.'}, status=403)
@@ -1769,6 +1601,7 @@ def delete_subtask_attachment(request, attachment_id):
 
     if attachment.file:
         attachment.file.delete(save=False)
+    record_deletion(list_obj.user, 'subtask_attachment', attachment.id)
     attachment.delete()
 
     log_activity(
@@ -1780,5 +1613,6 @@ def delete_subtask_attachment(request, attachment_id):
         subtask=subtask
     )
 
+    bump_board_version(list_obj.user)
     return JsonResponse({'success': True})
 
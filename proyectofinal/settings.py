@@ -3,6 +3,7 @@ Django settings for proyectofinal project.
 """
 
 from pathlib import Path
+import importlib.util
 import os
 import logging
 import dj_database_url
@@ -196,15 +197,94 @@ LOGGING = {
     },
 }
 
-# Configuración de Channel Layers para WebSockets
-# InMemoryChannelLayer funciona bien para desarrollo con un solo proceso
-# Para producción con múltiples workers, usar Redis:
-# 'BACKEND': 'channels_redis.core.RedisChannelLayer',
-# 'CONFIG': {'hosts': [('127.0.0.1', 6379)]},
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+# Configuración de Channel Layers para WebSockets (ver kanban/channel_layers.py).
+# Con varios procesos de daphne los mensajes deben pasar por un servicio compartido:
+# CHANNEL_LAYER_URL=redis://127.0.0.1:6379/2 usa Redis (channels-redis) y
+# CHANNEL_LAYER_URL=postgres://... usa LISTEN/NOTIFY de PostgreSQL. Sin ella se usa
+# InMemoryChannelLayer, que solo sirve con un único proceso (desarrollo).
+CHANNEL_LAYER_URL = os.getenv('CHANNEL_LAYER_URL', '')
+if CHANNEL_LAYER_URL.startswith(('redis://', 'rediss://')):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_LAYER_URL]},
+        }
     }
+elif CHANNEL_LAYER_URL.startswith(('postgres://', 'postgresql://')):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'kanban.channel_layers.PostgresNotifyChannelLayer',
+            'CONFIG': {'dsn': CHANNEL_LAYER_URL},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
+# Caché de Django. Con CACHE_URL (ej: redis://127.0.0.1:6379/1) se comparte entre
+# procesos; sin ella se usa memoria local, suficiente para desarrollo. La pertenencia
+# al tablero compartido solo se guarda en caché si es compartida (ver kanban.board_context).
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Segundos que se guarda en caché cada versión serializada de /api/board/
+BOARD_CACHE_TIMEOUT = int(os.getenv('BOARD_CACHE_TIMEOUT', 300))
+
+# Tareas por lista en la primera página de /api/board/ (0 = sin paginar).
+# El resto se pide con /api/lists/<id>/tasks/?after=<cursor>.
+BOARD_TASKS_PAGE_SIZE = int(os.getenv('BOARD_TASKS_PAGE_SIZE', 0))
+
+# Configuración de texto de PostgreSQL para la búsqueda del tablero (ver kanban/search.py)
+BOARD_SEARCH_CONFIG = os.getenv('BOARD_SEARCH_CONFIG', 'spanish')
+
+# Días que se conservan los elementos eliminados para /api/board/changes/.
+# Un cliente con un cursor más antiguo debe recargar el tablero completo.
+BOARD_CHANGES_RETENTION_DAYS = int(os.getenv('BOARD_CHANGES_RETENTION_DAYS', 30))
+
+# Días sin cambios tras los cuales se archivan las tareas de la lista "Finalizado".
+# Las archivadas no se leen en el tablero y se consultan en /api/archive/.
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv('TASK_ARCHIVE_AFTER_DAYS', 30))
+
+# Exportaciones generadas con Celery (POST /api/export/). Se guardan fuera de
+# MEDIA_ROOT, se descargan solo con /api/export/<token>/ y se borran pasadas
+# EXPORT_EXPIRY_HOURS horas (ver kanban/exporting.py).
+EXPORTS_ROOT = Path(os.getenv('EXPORTS_ROOT', BASE_DIR / 'exports'))
+EXPORT_EXPIRY_HOURS = int(os.getenv('EXPORT_EXPIRY_HOURS', 24))
+
+# Dirección pública del sitio para los enlaces que se envían por correo
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+# Las actividades se guardan y se envían por WebSocket en un hilo de fondo, por
+# lotes, después de confirmar cada petición (ver kanban/activity_log.py).
+# Con False se escriben dentro de la petición.
+ACTIVITY_LOG_BUFFERED = os.getenv('ACTIVITY_LOG_BUFFERED', 'True').lower() == 'true'
+
+# Días que las actividades se quedan en la tabla antes de pasar a un archivo
+# comprimido (ver kanban/activity_retention.py). Cada tipo puede tener su propia
+# ventana con ACTIVITY_RETENTION_DAYS_BY_TYPE="move_task=90,toggle_subtask=90".
+ACTIVITY_RETENTION_DAYS = int(os.getenv('ACTIVITY_RETENTION_DAYS', 365))
+ACTIVITY_RETENTION_DAYS_BY_TYPE = {
+    activity_type.strip(): int(days)
+    for activity_type, days in (
+        item.split('=', 1)
+        for item in os.getenv('ACTIVITY_RETENTION_DAYS_BY_TYPE', 'move_task=90,toggle_subtask=90').split(',')
+        if item.strip()
+    )
 }
 
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://127.0.0.1:6379/0')
@@ -224,6 +304,26 @@ CELERY_BEAT_SCHEDULE = {
         # Envía recordatorios a todos los usuarios del tablero diariamente
         # Por defecto: vencidas y 1-3 días habilitados, 4-7 días deshabilitado
     },
+    'purge-deleted-board-items-daily': {
+        'task': 'kanban.tasks.purge_deleted_board_items',
+        'schedule': 60.0 * 60.0 * 24.0,  # cada 24 horas (en segundos)
+    },
+    'rebalance-board-ranks-daily': {
+        'task': 'kanban.tasks.rebalance_board_ranks',
+        'schedule': 60.0 * 60.0 * 24.0,  # cada 24 horas (en segundos)
+    },
+    'archive-finished-tasks-daily': {
+        'task': 'kanban.tasks.archive_finished_board_tasks',
+        'schedule': 60.0 * 60.0 * 24.0,  # cada 24 horas (en segundos)
+    },
+    'compact-activities-daily': {
+        'task': 'kanban.tasks.compact_activity_history',
+        'schedule': 60.0 * 60.0 * 24.0,  # cada 24 horas (en segundos)
+    },
+    'purge-expired-exports-hourly': {
+        'task': 'kanban.tasks.purge_expired_board_exports',
+        'schedule': 60.0 * 60.0,  # cada hora (en segundos)
+    },
 }
 
 # Configuración de correo electrónico
@@ -289,6 +389,7 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
@@ -298,6 +399,7 @@ CORS_ALLOW_HEADERS = [
 # Exponer headers en la respuesta
 CORS_EXPOSE_HEADERS = [
     'content-type',
+    'etag',
     'x-csrftoken',
 ]
 
@@ -309,13 +411,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON codificado con orjson (ver kanban/renderers.py); el primero es el formato por defecto
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'kanban.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'kanban.renderers.ORJSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# MessagePack (application/msgpack) solo si el paquete msgpack está instalado
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('kanban.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('kanban.renderers.MessagePackParser')
+